@@ -18,7 +18,9 @@ const state = {
         yearMax: null,
         searchQuery: ''
     },
-    currentView: 'map'
+    currentView: 'map',
+    dataHash: null,
+    searchIndex: null
 };
 
 // =====================================================
@@ -29,7 +31,11 @@ const CONFIG = {
     defaultZoom: 6,
     userZoom: 12,
     nominatimAPI: 'https://nominatim.openstreetmap.org/search',
-    dataPath: 'data.json'
+    dataPath: 'data.json',
+    shardsPath: 'data',
+    searchIndexPath: 'data/search-index.json',
+    // ?perf dans l'URL : durée du filtrage et de l'affichage dans la console
+    perf: new URLSearchParams(window.location.search).has('perf')
 };
 
 // =====================================================
@@ -77,6 +83,19 @@ function extractCategories(data) {
     return Array.from(categories).sort();
 }
 
+/**
+ * Mesure de durée (avec ?perf dans l'URL uniquement)
+ */
+function perfStart() {
+    return CONFIG.perf ? performance.now() : null;
+}
+
+function perfEnd(label, start) {
+    if (start === null) return;
+    console.info(`⏱ ${label}: ${(performance.now() - start).toFixed(1)} ms ` +
+                 `(${state.filteredData.length} sur ${state.mofData.length} MOF)`);
+}
+
 /**
  * Normalise une chaîne pour la recherche
  */
@@ -92,12 +111,25 @@ function normalizeString(str) {
 
 /**
  * Charge les données des MOF
+ * Une page peut ne charger que certains fragments (voir data/manifest.json) :
+ * <body data-shards="categorie/chocolaterie,departement/75">
  */
 async function loadMOFData() {
     try {
-        const response = await fetch(CONFIG.dataPath);
-        const data = await response.json();
-        state.mofData = data.mof || [];
+        const shards = (document.body.dataset.shards || '').split(',').map(s => s.trim()).filter(Boolean);
+        const paths = shards.length > 0
+            ? shards.map(shard => `${CONFIG.shardsPath}/${shard}.json`)
+            : [CONFIG.dataPath];
+        const payloads = await Promise.all(paths.map(async path => {
+            const response = await fetch(path);
+            return response.json();
+        }));
+
+        // Un MOF peut apparaître dans plusieurs fragments (ex: Pâtissier-Chocolatier)
+        const byId = new Map();
+        payloads.forEach(data => (data.mof || []).forEach(mof => byId.set(mof.id, mof)));
+        state.mofData = [...byId.values()];
+        state.dataHash = shards.length === 0 && payloads[0].meta ? payloads[0].meta.content_hash : null;
         state.filteredData = [...state.mofData];
         return state.mofData;
     } catch (error) {
@@ -107,6 +139,72 @@ async function loadMOFData() {
     }
 }
 
+/**
+ * Charge l'index de recherche (trigrammes) publié avec data.json
+ * Ignoré s'il ne correspond pas aux données chargées : la recherche reste alors linéaire
+ */
+async function loadSearchIndex() {
+    if (!state.dataHash) return;
+    try {
+        const response = await fetch(CONFIG.searchIndexPath);
+        const index = await response.json();
+        if (index.content_hash === state.dataHash) {
+            state.searchIndex = index;
+        }
+    } catch (error) {
+        console.warn('Index de recherche indisponible:', error);
+    }
+}
+
+/**
+ * Décode une liste de l'index : écarts successifs, ou bitmap base64
+ */
+function decodePostings(postings) {
+    const positions = [];
+    if (typeof postings === 'string') {
+        const bytes = atob(postings);
+        for (let i = 0; i < bytes.length; i++) {
+            const byte = bytes.charCodeAt(i);
+            for (let bit = 0; byte && bit < 8; bit++) {
+                if (byte & (1 << bit)) positions.push(i * 8 + bit);
+            }
+        }
+    } else {
+        let position = -1;
+        postings.forEach(gap => {
+            position += gap;
+            positions.push(position);
+        });
+    }
+    return positions;
+}
+
+/**
+ * Id des MOF candidats pour une requête normalisée (intersection des trigrammes)
+ * Retourne null si l'index ne peut pas servir (absent, ou requête trop courte)
+ */
+function searchCandidates(query) {
+    const index = state.searchIndex;
+    if (!index || query.length < index.gram) return null;
+
+    const keys = new Set();
+    for (let i = 0; i + index.gram <= query.length; i++) {
+        keys.add(query.slice(i, i + index.gram));
+    }
+
+    let candidates = null;
+    for (const key of keys) {
+        const postings = index.grams[key];
+        if (!postings) return new Set();
+        const positions = decodePostings(postings);
+        candidates = candidates === null
+            ? new Set(positions)
+            : new Set(positions.filter(position => candidates.has(position)));
+        if (candidates.size === 0) break;
+    }
+    return new Set([...candidates].map(position => index.ids[position]));
+}
+
 // =====================================================
 // Geolocation
 // =====================================================
@@ -244,6 +342,7 @@ function updateDistances() {
  * Applique les filtres sur les données
  */
 function applyFilters() {
+    const start = perfStart();
     let filtered = [...state.mofData];
 
     // Filtre catégories
@@ -268,19 +367,26 @@ function applyFilters() {
     // Filtre recherche textuelle
     if (state.filters.searchQuery) {
         const query = normalizeString(state.filters.searchQuery);
-        filtered = filtered.filter(mof => {
+        const matchesQuery = mof => {
             const name = normalizeString(mof.name || '');
             const specialty = normalizeString(mof.specialty || '');
             const address = normalizeString(mof.address || '');
             return name.includes(query) ||
                    specialty.includes(query) ||
                    address.includes(query);
-        });
+        };
+        // Avec l'index, seuls les candidats sont vérifiés
+        const candidates = searchCandidates(query);
+        filtered = filtered.filter(mof =>
+            (candidates === null || candidates.has(mof.id)) && matchesQuery(mof)
+        );
     }
 
     state.filteredData = filtered;
+    perfEnd('applyFilters (filtrage)', start);
     updateResultsCount();
     renderCurrentView();
+    perfEnd('applyFilters (total)', start);
 }
 
 /**
@@ -338,6 +444,7 @@ function initMap() {
  * Affiche les marqueurs sur la carte
  */
 function renderMapMarkers() {
+    const start = perfStart();
     // Supprimer les anciens marqueurs
     state.markers.forEach(marker => state.map.removeLayer(marker));
     state.markers = [];
@@ -366,6 +473,7 @@ function renderMapMarkers() {
         const group = L.featureGroup(state.markers);
         state.map.fitBounds(group.getBounds().pad(0.1));
     }
+    perfEnd('renderMapMarkers', start);
 }
 
 /**
@@ -732,6 +840,9 @@ async function init() {
     // Générer les données structurées JSON-LD
     injectStructuredData();
 
+    // Index de recherche chargé en arrière-plan
+    loadSearchIndex();
+
     console.log(`${state.mofData.length} MOF chargés`);
 }
 
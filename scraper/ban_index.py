@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+Géocodeur hors-ligne construit à partir d'un export de la Base Adresse Nationale (BAN)
+https://adresse.data.gouv.fr/data/ban/adresses/latest/csv/
+
+Construction de l'index (une fois par export) :
+    python3 ban_index.py adresses-75.csv.gz adresses-69.csv.gz ...
+
+L'index est un fichier binaire trié, ouvert en mmap : une recherche est une
+dichotomie sur des enregistrements de taille fixe, sans accès réseau.
+"""
+
+import csv
+import gzip
+import hashlib
+import io
+import mmap
+import os
+import re
+import struct
+import sys
+import time
+from array import array
+from typing import Dict, Iterable, Optional, Tuple
+
+from geocache import normalize_address
+
+DEFAULT_INDEX_PATH = "../data/ban-index.bin"
+
+MAGIC = b"MOFBAN01"
+HEADER = struct.Struct("<8sQ")
+RECORD = struct.Struct("<Qff")  # hash de la clé, lat, lon
+BUCKET_BITS = 10  # Construction : 1024 parts triées séparément
+
+# Abréviations courantes des types de voie
+STREET_ABBREVIATIONS = {
+    "r": "rue", "av": "avenue", "ave": "avenue", "bd": "boulevard", "bld": "boulevard",
+    "bvd": "boulevard", "pl": "place", "fg": "faubourg", "fbg": "faubourg",
+    "imp": "impasse", "ch": "chemin", "che": "chemin", "rte": "route",
+    "st": "saint", "ste": "sainte", "sq": "square", "pass": "passage"
+}
+
+POSTCODE_RE = re.compile(r"\b(\d{5})\b")
+NUMBER_RE = re.compile(r"^(\d+)(?:\s*-\s*\d+)?\s*(bis|ter|quater|[a-d](?![a-z]))?\s+(.*)$")
+
+def normalize_street(street: str) -> str:
+    """Normalise un nom de voie (accents, ponctuation, abréviations)"""
+    words = normalize_address(street).split()
+    return " ".join(STREET_ABBREVIATIONS.get(w, w) for w in words)
+
+def make_key(postcode: str, street: str, number: str = "") -> str:
+    """Clé d'index : code postal + voie normalisée + numéro (vide = centroïde de la voie)"""
+    return f"{postcode}|{street}|{number}"
+
+def key_hash(key: str) -> int:
+    return int.from_bytes(hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest(), "little")
+
+def parse_address(address: str) -> Optional[Tuple[str, str, str]]:
+    """
+    Découpe une adresse libre en (code postal, voie normalisée, numéro)
+    Ex: "47 ter boulevard Saint-Germain, 75005 Paris" -> ("75005", "boulevard saint germain", "47ter")
+    """
+    if not address:
+        return None
+    match = POSTCODE_RE.search(address)
+    if not match:
+        return None
+    postcode = match.group(1)
+
+    segments = [s.strip() for s in address.split(",") if s.strip()]
+    postcode_idx = next(i for i, s in enumerate(segments) if postcode in s)
+    street_segment = segments[postcode_idx - 1] if postcode_idx > 0 else segments[0]
+    street_segment = street_segment.replace(postcode, "").strip().lower()
+
+    number = ""
+    number_match = NUMBER_RE.match(street_segment)
+    if number_match:
+        number = number_match.group(1) + (number_match.group(2) or "")
+        street_segment = number_match.group(3)
+
+    street = normalize_street(street_segment)
+    if not street:
+        return None
+    return postcode, street, number
+
+def read_ban_rows(path: str) -> Iterable[Dict]:
+    """Lit un export CSV de la BAN (séparateur ';', éventuellement gzippé)"""
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rb") as raw:
+        reader = csv.DictReader(io.TextIOWrapper(raw, encoding="utf-8"), delimiter=";")
+        for row in reader:
+            yield row
+
+def build_index(csv_paths: Iterable[str], index_path: str = DEFAULT_INDEX_PATH) -> int:
+    """
+    Construit l'index binaire à partir d'un ou plusieurs exports BAN
+    Indexe chaque adresse numérotée et le centroïde de chaque voie
+    Retourne le nombre d'entrées écrites
+    """
+    # Entrées réparties dès la lecture par bits de poids fort du hash, dans des tableaux compacts :
+    # chaque part est triée seule, et leur concaténation est triée
+    buckets = [(array("Q"), array("f"), array("f")) for _ in range(1 << BUCKET_BITS)]
+    streets = {}
+
+    def add(h: int, lat: float, lon: float):
+        hashes, lats, lons = buckets[h >> (64 - BUCKET_BITS)]
+        hashes.append(h)
+        lats.append(lat)
+        lons.append(lon)
+
+    for path in csv_paths:
+        print(f"📖 Lecture de {path}...")
+        for row in read_ban_rows(path):
+            try:
+                lat = float(row["lat"])
+                lon = float(row["lon"])
+            except (KeyError, TypeError, ValueError):
+                continue
+            postcode = row.get("code_postal", "")
+            street = normalize_street(row.get("nom_voie", ""))
+            if not postcode or not street:
+                continue
+
+            number = (row.get("numero") or "").lstrip("0") + (row.get("rep") or "").lower()
+            if number:
+                add(key_hash(make_key(postcode, street, number)), lat, lon)
+
+            acc = streets.setdefault(key_hash(make_key(postcode, street)), [0.0, 0.0, 0])
+            acc[0] += lat
+            acc[1] += lon
+            acc[2] += 1
+
+    for h, (sum_lat, sum_lon, count) in streets.items():
+        add(h, sum_lat / count, sum_lon / count)
+    streets.clear()
+
+    tmp_path = index_path + ".tmp"
+    written = 0
+    previous = None
+    with open(tmp_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, 0))
+        for position, (hashes, lats, lons) in enumerate(buckets):
+            # Tri stable : en cas de doublon, la première entrée lue est gardée
+            for i in sorted(range(len(hashes)), key=hashes.__getitem__):
+                h = hashes[i]
+                if h == previous:
+                    continue
+                f.write(RECORD.pack(h, lats[i], lons[i]))
+                previous = h
+                written += 1
+            buckets[position] = None  # Part écrite : mémoire libérée au fur et à mesure
+        f.seek(0)
+        f.write(HEADER.pack(MAGIC, written))
+    os.replace(tmp_path, index_path)
+
+    print(f"✓ {written} entrées indexées dans {index_path}")
+    return written
+
+class BANIndex:
+    """Index BAN ouvert en mmap, recherche par dichotomie"""
+
+    def __init__(self, path: str = DEFAULT_INDEX_PATH):
+        self.path = path
+        self.file = open(path, "rb")
+        self.mm = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.count = HEADER.unpack_from(self.mm, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} n'est pas un index BAN valide")
+        self.stats = {"hits": 0, "misses": 0}
+
+    def lookup_key(self, key: str) -> Optional[Dict]:
+        """Recherche une clé exacte dans l'index"""
+        target = key_hash(key)
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            h, lat, lon = RECORD.unpack_from(self.mm, HEADER.size + mid * RECORD.size)
+            if h < target:
+                lo = mid + 1
+            elif h > target:
+                hi = mid
+            else:
+                return {"lat": round(lat, 6), "lon": round(lon, 6)}
+        return None
+
+    def lookup(self, postcode: str, street: str, number: str = "") -> Optional[Dict]:
+        """Cherche le numéro exact, puis le numéro sans indice (bis/ter), puis le centroïde de la voie"""
+        candidates = [number, number.rstrip("abcdefghijklmnopqrstuvwxyz"), ""] if number else [""]
+        for candidate in dict.fromkeys(candidates):
+            coords = self.lookup_key(make_key(postcode, street, candidate))
+            if coords:
+                return coords
+        return None
+
+    def geocode(self, address: str) -> Optional[Dict]:
+        """Géocode une adresse libre, ou retourne None si elle n'est pas dans l'index"""
+        parsed = parse_address(address)
+        coords = self.lookup(*parsed) if parsed else None
+        if coords:
+            self.stats["hits"] += 1
+        else:
+            self.stats["misses"] += 1
+        return coords
+
+    def close(self):
+        self.mm.close()
+        self.file.close()
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: python3 ban_index.py adresses-XX.csv[.gz] ... [--out ../data/ban-index.bin]")
+        sys.exit(1)
+
+    args = sys.argv[1:]
+    index_path = DEFAULT_INDEX_PATH
+    if "--out" in args:
+        pos = args.index("--out")
+        index_path = args[pos + 1]
+        del args[pos:pos + 2]
+
+    start = time.time()
+    build_index(args, index_path)
+    print(f"⏱ Construction en {time.time() - start:.1f}s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Compare les deux modes d'analyse de l'annuaire de scrape_mof.py (lxml vs BeautifulSoup)
+sur une page sauvegardée ou sur une page synthétique de N entrées.
+
+    python3 bench_parse.py [page.html | nombre d'entrées] [répétitions]
+"""
+
+import os
+import sys
+import time
+
+from lxml import etree
+
+from scrape_mof import HTML_PARSER_UTF8, parse_mof_directory
+
+SPECIALTIES = ["Boulanger", "Pâtissier-Confiseur", "Ébéniste", "Fromager", "Cuisinier",
+               "Couvreur", "Chocolatier", "Boucher-Charcutier", "Horloger", "Poissonnier"]
+
+def synthetic_page(count: int) -> bytes:
+    """Page d'annuaire synthétique : en-tête, navigation et `count` fiches .mof-item"""
+    items = []
+    for i in range(count):
+        specialty = SPECIALTIES[i % len(SPECIALTIES)]
+        items.append(
+            f'<div class="mof-item card"><!-- fiche {i} -->'
+            f'<div class="header"><h3 class="artisan-name">Artisan {i} <span>MOF</span></h3></div>'
+            f'<p class="specialty">{specialty}</p>'
+            f'<p class="address">{i} rue de la Paix, {75000 + i % 20} Paris</p>'
+            f'<span class="year">Promotion {1990 + i % 30}</span>'
+            f'<a class="website" href="/artisan/{i}">Site</a>'
+            f'<a href="https://example.com/{i}">Externe</a>'
+            f'<ul class="tags"><li>tag</li><li>autre</li></ul></div>'
+        )
+    nav = "".join(f'<li><a href="/page{i}">Lien {i}</a></li>' for i in range(200))
+    html = (f'<!DOCTYPE html><html><head><title>Annuaire</title>'
+            f'<script>var x = "<div class=card>";</script></head>'
+            f'<body><nav><ul>{nav}</ul></nav><main>{"".join(items)}</main></body></html>')
+    return html.encode("utf-8")
+
+def timed(function, repeat: int):
+    best, result = None, None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+def main():
+    source = sys.argv[1] if len(sys.argv) > 1 else "2000"
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+    if os.path.exists(source):
+        with open(source, 'rb') as f:
+            content = f.read()
+        print(f"📄 Page: {source} ({len(content) / 1024:.0f} Ko)")
+    else:
+        content = synthetic_page(int(source))
+        print(f"📄 Page synthétique: {source} entrées ({len(content) / 1024:.0f} Ko)")
+
+    lxml_time, lxml_result = timed(lambda: parse_mof_directory(content, "lxml", verbose=False), repeat)
+    tree_time, _ = timed(lambda: etree.fromstring(content, HTML_PARSER_UTF8), repeat)
+    soup_time, soup_result = timed(lambda: parse_mof_directory(content, "soup", verbose=False), repeat)
+
+    print(f"├─ lxml: {lxml_time * 1000:.0f} ms ({len(lxml_result)} MOF), "
+          f"dont {tree_time * 1000:.0f} ms de construction de l'arbre par libxml2")
+    print(f"├─ BeautifulSoup: {soup_time * 1000:.0f} ms ({len(soup_result)} MOF)")
+    print(f"└─ Gain: x{soup_time / lxml_time:.1f}")
+
+    if lxml_result != soup_result:
+        print("❌ Les deux modes ne produisent pas les mêmes enregistrements")
+        sys.exit(1)
+    print("✓ Enregistrements identiques")
+
+if __name__ == "__main__":
+    main()
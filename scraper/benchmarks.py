@@ -0,0 +1,377 @@
+#!/usr/bin/env python3
+"""
+Suite de benchmarks hors-ligne : aucune requête vers le site des MOF ni vers Nominatim
+- parse : lecture des li.item-gallery d'un annuaire synthétique (listing_http) et
+  conversion en enregistrements (build_mof_list)
+- classify : is_food_category sur les spécialités de l'annuaire, cache froid puis chaud
+- geocode : débit de geocode_addresses contre un serveur local compatible Nominatim,
+  avec latence et limite de débit configurables (réponses 429 + Retry-After au-delà ;
+  sans limite par défaut)
+- publish : publish_data dans un dossier temporaire, premier passage puis passage sans changement
+
+Chaque exécution enregistre ses résultats dans data/benchmarks/ (JSON) ; --compare
+confronte deux fichiers et sort en erreur si une mesure s'est dégradée de plus de 20 %.
+
+    python3 benchmarks.py [--size N] [--geocode N] [--latency ms] [--server-rate r/s]
+                          [--client-rate r/s] [--concurrency N] [--only parse,geocode] [--output fichier]
+    python3 benchmarks.py --compare ancien.json nouveau.json
+"""
+
+import contextlib
+import hashlib
+import io
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from html import escape
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+import geocoding
+from geocache import GeocodeCache
+from listing_http import parse_listing_html
+from publish import publish_data
+from scrape_mof_selenium import build_mof_list
+from taxonomy import classify, is_food_category
+
+RESULTS_DIR = "../data/benchmarks"
+REGRESSION_THRESHOLD = 1.2  # Au-delà de +20 %, une mesure est signalée comme régression
+BENCHMARKS = ["parse", "classify", "geocode", "publish"]
+
+# Spécialités de l'annuaire (métiers de bouche et autres), avec un poids approximatif
+SPECIALTIES = [
+    ("Boulanger", 8), ("Pâtissier-Confiseur", 7), ("Pâtissier-Chocolatier", 4), ("Cuisinier", 9),
+    ("Boucher-Charcutier", 5), ("Charcutier-Traiteur", 4), ("Fromager", 4), ("Poissonnier-Écailler", 2),
+    ("Glacier", 2), ("Chocolatier-Confiseur", 3), ("Primeur", 1), ("Sommelier", 3),
+    ("Maître d'hôtel", 2), ("Barman", 1), ("Ébéniste", 5), ("Couvreur", 4), ("Horloger", 3),
+    ("Maître verrier", 2), ("Coiffeur", 6), ("Tailleur de pierre", 3), ("Ferronnier", 3),
+    ("Bijoutier-Joaillier", 4), ("Menuisier", 4), ("Fleuriste", 3), ("Relieur-Doreur", 1)
+]
+CITIES = [
+    ("Paris", "75"), ("Lyon", "69"), ("Marseille", "13"), ("Bordeaux", "33"), ("Toulouse", "31"),
+    ("Nantes", "44"), ("Strasbourg", "67"), ("Lille", "59"), ("Nice", "06"), ("Rennes", "35"),
+    ("Dijon", "21"), ("Annecy", "74"), ("Tours", "37"), ("Reims", "51"), ("Saint-Étienne", "42"),
+    ("Clermont-Ferrand", "63"), ("Aix-en-Provence", "13"), ("Villeurbanne", "69"), ("Brest", "29"),
+    ("Pau", "64"), ("Perpignan", "66"), ("Besançon", "25"), ("Metz", "57"), ("Caen", "14")
+]
+FIRST_NAMES = ["Éric", "Hélène", "Jean-François", "Zoé", "Rémi", "Agnès", "Loïc", "Maëlle", "Noël",
+               "Céline", "Pierre", "Anne", "Luc", "Marie", "Paul", "Claire", "Thierry", "Sophie"]
+LAST_NAMES = ["Lefèvre", "Dubois", "Mercier", "Hévin", "Roger", "Quatrehomme", "Brys", "Larher",
+              "Chaussée", "Martin", "Bernard", "Petit", "Durand", "Leroy", "Moreau", "Fournier"]
+
+def synthetic_entries(count: int, seed: int = 42) -> List[Dict]:
+    """Attributs data-* de `count` entrées d'annuaire (noms, métiers, villes et départements plausibles)"""
+    rng = random.Random(seed)
+    names, weights = zip(*SPECIALTIES)
+    entries = []
+    for i in range(count):
+        city, department = rng.choice(CITIES)
+        entries.append({
+            "data-nom": f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES).upper()} {i}",
+            "data-metier": rng.choices(names, weights)[0],
+            "data-ville": city,
+            "data-departement": department
+        })
+    return entries
+
+def synthetic_listing(entries: List[Dict]) -> str:
+    """Page d'annuaire : en-tête, ul#sort-me de li.item-gallery, bouton #loadMore"""
+    items = []
+    for i, attrs in enumerate(entries):
+        data = " ".join(f'{name}="{escape(value)}"' for name, value in attrs.items())
+        items.append(
+            f'<li class="item-gallery col-md-3" {data}>'
+            f'<a href="/mof/{i}"><img src="/media/mof/{i}.jpg" alt="{escape(attrs["data-nom"])}"></a>'
+            f'<div class="caption"><h3>{escape(attrs["data-nom"])}</h3>'
+            f'<p>{escape(attrs["data-metier"])} — {escape(attrs["data-ville"])}</p></div></li>'
+        )
+    nav = "".join(f'<li><a href="/rubrique/{i}">Rubrique {i}</a></li>' for i in range(120))
+    return (f'<!DOCTYPE html><html><head><title>Annuaire des MOF</title>'
+            f'<script>var filtres = "<li class=item-gallery>";</script></head>'
+            f'<body><nav><ul>{nav}</ul></nav><main><ul id="sort-me">{"".join(items)}</ul>'
+            f'<button id="loadMore" data-url="/annuaire-mof/load?page=2">Charger plus</button>'
+            f'</main></body></html>')
+
+class ServerRateLimit:
+    """Seau de jetons non bloquant : au-delà du débit, le serveur répond 429"""
+
+    def __init__(self, rate: float, capacity: float = 1.0):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.last = time.monotonic()
+        self.lock = threading.Lock()
+
+    def allow(self) -> bool:
+        if not self.rate:
+            return True
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.last) * self.rate)
+            self.last = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return True
+            return False
+
+def nominatim_answer(query: str, not_found: float = 0.05) -> List[Dict]:
+    """Réponse déterministe (hachage de l'adresse) : un point en France métropolitaine, ou rien"""
+    digest = hashlib.sha1(query.encode("utf-8")).digest()
+    if digest[0] / 255 < not_found:
+        return []
+    lat = 42.5 + 8.5 * int.from_bytes(digest[1:5], "big") / 2 ** 32
+    lon = -4.5 + 12.5 * int.from_bytes(digest[5:9], "big") / 2 ** 32
+    return [{"lat": f"{lat:.7f}", "lon": f"{lon:.7f}", "display_name": query}]
+
+class FakeNominatim:
+    """
+    Serveur HTTP local répondant comme /search de Nominatim (format=json)
+    Réponses de nominatim_answer() (~5 % d'adresses introuvables) ;
+    `latency` secondes par réponse, `rate` requêtes/s au plus (0 : pas de limite)
+    """
+
+    def __init__(self, latency: float = 0.05, rate: float = 0.0, not_found: float = 0.05):
+        self.latency = latency
+        self.limit = ServerRateLimit(rate)
+        self.not_found = not_found
+        self.stats = {"requests": 0, "limited": 0}
+        self.stats_lock = threading.Lock()
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                fake.handle(self)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server.server_address[1]}/search"
+
+    def handle(self, request: BaseHTTPRequestHandler):
+        with self.stats_lock:
+            self.stats["requests"] += 1
+        if not self.limit.allow():
+            with self.stats_lock:
+                self.stats["limited"] += 1
+            request.send_response(429)
+            request.send_header("Retry-After", "1")
+            request.send_header("Content-Length", "0")
+            request.end_headers()
+            return
+        time.sleep(self.latency)
+        query = parse_qs(urlparse(request.path).query).get("q", [""])[0]
+        body = json.dumps(nominatim_answer(query, self.not_found)).encode("utf-8")
+        request.send_response(200)
+        request.send_header("Content-Type", "application/json")
+        request.send_header("Content-Length", str(len(body)))
+        request.end_headers()
+        request.wfile.write(body)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+def best_of(function: Callable, repeat: int) -> Tuple[float, object]:
+    """Meilleur temps sur `repeat` exécutions, et résultat de la dernière"""
+    best, result = None, None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+def measure(seconds: float, items: int, **extra) -> Dict:
+    return {"seconds": round(seconds, 6), "items": items,
+            "per_second": round(items / seconds, 1) if seconds else None, **extra}
+
+def bench_parse(entries: List[Dict], repeat: int) -> Dict:
+    html = synthetic_listing(entries)
+    parse_time, parser = best_of(lambda: parse_listing_html(html), repeat)
+    if len(parser.entries) != len(entries) or not parser.load_more:
+        raise RuntimeError("L'analyse de l'annuaire synthétique n'a pas retrouvé toutes les entrées")
+    build_time, mof_list = best_of(lambda: build_mof_list(parser.entries), repeat)
+    return {
+        "listing": measure(parse_time, len(entries), kilobytes=round(len(html.encode("utf-8")) / 1024)),
+        "build": measure(build_time, len(entries), records=len(mof_list))
+    }
+
+def bench_classify(entries: List[Dict], repeat: int) -> Dict:
+    specialties = [attrs["data-metier"] for attrs in entries]
+
+    def cold():
+        classify.cache_clear()
+        return sum(1 for s in specialties if is_food_category(s))
+
+    cold_time, food = best_of(cold, repeat)
+    warm_time, _ = best_of(lambda: sum(1 for s in specialties if is_food_category(s)), repeat)
+    return {
+        "cold": measure(cold_time, len(specialties), food=food),
+        "warm": measure(warm_time, len(specialties))
+    }
+
+def bench_geocode(entries: List[Dict], count: int, latency: float, server_rate: float,
+                  client_rate: float, concurrency: int) -> Dict:
+    addresses = [f"{i} rue de la République, {attrs['data-ville']} {attrs['data-departement']}"
+                 for i, attrs in enumerate(entries[:count])]
+    # Index BAN hors-ligne et cache du projet écartés : seuls le client HTTP et le serveur local comptent
+    geocoding._offline_index = False
+    with FakeNominatim(latency, server_rate) as server, tempfile.TemporaryDirectory() as tmp:
+        provider = geocoding.NominatimProvider(base_url=server.url, rate=client_rate, concurrency=concurrency)
+        geocoding.configure_geocoder([provider])
+        cache = GeocodeCache(os.path.join(tmp, "cache.sqlite"))
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            results = geocoding.geocode_addresses(addresses, cache)
+            online = time.perf_counter() - start
+            start = time.perf_counter()
+            geocoding.geocode_addresses(addresses, cache)
+            cached = time.perf_counter() - start
+        cache.close()
+        provider.client.close()
+    return {
+        "online": measure(online, len(addresses), found=sum(1 for c in results if c["lat"] is not None),
+                          requests=server.stats["requests"], rate_limited=server.stats["limited"],
+                          retries=provider.client.stats["retries"]),
+        "cached": measure(cached, len(addresses))
+    }
+
+def synthetic_data(entries: List[Dict]) -> Dict:
+    mof_list = build_mof_list(entries)
+    for mof in mof_list:
+        found = nominatim_answer(mof["address"] or "")
+        mof["coordinates"] = ({"lat": float(found[0]["lat"]), "lon": float(found[0]["lon"])}
+                              if found else {"lat": None, "lon": None})
+    return {"meta": {"total": len(mof_list), "generated_at": "2026-01-01 00:00:00", "source": "benchmark"},
+            "mof": mof_list}
+
+def bench_publish(entries: List[Dict]) -> Dict:
+    data = synthetic_data(entries)
+    with tempfile.TemporaryDirectory() as tmp:
+        site_dir = os.path.join(tmp, "public")
+        os.makedirs(site_dir)
+        data_path = os.path.join(tmp, "mof-data.json")
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            written = publish_data(data, data_path, [site_dir])
+            first = time.perf_counter() - start
+            start = time.perf_counter()
+            rewritten = publish_data(data, data_path, [site_dir])
+            unchanged = time.perf_counter() - start
+        size = sum(os.path.getsize(path) for path in written if os.path.exists(path))
+    return {
+        "first": measure(first, len(data["mof"]), files=sum(written.values()), kilobytes=round(size / 1024)),
+        "unchanged": measure(unchanged, len(data["mof"]), files=sum(rewritten.values()))
+    }
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def flatten(results: Dict) -> Dict[str, Dict]:
+    """{"parse": {"listing": {...}}} → {"parse.listing": {...}}"""
+    return {f"{bench}.{name}": values for bench, group in results.items() for name, values in group.items()}
+
+def report(results: Dict):
+    rows = list(flatten(results).items())
+    for position, (name, values) in enumerate(rows):
+        prefix = "└─" if position == len(rows) - 1 else "├─"
+        extra = ", ".join(f"{k}={v}" for k, v in values.items() if k not in ("seconds", "items", "per_second"))
+        print(f"{prefix} {name}: {values['seconds'] * 1000:.1f} ms pour {values['items']} "
+              f"({values['per_second']}/s){f' — {extra}' if extra else ''}")
+
+def compare(old_path: str, new_path: str) -> bool:
+    """Affiche l'évolution de chaque mesure ; False si l'une s'est dégradée au-delà du seuil"""
+    with open(old_path, 'r', encoding='utf-8') as f:
+        old = json.load(f)
+    with open(new_path, 'r', encoding='utf-8') as f:
+        new = json.load(f)
+    print(f"📊 {old['meta'].get('commit') or old_path} → {new['meta'].get('commit') or new_path}")
+    before, after = flatten(old["results"]), flatten(new["results"])
+    common = [name for name in after if name in before]
+    ok = True
+    for position, name in enumerate(common):
+        prefix = "└─" if position == len(common) - 1 else "├─"
+        a, b = before[name]["seconds"], after[name]["seconds"]
+        ratio = b / a if a else 1.0
+        slower = ratio > REGRESSION_THRESHOLD and before[name]["items"] == after[name]["items"]
+        ok = ok and not slower
+        print(f"{prefix} {'⚠' if slower else '✓'} {name}: {a * 1000:.1f} → {b * 1000:.1f} ms (x{ratio:.2f})")
+    for name in sorted(set(before) ^ set(after)):
+        print(f"   (mesure présente d'un seul côté : {name})")
+    return ok
+
+def option(name: str, default):
+    if name in sys.argv:
+        return type(default)(sys.argv[sys.argv.index(name) + 1])
+    return default
+
+def main():
+    if "--compare" in sys.argv:
+        position = sys.argv.index("--compare")
+        sys.exit(0 if compare(sys.argv[position + 1], sys.argv[position + 2]) else 1)
+
+    options = {
+        "size": option("--size", 5000),
+        "geocode": option("--geocode", 100),
+        "latency_ms": option("--latency", 50.0),
+        "server_rate": option("--server-rate", 0.0),
+        "client_rate": option("--client-rate", 20.0),
+        "concurrency": option("--concurrency", 4),
+        "repeat": option("--repeat", 3),
+        "seed": option("--seed", 42)
+    }
+    selected = option("--only", ",".join(BENCHMARKS)).split(",")
+    unknown = [name for name in selected if name not in BENCHMARKS]
+    if unknown:
+        sys.exit(f"❌ Benchmarks inconnus: {', '.join(unknown)} (disponibles: {', '.join(BENCHMARKS)})")
+
+    entries = synthetic_entries(options["size"], options["seed"])
+    print(f"📊 Annuaire synthétique: {len(entries)} entrées ({', '.join(selected)})")
+
+    results = {}
+    if "parse" in selected:
+        results["parse"] = bench_parse(entries, options["repeat"])
+    if "classify" in selected:
+        results["classify"] = bench_classify(entries, options["repeat"])
+    if "geocode" in selected:
+        results["geocode"] = bench_geocode(entries, options["geocode"], options["latency_ms"] / 1000,
+                                           options["server_rate"], options["client_rate"],
+                                           options["concurrency"])
+    if "publish" in selected:
+        results["publish"] = bench_publish(entries)
+    report(results)
+
+    commit = git_commit()
+    output = option("--output", os.path.join(RESULTS_DIR, f"{time.strftime('%Y%m%d-%H%M%S')}-{commit or 'local'}.json"))
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump({
+            "meta": {"date": time.strftime("%Y-%m-%d %H:%M:%S"), "commit": commit,
+                     "python": platform.python_version(), "machine": platform.machine(), "options": options},
+            "results": results
+        }, f, ensure_ascii=False, indent=2)
+    print(f"\n💾 Résultats: {output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Fabrique de navigateurs Chrome headless partagée par les scrapers Selenium
+- profil allégé : images, polices, médias et traqueurs bloqués via CDP (Network.setBlockedURLs)
+- stratégie de chargement "eager" : on n'attend pas les sous-ressources
+- navigateur "chaud" réutilisé d'une phase à l'autre dans un même processus
+
+Comparer le profil allégé au profil complet :
+    python3 browser.py [nombre de chargements]
+"""
+
+import atexit
+import sys
+import time
+
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+
+from waits import TIMINGS, count_greater_than, timed_wait
+
+DIRECTORY_URL = "https://www.meilleursouvriersdefrance.info/annuaire-mof"
+USER_AGENT = "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36"
+
+# Seuls les attributs du DOM sont lus : ces ressources ne servent à rien
+BLOCKED_URL_PATTERNS = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.avif", "*.svg", "*.ico",
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot",
+    "*.mp4", "*.webm", "*.mp3",
+    "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*",
+    "*facebook.net*", "*hotjar.com*", "*gc.zgo.at*"
+]
+
+# Les feuilles de style ne sont pas bloquées par défaut : les tests is_displayed()
+# (bouton "Charger plus", modales) dépendent du CSS
+BLOCK_STYLESHEETS = False
+STYLESHEET_PATTERNS = ["*.css"]
+
+_warm_driver = None
+
+def build_options(lean: bool = True) -> Options:
+    """Options Chrome headless ; `lean` active le profil allégé"""
+    chrome_options = Options()
+    chrome_options.add_argument('--headless')  # Mode sans interface
+    chrome_options.add_argument('--no-sandbox')
+    chrome_options.add_argument('--disable-dev-shm-usage')
+    chrome_options.add_argument('--disable-gpu')
+    chrome_options.add_argument('--window-size=1920,1080')
+    chrome_options.add_argument(f'--user-agent={USER_AGENT}')
+
+    if lean:
+        chrome_options.page_load_strategy = "eager"
+        chrome_options.add_argument('--blink-settings=imagesEnabled=false')
+        chrome_options.add_argument('--disable-extensions')
+        chrome_options.add_argument('--disable-background-networking')
+        chrome_options.add_experimental_option("prefs", {
+            "profile.managed_default_content_settings.images": 2,
+            "profile.default_content_setting_values.notifications": 2
+        })
+    return chrome_options
+
+def block_resources(driver):
+    """Bloque les ressources inutiles au niveau réseau (Chrome DevTools Protocol)"""
+    patterns = BLOCKED_URL_PATTERNS + (STYLESHEET_PATTERNS if BLOCK_STYLESHEETS else [])
+    driver.execute_cdp_cmd("Network.enable", {})
+    driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": patterns})
+
+def new_driver(lean: bool = True):
+    """Démarre un nouveau navigateur (None en cas d'échec)"""
+    start = time.perf_counter()
+    try:
+        driver = webdriver.Chrome(options=build_options(lean))
+    except Exception as e:
+        print(f"❌ Erreur lors de l'initialisation du driver Chrome: {e}")
+        print("\n💡 Solutions:")
+        print("1. Installer ChromeDriver: brew install chromedriver")
+        print("2. Ou installer Chrome for Testing: https://googlechromelabs.github.io/chrome-for-testing/")
+        print("3. Vérifier que Chrome est installé")
+        return None
+
+    if lean:
+        try:
+            block_resources(driver)
+        except Exception as e:
+            print(f"⚠ Blocage des ressources indisponible: {e}")
+
+    TIMINGS.record("driver_start", time.perf_counter() - start)
+    return driver
+
+def is_alive(driver) -> bool:
+    try:
+        driver.current_url
+        return True
+    except Exception:
+        return False
+
+def get_driver():
+    """Retourne le navigateur chaud du processus, démarré au premier appel"""
+    global _warm_driver
+    if _warm_driver is not None and not is_alive(_warm_driver):
+        discard_driver(_warm_driver)
+    if _warm_driver is None:
+        _warm_driver = new_driver()
+    return _warm_driver
+
+def release_driver(driver):
+    """Fin d'utilisation : le navigateur chaud reste ouvert, les autres sont fermés"""
+    if driver is not None and driver is not _warm_driver:
+        driver.quit()
+
+def discard_driver(driver):
+    """Ferme un navigateur planté (y compris le navigateur chaud)"""
+    global _warm_driver
+    if driver is _warm_driver:
+        _warm_driver = None
+    try:
+        driver.quit()
+    except Exception:
+        pass
+
+@atexit.register
+def quit_driver():
+    """Ferme le navigateur chaud en fin de processus"""
+    global _warm_driver
+    if _warm_driver is not None:
+        discard_driver(_warm_driver)
+
+def benchmark(runs: int = 3):
+    """Compare le temps de démarrage et de chargement de l'annuaire, profil complet vs allégé"""
+    for lean in (False, True):
+        label = "allégé" if lean else "complet"
+        startups, loads = [], []
+        for _ in range(runs):
+            start = time.perf_counter()
+            driver = new_driver(lean)
+            if driver is None:
+                return
+            startups.append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            driver.get(DIRECTORY_URL)
+            timed_wait(driver, f"bench_{label}", count_greater_than("ul#sort-me li.item-gallery", 0), timeout=30)
+            loads.append(time.perf_counter() - start)
+            driver.quit()
+
+        print(f"⏱ Profil {label}: démarrage {sum(startups) / runs:.2f}s, "
+              f"chargement annuaire {sum(loads) / runs:.2f}s (moyenne sur {runs})")
+
+if __name__ == "__main__":
+    benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 3)
@@ -3,18 +3,20 @@
 Script pour nettoyer les adresses fictives et ne garder que les vraies
 """
 
+import csv
 import json
+from typing import Set
 
-# Liste des MOF avec vraies adresses vérifiées
-REAL_ADDRESSES = [
-    "Michel Fouchereau", "Frédéric Lalos", "Jean-Paul Hévin",
-    "Laurent Duchêne", "Patrick Roger", "Nicolas Cloiseau",
-    "Frank Kestener", "Emmanuel Ryon", "David Wesmaël",
-    "Arnaud Nicolas", "Marie Quatrehomme", "Eric Lefebvre",
-    "Arnaud Vanhamme", "Laurent DUBOIS", "Romain LEBOEUF",
-    "Arnaud LARHER", "Yann BRYS", "Laurent Dubois",
-    "Romain Leboeuf", "Arnaud Larher", "Yann Brys"
-]
+from corrections import Patcher
+from entities import name_key
+from publish import publish_data
+
+# MOF dont l'adresse a été vérifiée (une colonne "name", casse et accents ignorés)
+VERIFIED_PATH = "../data/verified-addresses.csv"
+
+def verified_names(path: str = VERIFIED_PATH) -> Set[str]:
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        return {name_key(row["name"]) for row in csv.DictReader(f)}
 
 def main():
     print("=== Nettoyage des adresses fictives ===\n")
@@ -26,18 +28,13 @@ def main():
     mof_list = data['mof']
     print(f"📊 MOF avant nettoyage: {len(mof_list)}")
 
-    # Nettoyer les adresses
-    cleaned = 0
+    # Nettoyer les adresses : celles qui n'ont pas été vérifiées sont retirées avec leurs coordonnées
+    verified = verified_names()
+    patcher = Patcher(mof_list)
     for mof in mof_list:
-        # Si c'est une vraie adresse vérifiée, on garde
-        if mof['name'] in REAL_ADDRESSES:
-            continue
-
-        # Sinon, on supprime l'adresse et les coordonnées
-        if mof.get('address'):
-            mof['address'] = None
-            mof['coordinates'] = {"lat": None, "lon": None}
-            cleaned += 1
+        if mof.get('address') and name_key(mof['name']) not in verified:
+            patcher.apply({"op": "invalidate", "id": mof['id']}, VERIFIED_PATH)
+    cleaned = patcher.stats["invalidate"]
 
     print(f"✓ {cleaned} adresses fictives supprimées")
     print(f"✓ {len(mof_list) - cleaned} vraies adresses conservées")
@@ -45,15 +42,9 @@ def main():
     # Mettre à jour les métadonnées
     data['meta']['note'] = "Seules les adresses vérifiées sont incluses"
 
-    # Sauvegarder
-    with open("../data/mof-data.json", 'w', encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
-    print(f"\n✓ Données sauvegardées dans ../data/mof-data.json")
-
-    # Copier dans public/
-    with open("../public/data.json", 'w', encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
-    print(f"✓ Données copiées dans ../public/data.json")
+    # Sauvegarder et publier
+    print()
+    publish_data(data)
 
     # Stats
     with_address = sum(1 for m in mof_list if m.get('address'))
@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+"""
+Application en masse des corrections manuelles (data/corrections/*.jsonl, *.csv)
+Une ligne par correction, appliquées dans l'ordre des fichiers (triés par nom) :
+- op : insert (ajout si l'artisan est absent), update (modification des enregistrements
+  trouvés), upsert (modification, ou ajout si absent), invalidate (adresse et coordonnées
+  retirées : adresse fictive ou périmée)
+- enregistrements visés : "id", sinon "name" (clé de nom de entities.py, casse et accents
+  ignorés) et, pour viser une seule boutique d'un artisan, "match_address"
+- champs : name, specialty, address, year, website
+  JSONL : un champ absent reste inchangé, null l'efface ; CSV : une cellule vide reste inchangée
+
+Les données sont indexées une fois (id, clé de nom), chaque correction coûte ensuite un
+accès au dictionnaire. Seuls les enregistrements dont l'adresse a réellement changé
+perdent leurs coordonnées et sont mis en file pour le géocodage.
+
+    python3 corrections.py [fichiers...]       # applique, géocode et publie data/mof-data.json
+    python3 corrections.py --bench [nombre]    # N corrections sur 100 000 MOF synthétiques
+"""
+
+import csv
+import glob
+import json
+import os
+import random
+import sys
+import time
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from entities import name_key
+from geocache import normalize_address
+from taxonomy import classify
+
+CORRECTIONS_DIR = "../data/corrections"
+FIELDS = ["name", "specialty", "address", "year", "website"]
+OPERATIONS = ["insert", "update", "upsert", "invalidate"]
+
+class CorrectionError(Exception):
+    pass
+
+def correction_files(directory: str = CORRECTIONS_DIR) -> List[str]:
+    return sorted(glob.glob(os.path.join(directory, "*.jsonl")) + glob.glob(os.path.join(directory, "*.csv")))
+
+def read_corrections(path: str) -> Iterator[Tuple[int, Dict]]:
+    """
+    (numéro de ligne, correction) d'un fichier JSONL ou CSV (cellules vides ignorées, année
+    et id convertis en entiers) ; une ligne illisible est signalée et ignorée
+    """
+    name = os.path.basename(path)
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        if path.endswith(".csv"):
+            reader = csv.DictReader(f)
+            for row in reader:
+                row = {k: v.strip() for k, v in row.items() if k and v and v.strip()}
+                try:
+                    for field in ("year", "id"):
+                        if row.get(field):
+                            row[field] = int(row[field])
+                except ValueError:
+                    print(f"  ⚠ {name}:{reader.line_num}: {field} invalide \"{row[field]}\", ligne ignorée")
+                    continue
+                yield reader.line_num, row
+        else:
+            for line_number, line in enumerate(f, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    correction = json.loads(line)
+                except ValueError as e:
+                    print(f"  ⚠ {name}:{line_number}: JSON invalide ({e}), ligne ignorée")
+                    continue
+                yield line_number, correction
+
+class Patcher:
+    """Index des données (id, clé de nom) et application des corrections sur place"""
+
+    def __init__(self, mof_list: List[Dict]):
+        self.mof_list = mof_list
+        self.by_id: Dict[int, Dict] = {}
+        self.by_name: Dict[str, List[Dict]] = {}
+        for mof in mof_list:
+            self.index(mof)
+        self.next_id = max(self.by_id, default=0) + 1
+        self.to_geocode: Dict[int, Dict] = {}
+        self.stats = {op: 0 for op in OPERATIONS}
+        self.stats.update({"unchanged": 0, "skipped": 0})
+
+    def index(self, mof: Dict):
+        self.by_id[mof["id"]] = mof
+        self.by_name.setdefault(name_key(mof.get("name")), []).append(mof)
+
+    def rename(self, mof: Dict, name: Optional[str]):
+        """Nouveau nom : l'enregistrement passe sous sa nouvelle clé de nom"""
+        old_key, new_key = name_key(mof.get("name")), name_key(name)
+        mof["name"] = name
+        if new_key == old_key:
+            return
+        # Nouvelle liste plutôt que remove() : apply() parcourt peut-être l'ancienne
+        remaining = [m for m in self.by_name.get(old_key, []) if m is not mof]
+        if remaining:
+            self.by_name[old_key] = remaining
+        else:
+            self.by_name.pop(old_key, None)
+        self.by_name.setdefault(new_key, []).append(mof)
+
+    def find(self, correction: Dict) -> List[Dict]:
+        if correction.get("id") is not None:
+            mof = self.by_id.get(correction["id"])
+            return [mof] if mof else []
+        matches = self.by_name.get(name_key(correction.get("name")), [])
+        if correction.get("match_address"):
+            target = normalize_address(correction["match_address"])
+            matches = [m for m in matches if normalize_address(m.get("address")) == target]
+        return matches
+
+    def set_address(self, mof: Dict, address: Optional[str]):
+        """Nouvelle adresse : coordonnées effacées et géocodage demandé, sauf si l'adresse est la même"""
+        if normalize_address(address) == normalize_address(mof.get("address")):
+            mof["address"] = address
+            return
+        mof["address"] = address
+        mof["coordinates"] = {"lat": None, "lon": None}
+        if address:
+            self.to_geocode[mof["id"]] = mof
+        else:
+            self.to_geocode.pop(mof["id"], None)
+
+    def update(self, mof: Dict, correction: Dict, allow_address: bool = True) -> bool:
+        changed = False
+        for field in FIELDS:
+            if field not in correction or mof.get(field) == correction[field]:
+                continue
+            if field == "address":
+                if not allow_address:
+                    continue
+                self.set_address(mof, correction[field])
+            elif field == "name":
+                self.rename(mof, correction[field])
+            else:
+                mof[field] = correction[field]
+                if field == "specialty":
+                    mof["category"] = classify(mof["specialty"])
+            changed = True
+        return changed
+
+    def insert(self, correction: Dict) -> Dict:
+        if not correction.get("name") or not correction.get("specialty"):
+            raise CorrectionError(f"ajout sans nom ou spécialité : {correction}")
+        mof = {
+            "id": self.next_id,
+            "name": correction["name"],
+            "specialty": correction["specialty"],
+            "category": classify(correction["specialty"]),
+            "address": None,
+            "year": correction.get("year"),
+            "website": correction.get("website"),
+            "coordinates": {"lat": None, "lon": None}
+        }
+        self.set_address(mof, correction.get("address"))
+        self.next_id += 1
+        self.mof_list.append(mof)
+        self.index(mof)
+        return mof
+
+    def apply(self, correction: Dict, source: str = "") -> str:
+        """Applique une correction ; retourne l'opération effectuée (ou "unchanged", "skipped")"""
+        op = correction.get("op", "upsert")
+        if op not in OPERATIONS:
+            raise CorrectionError(f"{source}: opération inconnue \"{op}\"")
+        matches = self.find(correction)
+
+        if op == "insert" or (op == "upsert" and not matches):
+            if matches:
+                outcome = "skipped"
+            else:
+                self.insert(correction)
+                outcome = "insert"
+        elif not matches:
+            print(f"  ⚠ {source}: aucun enregistrement pour {correction.get('name') or correction.get('id')}")
+            outcome = "skipped"
+        elif op == "invalidate":
+            changed = False
+            for mof in matches:
+                if mof.get("address") or (mof.get("coordinates") or {}).get("lat") is not None:
+                    self.set_address(mof, None)
+                    mof["coordinates"] = {"lat": None, "lon": None}
+                    changed = True
+            outcome = "invalidate" if changed else "unchanged"
+        else:
+            # Une même adresse pour toutes les boutiques d'un artisan n'a pas de sens : match_address requis
+            ambiguous = "address" in correction and len(matches) > 1
+            if ambiguous:
+                print(f"  ⚠ {source}: {len(matches)} boutiques pour {correction.get('name')}, "
+                      f"adresse ignorée (préciser match_address)")
+            changed = False
+            for mof in matches:
+                changed = self.update(mof, correction, allow_address=not ambiguous) or changed
+            outcome = op if changed else "unchanged"
+
+        self.stats[outcome] += 1
+        return outcome
+
+    def report(self):
+        s = self.stats
+        print(f"✏ Corrections: {s['insert']} ajouts, {s['update'] + s['upsert']} modifications, "
+              f"{s['invalidate']} adresses retirées, {s['unchanged']} sans effet, {s['skipped']} ignorées ; "
+              f"{len(self.to_geocode)} adresses à géocoder")
+
+def apply_corrections(mof_list: List[Dict], paths: Optional[List[str]] = None) -> Patcher:
+    """Applique les fichiers de corrections (tous ceux de data/corrections/ par défaut) sur place"""
+    patcher = Patcher(mof_list)
+    for path in correction_files() if paths is None else paths:
+        for line_number, correction in read_corrections(path):
+            patcher.apply(correction, f"{os.path.basename(path)}:{line_number}")
+    return patcher
+
+def benchmark(corrections: int = 5000, records: int = 100000, seed: int = 42):
+    """Temps d'application de N corrections (un tiers d'ajouts, un tiers de modifications, un tiers d'adresses)"""
+    rng = random.Random(seed)
+    mof_list = [{
+        "id": i + 1,
+        "name": f"Artisan {i}",
+        "specialty": rng.choice(["Boulanger", "Fromager", "Pâtissier", "Boucher"]),
+        "address": f"{i} rue du Marché, 75001 Paris",
+        "year": 2000,
+        "website": None,
+        "coordinates": {"lat": 48.86, "lon": 2.34}
+    } for i in range(records)]
+    rows = []
+    for i in range(corrections):
+        kind = i % 3
+        if kind == 0:
+            rows.append({"op": "insert", "name": f"Nouvel artisan {i}", "specialty": "Glacier",
+                         "address": f"{i} avenue Foch, 75016 Paris"})
+        elif kind == 1:
+            rows.append({"op": "update", "name": f"ARTISAN {rng.randrange(records)}", "website": "https://example.fr"})
+        else:
+            target = rng.randrange(records)
+            rows.append({"op": "update", "id": target + 1, "address": f"{target} rue du Marché, 75002 Paris"})
+
+    start = time.perf_counter()
+    patcher = Patcher(mof_list)
+    indexed = time.perf_counter() - start
+    for row in rows:
+        patcher.apply(row, "bench")
+    elapsed = time.perf_counter() - start
+
+    print(f"📊 {corrections} corrections sur {records} MOF en {elapsed * 1000:.0f} ms "
+          f"(dont indexation {indexed * 1000:.0f} ms)")
+    print(f"└─ {len(patcher.to_geocode)} adresses à géocoder")
+
+def main():
+    if "--bench" in sys.argv:
+        args = [a for a in sys.argv[1:] if a != "--bench"]
+        benchmark(int(args[0]) if args else 5000)
+        return
+
+    from geocoding import geocode_addresses, report_geocode_stats
+    from publish import publish_data
+
+    with open("../data/mof-data.json", 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    paths = sys.argv[1:] or correction_files()
+    print(f"📊 {len(data['mof'])} MOF, {len(paths)} fichiers de corrections")
+
+    patcher = apply_corrections(data["mof"], paths)
+    patcher.report()
+
+    queued = list(patcher.to_geocode.values())
+    if queued:
+        print(f"\n📍 Géocodage de {len(queued)} adresses...")
+        for mof, coords in zip(queued, geocode_addresses([mof["address"] for mof in queued])):
+            mof["coordinates"] = coords
+
+    data["meta"]["total"] = len(data["mof"])
+    print()
+    publish_data(data)
+    report_geocode_stats()
+
+if __name__ == "__main__":
+    main()
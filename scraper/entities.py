@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Résolution des artisans : regroupe les enregistrements d'une même personne
+("LAURENT DUBOIS" et "Laurent Dubois", trois boutiques = trois enregistrements)
+Les candidats sont regroupés par clé de nom normalisée (casse, accents, ponctuation,
+ordre des mots, précision entre parenthèses). Dans un bloc, deux enregistrements
+désignent la même personne s'ils partagent une catégorie de la taxonomie
+("Pâtissier-Chocolatier" et "Chocolatier"). Tout se fait en un parcours, sans
+comparaison des paires.
+
+Identifiants stables (dérivés du contenu, indépendants de l'ordre des enregistrements) :
+- person_id : clé de nom (+ première catégorie, si plusieurs personnes portent ce nom)
+- shop_id : person_id + adresse normalisée
+
+Afficher les regroupements des données publiées, ou mesurer sur N enregistrements synthétiques :
+    python3 entities.py [fichier.json]
+    python3 entities.py --bench [nombre]
+"""
+
+import hashlib
+import json
+import random
+import re
+import sys
+import time
+from functools import lru_cache
+from typing import Dict, List, Optional
+
+from geocache import normalize_address
+from taxonomy import classify_all
+
+@lru_cache(maxsize=65536)
+def normalize_word(word: str) -> str:
+    """normalize_address() mot par mot : prénoms et noms se répètent, le cache évite de les renormaliser"""
+    return normalize_address(word)
+
+def name_key(name: Optional[str]) -> str:
+    """Clé de blocage : mots du nom normalisés et triés, sans la précision entre parenthèses"""
+    name = name or ""
+    if "(" in name:
+        name = re.sub(r"\s*\(.*?\)", "", name)
+    return " ".join(sorted(part for word in name.split() for part in normalize_word(word).split()))
+
+def stable_id(prefix: str, *parts: str) -> str:
+    return f"{prefix}-" + hashlib.sha1("\x1f".join(parts).encode("utf-8")).hexdigest()[:10]
+
+def display_name(names: List[str]) -> str:
+    """Graphie la plus fréquente, en préférant une casse mixte à un nom tout en majuscules"""
+    counts = {}
+    for name in names:
+        counts[name] = counts.get(name, 0) + 1
+    return max(sorted(counts), key=lambda n: (n != n.upper(), "(" not in n, counts[n]))
+
+class UnionFind:
+    def __init__(self, size: int):
+        self.parent = list(range(size))
+
+    def find(self, i: int) -> int:
+        while self.parent[i] != i:
+            self.parent[i] = self.parent[self.parent[i]]
+            i = self.parent[i]
+        return i
+
+    def union(self, a: int, b: int):
+        a, b = self.find(a), self.find(b)
+        if a != b:
+            self.parent[max(a, b)] = min(a, b)
+
+def resolve(mof_list: List[Dict]) -> List[Dict]:
+    """
+    Personnes et boutiques, dans l'ordre de première apparition :
+    [{"id", "name", "categories", "records", "shops": [{"id", "address", "records"}]}]
+    ("records" : id des enregistrements)
+    """
+    keys = [name_key(mof.get("name")) for mof in mof_list]
+    uf = UnionFind(len(mof_list))
+
+    # Blocage : dans un même nom, on fusionne les enregistrements qui partagent une catégorie
+    first_in_block: Dict[tuple, int] = {}
+    for position, mof in enumerate(mof_list):
+        categories = classify_all(mof.get("specialty")) or (normalize_address(mof.get("specialty")),)
+        for category in categories:
+            block = (keys[position], category)
+            if block in first_in_block:
+                uf.union(first_in_block[block], position)
+            else:
+                first_in_block[block] = position
+
+    clusters: Dict[int, List[int]] = {}
+    for position in range(len(mof_list)):
+        clusters.setdefault(uf.find(position), []).append(position)
+
+    homonyms: Dict[str, int] = {}
+    for root in clusters:
+        homonyms[keys[root]] = homonyms.get(keys[root], 0) + 1
+
+    persons = []
+    for members in clusters.values():
+        records = [mof_list[p] for p in members]
+        categories = list(dict.fromkeys(c for r in records for c in classify_all(r.get("specialty"))))
+        if homonyms[keys[members[0]]] > 1:
+            specialties = categories or [normalize_address(r.get("specialty")) for r in records]
+            person_id = stable_id("p", keys[members[0]], min(specialties))
+        else:
+            person_id = stable_id("p", keys[members[0]])
+
+        shops: Dict[str, Dict] = {}
+        for record in records:
+            address_key = normalize_address(record.get("address"))
+            shop = shops.setdefault(address_key, {
+                "id": stable_id("s", person_id, address_key),
+                "address": record.get("address"),
+                "records": []
+            })
+            shop["records"].append(record["id"])
+
+        persons.append({
+            "id": person_id,
+            "name": display_name([r.get("name") or "" for r in records]),
+            "categories": categories,
+            "records": [r["id"] for r in records],
+            "shops": list(shops.values())
+        })
+    return persons
+
+def annotate(mof_list: List[Dict]) -> List[Dict]:
+    """Ajoute person_id et shop_id à chaque enregistrement ; retourne les personnes"""
+    persons = resolve(mof_list)
+    by_id = {mof["id"]: mof for mof in mof_list}
+    for person in persons:
+        for shop in person["shops"]:
+            for record_id in shop["records"]:
+                by_id[record_id]["person_id"] = person["id"]
+                by_id[record_id]["shop_id"] = shop["id"]
+    return persons
+
+def report(persons: List[Dict], total: int):
+    grouped = [p for p in persons if len(p["records"]) > 1]
+    print(f"📊 {total} enregistrements → {len(persons)} artisans, "
+          f"{sum(len(p['shops']) for p in persons)} boutiques")
+    for position, person in enumerate(grouped):
+        prefix = "└─" if position == len(grouped) - 1 else "├─"
+        print(f"{prefix} {person['name']} ({', '.join(person['categories'])}): "
+              f"{len(person['records'])} enregistrements, {len(person['shops'])} boutiques")
+
+def synthetic_directory(count: int, rng: random.Random):
+    """
+    Enregistrements synthétiques et vérité terrain (personne de chaque enregistrement) :
+    variantes de casse, d'accents et d'ordre des mots, plusieurs boutiques par artisan
+    """
+    first = ["Éric", "Hélène", "Jean-François", "Zoé", "Rémi", "Agnès", "Loïc", "Maëlle", "Noël", "Céline",
+             "Pierre", "Anne", "Luc", "Marie", "Paul", "Claire"]
+    last = ["Lefèvre", "Dubois", "Mercier", "Hévin", "Roger", "Quatrehomme", "Brys", "Larher", "Chaussée"]
+    specialties = [("Boulanger",), ("Pâtissier-Chocolatier", "Chocolatier"), ("Fromager",),
+                   ("Poissonnier-Écailler", "Poissonnier"), ("Glacier",), ("Boucher",)]
+    records, truth = [], []
+    person = 0
+    while len(records) < count:
+        # Noms uniques par personne (suffixe numérique), pour que la vérité terrain soit sans ambiguïté
+        name = f"{rng.choice(first)} {rng.choice(last)} {person}"
+        variants = rng.choice(specialties)
+        for shop in range(rng.choice([1, 1, 1, 2, 3])):
+            for _ in range(rng.choice([1, 1, 2])):
+                spelled = rng.choice([name, name.upper(), normalize_address(name),
+                                      " ".join(reversed(name.split()))])
+                records.append({
+                    "id": len(records) + 1,
+                    "name": spelled,
+                    "specialty": rng.choice(variants),
+                    "address": f"{shop + 1} rue du Marché, 75001 Paris"
+                })
+                truth.append(person)
+        person += 1
+    return records[:count], truth[:count]
+
+def benchmark(count: int = 100000, seed: int = 42) -> bool:
+    rng = random.Random(seed)
+    records, truth = synthetic_directory(count, rng)
+
+    start = time.perf_counter()
+    persons = resolve(records)
+    elapsed = time.perf_counter() - start
+
+    found = {}
+    for person in persons:
+        for record_id in person["records"]:
+            found[record_id] = person["id"]
+    # Partition identique : chaque personne réelle ↔ exactement un groupe
+    pairs = {(truth[r["id"] - 1], found[r["id"]]) for r in records}
+    ok = len(pairs) == len({t for t, _ in pairs}) == len({f for _, f in pairs})
+
+    again = resolve(list(reversed(records)))
+    stable = {p["id"] for p in again} == {p["id"] for p in persons}
+
+    print(f"📊 {count} enregistrements résolus en {elapsed * 1000:.0f} ms → {len(persons)} artisans")
+    print(f"├─ {'✓' if ok else '❌'} Regroupements identiques à la vérité terrain ({len(set(truth))} personnes)")
+    print(f"└─ {'✓' if stable else '❌'} Identifiants stables quel que soit l'ordre des enregistrements")
+    return ok and stable
+
+def main():
+    if "--bench" in sys.argv:
+        args = [a for a in sys.argv[1:] if a != "--bench"]
+        sys.exit(0 if benchmark(int(args[0]) if args else 100000) else 1)
+
+    path = sys.argv[1] if len(sys.argv) > 1 else "../public/data.json"
+    with open(path, 'r', encoding='utf-8') as f:
+        mof_list = json.load(f)["mof"]
+    report(resolve(mof_list), len(mof_list))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Cache disque du géocodage, partagé par tous les scripts du scraper
+Stocke les coordonnées dans une base SQLite indexée par adresse normalisée
+"""
+
+import re
+import sqlite3
+import time
+import unicodedata
+from typing import Dict, Optional
+
+DEFAULT_CACHE_PATH = "../data/geocode-cache.sqlite"
+
+# Durées de validité (en secondes)
+POSITIVE_TTL = 180 * 24 * 3600  # Adresse trouvée : 6 mois
+NEGATIVE_TTL = 7 * 24 * 3600    # Adresse introuvable : 1 semaine
+
+def normalize_address(address: str) -> str:
+    """Normalise une adresse pour servir de clé de cache (casse, accents, ponctuation)"""
+    if not address:
+        return ""
+    text = address.lower()
+    if not text.isascii():  # Texte ASCII : ni décomposition ni diacritique à retirer
+        text = unicodedata.normalize("NFD", text)
+        text = "".join(c for c in text if unicodedata.category(c) != "Mn")
+    text = re.sub(r"[^\w]+", " ", text)
+    return " ".join(text.split())
+
+class GeocodeCache:
+    """Cache SQLite des résultats de géocodage (positifs et négatifs)"""
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH,
+                 ttl: int = POSITIVE_TTL, negative_ttl: int = NEGATIVE_TTL):
+        self.path = path
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.stats = {"hits": 0, "negative_hits": 0, "misses": 0, "expired": 0, "writes": 0}
+        self.conn = sqlite3.connect(path)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS geocode ("
+            " key TEXT PRIMARY KEY,"
+            " address TEXT,"
+            " lat REAL,"
+            " lon REAL,"
+            " created_at REAL NOT NULL)"
+        )
+        self.conn.commit()
+        # Les entrées expirées ne seraient plus jamais servies : retirées à l'ouverture
+        self.purged = self.purge_expired()
+
+    def get(self, address: str) -> Optional[Dict]:
+        """
+        Retourne les coordonnées en cache, ou None si l'adresse est absente ou expirée
+        Un résultat négatif en cache renvoie {"lat": None, "lon": None}
+        """
+        key = normalize_address(address)
+        row = self.conn.execute(
+            "SELECT lat, lon, created_at FROM geocode WHERE key = ?", (key,)
+        ).fetchone()
+
+        if row is None:
+            self.stats["misses"] += 1
+            return None
+
+        lat, lon, created_at = row
+        ttl = self.ttl if lat is not None else self.negative_ttl
+        if time.time() - created_at > ttl:
+            self.stats["expired"] += 1
+            self.stats["misses"] += 1
+            return None
+
+        if lat is None:
+            self.stats["negative_hits"] += 1
+        else:
+            self.stats["hits"] += 1
+        return {"lat": lat, "lon": lon}
+
+    def set(self, address: str, coords: Dict):
+        """Enregistre un résultat (lat/lon à None pour un résultat négatif)"""
+        self.conn.execute(
+            "INSERT OR REPLACE INTO geocode (key, address, lat, lon, created_at)"
+            " VALUES (?, ?, ?, ?, ?)",
+            (normalize_address(address), address, coords.get("lat"), coords.get("lon"), time.time())
+        )
+        self.conn.commit()
+        self.stats["writes"] += 1
+
+    def purge_expired(self) -> int:
+        """Supprime les entrées expirées et retourne leur nombre"""
+        now = time.time()
+        cursor = self.conn.execute(
+            "DELETE FROM geocode WHERE"
+            " (lat IS NOT NULL AND created_at < ?) OR (lat IS NULL AND created_at < ?)",
+            (now - self.ttl, now - self.negative_ttl)
+        )
+        self.conn.commit()
+        return cursor.rowcount
+
+    def report(self):
+        """Affiche les statistiques d'utilisation du cache"""
+        s = self.stats
+        lookups = s["hits"] + s["negative_hits"] + s["misses"]
+        if not lookups:
+            return
+        ratio = 100 * (s["hits"] + s["negative_hits"]) / lookups
+        print(f"\n📦 Cache géocodage ({self.path}):")
+        print(f"├─ Hits: {s['hits']} (+ {s['negative_hits']} négatifs)")
+        print(f"├─ Misses: {s['misses']} (dont {s['expired']} expirés)")
+        if self.purged:
+            print(f"├─ Entrées expirées supprimées à l'ouverture: {self.purged}")
+        print(f"└─ Taux de hit: {ratio:.0f}%")
+
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,422 @@
+#!/usr/bin/env python3
+"""
+Géocodage partagé par tous les scripts du scraper
+Index BAN hors-ligne (ban_index.py) si disponible, puis fournisseurs HTTP
+(Nominatim, Photon, API Adresse) derrière le cache disque de geocache.py
+
+Les fournisseurs se configurent avec la variable d'environnement MOF_GEOCODERS :
+    MOF_GEOCODERS="ban,nominatim,photon=http://localhost:2322/api"
+"""
+
+from abc import ABC, abstractmethod
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
+from email.utils import parsedate_to_datetime
+from typing import Dict, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from ban_index import DEFAULT_INDEX_PATH, BANIndex
+from geocache import GeocodeCache
+from metrics import METRICS
+
+NOMINATIM_URL = "https://nominatim.openstreetmap.org/search"
+NOMINATIM_RATE = 1.0  # Politique d'usage Nominatim : 1 requête/seconde
+USER_AGENT = "MOF-Guide-Scraper/3.0"
+
+_cache = None
+_geocoder = None
+_offline_index = None
+
+class GeocodingError(Exception):
+    """Aucun fournisseur n'a pu répondre (erreurs réseau ou délais dépassés)"""
+
+class TokenBucket:
+    """
+    Limiteur de débit à seau de jetons, partagé entre threads
+    Seules les requêtes réellement envoyées consomment un jeton
+    """
+
+    def __init__(self, rate: float, capacity: float = 1.0):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.last = time.monotonic()
+        self.paused_until = 0.0
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Bloque jusqu'à ce qu'un jeton soit disponible, puis le consomme"""
+        with self.lock:
+            while True:
+                now = time.monotonic()
+                if now < self.paused_until:
+                    self.sleep(self.paused_until - now, "retry_after")
+                    continue
+                self.tokens = min(self.capacity, self.tokens + (now - self.last) * self.rate)
+                self.last = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                self.sleep((1 - self.tokens) / self.rate, "rate_limit")
+
+    @staticmethod
+    def sleep(seconds: float, reason: str):
+        time.sleep(seconds)
+        METRICS.observe("sleep", seconds, reason=reason)
+
+    def pause(self, seconds: float):
+        """Suspend toutes les acquisitions pendant `seconds` (Retry-After)"""
+        with self.lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+            self.tokens = 0
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Interprète un en-tête Retry-After (secondes ou date HTTP)"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+class GeocodingClient:
+    """
+    Client HTTP de géocodage : session keep-alive, limiteur de débit
+    et relances avec backoff sur 429/503 et erreurs réseau
+    """
+
+    def __init__(self, base_url: str = NOMINATIM_URL, rate: float = NOMINATIM_RATE,
+                 max_retries: int = 3, backoff: float = 2.0, timeout: float = 10,
+                 pool_size: int = 4, name: str = "nominatim"):
+        self.base_url = base_url
+        self.name = name
+        self.limiter = TokenBucket(rate)
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.session.headers.update({"User-Agent": USER_AGENT})
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.stats = {"requests": 0, "retries": 0}
+
+    def get_json(self, params: Dict):
+        """Envoie une requête GET limitée en débit et retourne le JSON décodé"""
+        for attempt in range(self.max_retries + 1):
+            delay = self.backoff * (2 ** attempt)
+            self.limiter.acquire()
+            self.stats["requests"] += 1
+            try:
+                with METRICS.timer("geocode_request", provider=self.name):
+                    response = self.session.get(self.base_url, params=params, timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout):
+                METRICS.count("geocode_requests", provider=self.name, status="error")
+                if attempt == self.max_retries:
+                    raise
+            else:
+                METRICS.count("geocode_requests", provider=self.name, status=str(response.status_code))
+                if response.status_code not in (429, 503):
+                    response.raise_for_status()
+                    return response.json()
+                if attempt == self.max_retries:
+                    response.raise_for_status()
+                retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                if retry_after is not None:
+                    delay = retry_after
+            self.stats["retries"] += 1
+            METRICS.count("retries", component="geocode")
+            self.limiter.pause(delay)
+
+    def close(self):
+        self.session.close()
+
+class GeocodingProvider(ABC):
+    """
+    Fournisseur de géocodage HTTP, avec son propre débit et sa propre concurrence
+    Les sous-classes définissent les paramètres de requête et le décodage de la réponse
+    """
+
+    name = "generic"
+    default_url = None
+    default_rate = 1.0
+    default_concurrency = 1
+
+    def __init__(self, base_url: Optional[str] = None, rate: Optional[float] = None,
+                 concurrency: Optional[int] = None, timeout: float = 10, max_retries: int = 2):
+        self.base_url = base_url or self.default_url
+        self.concurrency = concurrency or self.default_concurrency
+        self.client = GeocodingClient(self.base_url, rate=rate or self.default_rate,
+                                      max_retries=max_retries, timeout=timeout,
+                                      pool_size=self.concurrency, name=self.name)
+        self.semaphore = threading.BoundedSemaphore(self.concurrency)
+        self.stats = {"found": 0, "not_found": 0, "errors": 0}
+
+    @abstractmethod
+    def params(self, address: str) -> Dict:
+        """Paramètres de la requête GET pour une adresse"""
+
+    @abstractmethod
+    def parse(self, data) -> Dict:
+        """Coordonnées {"lat", "lon"} extraites de la réponse JSON (None si introuvable)"""
+
+    def geocode(self, address: str) -> Dict:
+        """Géocode une adresse ; lève une exception en cas d'erreur réseau"""
+        with self.semaphore:
+            try:
+                data = self.client.get_json(self.params(address))
+            except Exception:
+                self.stats["errors"] += 1
+                raise
+        coords = self.parse(data)
+        self.stats["found" if coords["lat"] is not None else "not_found"] += 1
+        return coords
+
+class NominatimProvider(GeocodingProvider):
+    """Nominatim (OpenStreetMap), 1 requête/seconde sur l'instance publique"""
+
+    name = "nominatim"
+    default_url = NOMINATIM_URL
+    default_rate = NOMINATIM_RATE
+
+    def params(self, address: str) -> Dict:
+        return {"q": address, "format": "json", "limit": 1, "countrycodes": "fr"}
+
+    def parse(self, data) -> Dict:
+        if data and len(data) > 0:
+            return {"lat": float(data[0]["lat"]), "lon": float(data[0]["lon"])}
+        return {"lat": None, "lon": None}
+
+class PhotonProvider(GeocodingProvider):
+    """Photon (Komoot), réponse GeoJSON ; à pointer de préférence vers une instance locale"""
+
+    name = "photon"
+    default_url = "https://photon.komoot.io/api"
+    default_rate = 1.0
+
+    def params(self, address: str) -> Dict:
+        return {"q": address, "limit": 1, "lang": "fr"}
+
+    def parse(self, data) -> Dict:
+        features = (data or {}).get("features") or []
+        if features:
+            lon, lat = features[0]["geometry"]["coordinates"][:2]
+            return {"lat": float(lat), "lon": float(lon)}
+        return {"lat": None, "lon": None}
+
+class BANProvider(PhotonProvider):
+    """API Adresse (BAN), publique ou auto-hébergée (addok), réponse GeoJSON"""
+
+    name = "ban"
+    default_url = "https://api-adresse.data.gouv.fr/search/"
+    default_rate = 40.0  # Limite publique : 50 requêtes/seconde par IP
+    default_concurrency = 4
+
+    def params(self, address: str) -> Dict:
+        return {"q": address, "limit": 1}
+
+PROVIDER_CLASSES = {cls.name: cls for cls in (NominatimProvider, PhotonProvider, BANProvider)}
+
+class MultiGeocoder:
+    """
+    Géocodeur multi-fournisseurs : repli sur le fournisseur suivant en cas d'absence
+    de résultat ou d'erreur, et requête de couverture (hedging) si un fournisseur tarde
+    """
+
+    def __init__(self, providers: List[GeocodingProvider], hedge_after: Optional[float] = None):
+        if not providers:
+            raise ValueError("Au moins un fournisseur de géocodage est requis")
+        self.providers = providers
+        self.hedge_after = hedge_after
+        self.executor = ThreadPoolExecutor(max_workers=2 * sum(p.concurrency for p in providers))
+
+    def geocode(self, address: str, start: int = 0) -> Dict:
+        """
+        Géocode une adresse en commençant par le fournisseur d'indice `start`
+        Retourne un résultat négatif si au moins un fournisseur a répondu sans trouver,
+        lève GeocodingError si tous ont échoué
+        """
+        queue = self.providers[start:] + self.providers[:start]
+        pending = {}
+        answered = False
+        errors = []
+
+        def launch():
+            provider = queue.pop(0)
+            pending[self.executor.submit(provider.geocode, address)] = provider
+
+        launch()
+        while pending:
+            timeout = self.hedge_after if queue else None
+            done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            if not done:
+                launch()  # Le fournisseur tarde : on lance le suivant en parallèle
+                continue
+
+            for future in done:
+                provider = pending.pop(future)
+                try:
+                    coords = future.result()
+                except Exception as e:
+                    errors.append(f"{provider.name}: {e}")
+                    continue
+                answered = True
+                if coords["lat"] is not None:
+                    return coords
+
+            if not pending and queue:
+                launch()
+
+        if answered:
+            return {"lat": None, "lon": None}
+        raise GeocodingError("; ".join(errors))
+
+    def geocode_many(self, addresses: List[str]):
+        """
+        Géocode une liste d'adresses en parallèle, en répartissant le premier essai
+        entre fournisseurs ; produit des tuples (index, coords ou exception) au fil de l'eau
+        """
+        workers = sum(p.concurrency for p in self.providers)
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = {
+                pool.submit(self.geocode, address, idx % len(self.providers)): idx
+                for idx, address in enumerate(addresses)
+            }
+            for future in as_completed(futures):
+                try:
+                    yield futures[future], future.result()
+                except Exception as e:
+                    yield futures[future], e
+
+    def report(self):
+        for provider in self.providers:
+            s = provider.stats
+            print(f"🌐 {provider.name}: {provider.client.stats['requests']} requêtes "
+                  f"({s['found']} trouvées, {s['not_found']} introuvables, "
+                  f"{s['errors']} erreurs, {provider.client.stats['retries']} relances)")
+
+def providers_from_spec(spec: str) -> List[GeocodingProvider]:
+    """
+    Construit la liste des fournisseurs à partir d'une spécification
+    Ex: "ban,nominatim,photon=http://localhost:2322/api"
+    """
+    providers = []
+    for item in spec.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        name, _, url = item.partition("=")
+        if name not in PROVIDER_CLASSES:
+            raise ValueError(f"Fournisseur de géocodage inconnu: {name}")
+        providers.append(PROVIDER_CLASSES[name](base_url=url or None))
+    return providers
+
+def configure_geocoder(providers: List[GeocodingProvider], hedge_after: Optional[float] = None):
+    """Remplace le géocodeur partagé du processus (utile pour des fournisseurs locaux)"""
+    global _geocoder
+    _geocoder = MultiGeocoder(providers, hedge_after=hedge_after)
+    return _geocoder
+
+def get_geocoder() -> MultiGeocoder:
+    """Retourne le géocodeur partagé (MOF_GEOCODERS, Nominatim seul par défaut)"""
+    global _geocoder
+    if _geocoder is None:
+        providers = providers_from_spec(os.environ.get("MOF_GEOCODERS", "nominatim"))
+        hedge = os.environ.get("MOF_GEOCODE_HEDGE")
+        _geocoder = MultiGeocoder(providers, hedge_after=float(hedge) if hedge else None)
+    return _geocoder
+
+def get_cache() -> GeocodeCache:
+    """Retourne le cache partagé du processus (ouvert au premier appel)"""
+    global _cache
+    if _cache is None:
+        _cache = GeocodeCache()
+    return _cache
+
+def get_offline_index() -> Optional[BANIndex]:
+    """Retourne l'index BAN hors-ligne s'il a été construit, sinon None"""
+    global _offline_index
+    if _offline_index is None:
+        _offline_index = BANIndex(DEFAULT_INDEX_PATH) if os.path.exists(DEFAULT_INDEX_PATH) else False
+    return _offline_index or None
+
+def lookup_local(address: str, cache: GeocodeCache) -> Optional[Dict]:
+    """Cherche une adresse dans l'index hors-ligne puis dans le cache, sans accès réseau"""
+    offline = get_offline_index()
+    if offline:
+        coords = offline.geocode(address)
+        if coords:
+            return coords
+    return cache.get(address)
+
+def geocode_address(address: str, cache: Optional[GeocodeCache] = None) -> Dict:
+    """Géocode une adresse : index BAN hors-ligne, puis cache disque, puis fournisseurs HTTP"""
+    if not address:
+        return {"lat": None, "lon": None}
+
+    cache = cache or get_cache()
+    coords = lookup_local(address, cache)
+    if coords is not None:
+        return coords
+
+    try:
+        coords = get_geocoder().geocode(address)
+    except Exception as e:
+        print(f"⚠ Erreur geocoding pour '{address}': {e}")
+        return {"lat": None, "lon": None}
+
+    cache.set(address, coords)
+    return coords
+
+def geocode_addresses(addresses: List[str], cache: Optional[GeocodeCache] = None) -> List[Dict]:
+    """
+    Géocode une liste d'adresses : les résultats locaux sont immédiats, les autres
+    sont répartis en parallèle entre les fournisseurs configurés
+    """
+    cache = cache or get_cache()
+    results = [{"lat": None, "lon": None} for _ in addresses]
+    remote = []
+
+    for idx, address in enumerate(addresses):
+        if not address:
+            continue
+        coords = lookup_local(address, cache)
+        if coords is not None:
+            results[idx] = coords
+        else:
+            remote.append(idx)
+
+    if remote:
+        print(f"  🌐 {len(addresses) - len(remote)} adresses résolues localement, "
+              f"{len(remote)} à géocoder en ligne...")
+        done = 0
+        for pos, outcome in get_geocoder().geocode_many([addresses[i] for i in remote]):
+            idx = remote[pos]
+            done += 1
+            if isinstance(outcome, Exception):
+                print(f"⚠ Erreur geocoding pour '{addresses[idx]}': {outcome}")
+                continue
+            cache.set(addresses[idx], outcome)  # Écritures SQLite dans le thread principal
+            results[idx] = outcome
+            if done % 10 == 0:
+                print(f"  ... {done}/{len(remote)} géocodées")
+
+    return results
+
+def report_geocode_stats():
+    """Affiche les statistiques de géocodage en fin d'exécution"""
+    if _offline_index:
+        print(f"\n🗺 Index BAN hors-ligne: {_offline_index.stats['hits']} trouvées, "
+              f"{_offline_index.stats['misses']} manquantes")
+    if _cache is not None:
+        _cache.report()
+    if _geocoder is not None:
+        _geocoder.report()
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Cache disque des réponses HTTP des scrapers sans navigateur (scrape_mof.py, listing_http.py)
+
+Chaque réponse GET munie d'un validateur (ETag ou Last-Modified) est conservée dans
+data/http-cache/ (ou MOF_HTTP_CACHE_DIR) : <clé>.json pour l'URL, les en-têtes et
+l'empreinte du corps, <clé>.body pour le corps. La requête suivante vers la même URL est
+conditionnelle (If-None-Match / If-Modified-Since) ; sur un 304, la réponse est
+reconstituée depuis le disque, sans retransfert.
+
+L'empreinte des corps servis pendant l'exécution (fingerprint) permet à l'appelant de
+sauter l'analyse et les étapes suivantes quand rien n'a changé depuis son dernier
+passage terminé (unchanged / mark_processed).
+
+    cache = HTTPCache()
+    response = cache.get(url, timeout=15)
+    if cache.unchanged("scrape_mof"):
+        ...  # Annuaire identique au dernier passage : rien à refaire
+    cache.mark_processed("scrape_mof")
+"""
+
+import hashlib
+import json
+import os
+import time
+from typing import Dict, List, Optional
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from metrics import METRICS
+
+CACHE_DIR = os.environ.get("MOF_HTTP_CACHE_DIR", "../data/http-cache")
+PROCESSED_FILE = "processed.json"
+# En-têtes conservés avec le corps (le reste décrit le transfert, pas le contenu)
+KEPT_HEADERS = ["Content-Type", "ETag", "Last-Modified"]
+
+def write_file(path: str, content: bytes):
+    """Écriture atomique : un passage interrompu ne laisse pas d'entrée tronquée"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+
+class HTTPCache:
+    """Réponses GET sur disque, revalidées par requête conditionnelle"""
+
+    def __init__(self, directory: str = CACHE_DIR):
+        self.directory = directory
+        self.digests: List[str] = []  # Empreintes des corps servis, dans l'ordre des requêtes
+        self.stats = {"revalidated": 0, "stored": 0, "uncacheable": 0}
+        os.makedirs(directory, exist_ok=True)
+
+    def key(self, url: str) -> str:
+        return hashlib.sha256(url.encode("utf-8")).hexdigest()[:32]
+
+    def load(self, key: str) -> Optional[Dict]:
+        meta_path = os.path.join(self.directory, f"{key}.json")
+        body_path = os.path.join(self.directory, f"{key}.body")
+        if not (os.path.exists(meta_path) and os.path.exists(body_path)):
+            return None
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except ValueError:
+            return None
+
+    def store(self, key: str, response: requests.Response, digest: str):
+        write_file(os.path.join(self.directory, f"{key}.body"), response.content)
+        self.write_meta(key, {
+            "url": response.url,
+            "headers": {name: response.headers[name] for name in KEPT_HEADERS if name in response.headers},
+            "encoding": response.encoding,
+            "sha256": digest,
+            "fetched_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "validated_at": time.strftime("%Y-%m-%d %H:%M:%S")
+        })
+
+    def write_meta(self, key: str, meta: Dict):
+        write_file(os.path.join(self.directory, f"{key}.json"),
+                   (json.dumps(meta, ensure_ascii=False, indent=2) + "\n").encode("utf-8"))
+
+    def cached_response(self, key: str, meta: Dict, not_modified: requests.Response) -> requests.Response:
+        """Réponse 200 reconstituée depuis le disque après un 304"""
+        with open(os.path.join(self.directory, f"{key}.body"), 'rb') as f:
+            body = f.read()
+        response = requests.Response()
+        response.status_code = 200
+        response.reason = "OK"
+        response._content = body
+        response.headers = CaseInsensitiveDict(meta["headers"])
+        # Un 304 peut porter des validateurs mis à jour
+        for name in ("ETag", "Last-Modified"):
+            if name in not_modified.headers:
+                response.headers[name] = not_modified.headers[name]
+        response.encoding = meta.get("encoding")
+        response.url = not_modified.url
+        response.request = not_modified.request
+        response.elapsed = not_modified.elapsed
+        return response
+
+    def get(self, url: str, params: Optional[Dict] = None, headers: Optional[Dict] = None,
+            timeout: float = 15, session: Optional[requests.Session] = None) -> requests.Response:
+        """
+        GET conditionnel ; la réponse porte from_cache (True après un 304)
+        et digest (SHA-256 du corps)
+        """
+        url = requests.Request("GET", url, params=params).prepare().url
+        key = self.key(url)
+        meta = self.load(key)
+        request_headers = dict(headers or {})
+        if meta:
+            if "ETag" in meta["headers"]:
+                request_headers["If-None-Match"] = meta["headers"]["ETag"]
+            if "Last-Modified" in meta["headers"]:
+                request_headers["If-Modified-Since"] = meta["headers"]["Last-Modified"]
+
+        response = (session or requests).get(url, headers=request_headers, timeout=timeout)
+
+        if response.status_code == 304 and meta:
+            response = self.cached_response(key, meta, response)
+            response.from_cache = True
+            response.digest = meta["sha256"]
+            self.write_meta(key, {**meta, "headers": {name: response.headers[name] for name in KEPT_HEADERS
+                                                      if name in response.headers},
+                                  "validated_at": time.strftime("%Y-%m-%d %H:%M:%S")})
+            self.count("revalidated")
+        else:
+            response.from_cache = False
+            response.digest = hashlib.sha256(response.content).hexdigest()
+            if response.status_code == 200 and ("ETag" in response.headers or "Last-Modified" in response.headers):
+                self.store(key, response, response.digest)
+                self.count("stored")
+            else:
+                self.count("uncacheable")
+
+        if response.status_code == 200:
+            self.digests.append(response.digest)
+        return response
+
+    def count(self, result: str):
+        self.stats[result] += 1
+        METRICS.count("http_cache", result=result)
+
+    def fingerprint(self) -> Optional[str]:
+        """Empreinte de tous les corps servis pendant cette exécution (None si aucun)"""
+        if not self.digests:
+            return None
+        return hashlib.sha256("\n".join(self.digests).encode("ascii")).hexdigest()
+
+    def processed(self) -> Dict:
+        path = os.path.join(self.directory, PROCESSED_FILE)
+        if not os.path.exists(path):
+            return {}
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def unchanged(self, name: str, extra: str = "") -> bool:
+        """
+        Vrai si les réponses de cette exécution sont identiques à celles du dernier passage
+        terminé de `name` (extra : empreinte du code qui les traite, par exemple)
+        """
+        fingerprint = self.fingerprint()
+        return fingerprint is not None and self.processed().get(name) == f"{fingerprint}|{extra}"
+
+    def mark_processed(self, name: str, extra: str = ""):
+        """À appeler une fois le résultat de `name` enregistré"""
+        fingerprint = self.fingerprint()
+        if fingerprint is None:
+            return
+        processed = self.processed()
+        processed[name] = f"{fingerprint}|{extra}"
+        write_file(os.path.join(self.directory, PROCESSED_FILE),
+                   (json.dumps(processed, indent=2, sort_keys=True) + "\n").encode("utf-8"))
+
+    def report(self):
+        print(f"🗄 Cache HTTP: {self.stats['revalidated']} réponses inchangées (304), "
+              f"{self.stats['stored']} enregistrées, {self.stats['uncacheable']} sans validateur")
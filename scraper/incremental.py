@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Mode incrémental des scrapers Selenium
+Chaque entrée de l'annuaire (li.item-gallery) est identifiée par son nom et son métier,
+et empreinte par ses attributs data-* : seules les entrées nouvelles ou modifiées
+depuis le dernier passage repassent par l'extraction détaillée et le géocodage.
+"""
+
+import hashlib
+import json
+import os
+from typing import Dict, List, Optional
+
+from geocache import normalize_address
+
+ENTRY_ATTRIBUTES = ["data-nom", "data-metier", "data-ville", "data-departement"]
+
+def read_entry_attributes(element) -> Dict:
+    """Lit les attributs data-* d'un élément de l'annuaire"""
+    return {attr: element.get_attribute(attr) or "" for attr in ENTRY_ATTRIBUTES}
+
+def entry_key(attrs: Dict) -> str:
+    """Identité stable d'une entrée : nom + métier normalisés"""
+    return f"{normalize_address(attrs['data-nom'])}|{normalize_address(attrs['data-metier'])}"
+
+def entry_fingerprint(attrs: Dict) -> str:
+    """Empreinte des attributs : change dès que l'un d'eux change"""
+    payload = "\x1f".join(attrs.get(attr) or "" for attr in ENTRY_ATTRIBUTES)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+class ScrapeState:
+    """État persistant entre deux passages : empreinte et dernier enregistrement de chaque entrée"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.entries = {}
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                self.entries = json.load(f).get("entries", {})
+        self.tracked = {}
+        self.changed = []
+        self.stats = {"new": 0, "changed": 0, "pending": 0, "unchanged": 0}
+
+    def lookup(self, attrs: Dict) -> Optional[Dict]:
+        """
+        Retourne l'enregistrement du passage précédent si l'entrée est inchangée,
+        None si elle est nouvelle, modifiée ou pas encore géocodée (à retraiter)
+        """
+        entry = self.entries.get(entry_key(attrs))
+        if entry is None:
+            self.stats["new"] += 1
+            return None
+        if entry["fingerprint"] != entry_fingerprint(attrs):
+            self.stats["changed"] += 1
+            return None
+        record = entry["record"]
+        if record.get("address") and (record.get("coordinates") or {}).get("lat") is None:
+            # Pas encore géocodée (au-delà de la limite du passage précédent, ou adresse introuvable) :
+            # retraitée pour ne pas rester sans coordonnées d'un passage à l'autre
+            self.stats["pending"] += 1
+            return None
+        self.stats["unchanged"] += 1
+        return dict(entry["record"])
+
+    def track(self, attrs: Dict, record: Dict, changed: bool):
+        """
+        Associe un enregistrement à son entrée ; il est relu au moment de save(),
+        après géocodage éventuel
+        """
+        self.tracked[entry_key(attrs)] = (entry_fingerprint(attrs), record)
+        if changed:
+            self.changed.append(record)
+
+    def track_resumed(self, attrs: Dict):
+        """
+        Entrée déjà extraite par un passage interrompu (mode flux) : son enregistrement est
+        fourni par refresh() à partir du fichier de flux
+        """
+        self.tracked[entry_key(attrs)] = (entry_fingerprint(attrs), None)
+
+    def refresh(self, records: Dict[str, Dict]):
+        """
+        Remplace les enregistrements suivis par leur version finale, indexée par empreinte
+        (mode flux : le géocodage écrit de nouveaux enregistrements dans un autre fichier)
+        """
+        for key, (fingerprint, record) in self.tracked.items():
+            if fingerprint in records:
+                self.tracked[key] = (fingerprint, records[fingerprint])
+
+    def changed_records(self) -> List[Dict]:
+        """Enregistrements nouveaux ou modifiés lors de ce passage"""
+        return self.changed
+
+    def save(self):
+        """Écrit l'état (entrées vues lors de ce passage uniquement) de façon atomique"""
+        entries = {}
+        for key, (fingerprint, record) in self.tracked.items():
+            if record is None:  # Entrée reprise absente du fichier de flux : retraitée au prochain passage
+                continue
+            entries[key] = {
+                "fingerprint": fingerprint,
+                "record": {k: v for k, v in record.items() if k != "id"}
+            }
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({"entries": entries}, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+        self.entries = entries
+
+    def report(self):
+        s = self.stats
+        print(f"\n♻ Mode incrémental: {s['new']} nouveaux, {s['changed']} modifiés, "
+              f"{s['pending']} sans coordonnées (à géocoder), "
+              f"{s['unchanged']} inchangés (repris du passage précédent)")
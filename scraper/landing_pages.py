@@ -0,0 +1,384 @@
+#!/usr/bin/env python3
+"""
+Génération des pages « métier + ville » (chocolatier-paris.html, ...) et de sitemap.xml
+Une page par couple (catégorie de la taxonomie, ville) à partir de la copie de travail
+que publie publish.py (data/mof-data.json), écrite à l'identique dans public/ et docs/.
+Les textes rédigés à la main (description, introduction, encadré) sont dans
+data/landing-content.json ; à défaut, un texte générique est utilisé. Une page peut y
+fixer l'ordre des cartes ("order") et la présentation d'un artisan ("artisans" : nom
+affiché et boutique, par nom dans les données).
+
+Un nom « Artisan (Boutique) » est affiché en deux lignes : le nom sur la carte, la
+boutique en tête des adresses.
+
+Génération incrémentale : data/landing-manifest.json garde l'empreinte des entrées
+de chaque page (enregistrements, textes, gabarit) ; seules les pages dont l'empreinte
+a changé sont rendues, en parallèle sur tous les cœurs quand elles sont nombreuses.
+
+    python3 landing_pages.py [--force]
+"""
+
+import hashlib
+import html
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from string import Template
+from typing import Dict, List, Optional, Tuple
+
+from entities import resolve
+from publish import DATA_PATH, SITE_DIRS, slugify, write_atomic
+from taxonomy import TRADES, classify_all
+
+CONTENT_PATH = "../data/landing-content.json"
+MANIFEST_PATH = "../data/landing-manifest.json"
+SITE_URL = "https://guide-mof.fr"
+
+# En dessous, le démarrage des processus coûte plus que le rendu
+PARALLEL_THRESHOLD = 64
+
+CITY_RE = re.compile(r"\b\d{5}\s+([^,]+?)(?:\s+cedex\b.*)?\s*$", re.IGNORECASE)
+SHOP_RE = re.compile(r"^(.+?)\s*\((.+)\)$")
+
+PAGE_TEMPLATE = Template("""<!DOCTYPE html>
+<html lang="fr">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <meta name="description" content="${description}">
+    <meta name="keywords" content="${keywords}">
+    <link rel="canonical" href="${url}">
+
+    <meta property="og:type" content="website">
+    <meta property="og:url" content="${url}">
+    <meta property="og:title" content="${label} MOF à ${city} - Guide des Meilleurs Ouvriers de France">
+    <meta property="og:description" content="${og_description}">
+    <meta property="og:locale" content="fr_FR">
+
+    <title>${label} MOF à ${city} - Meilleurs Ouvriers de France | Guide MOF</title>
+
+    <script data-goatcounter="https://mickaelb.goatcounter.com/count" async src="//gc.zgo.at/count.js"></script>
+
+    <link rel="preconnect" href="https://fonts.googleapis.com">
+    <link rel="preconnect" href="https://fonts.gstatic.com" crossorigin>
+    <link href="https://fonts.googleapis.com/css2?family=Cormorant+Garamond:wght@500;600;700&family=DM+Sans:ital,wght@0,400;0,500;0,600;0,700;1,400&display=swap" rel="stylesheet">
+    <link rel="stylesheet" href="css/style.css">
+    <link rel="icon" href="data:image/svg+xml,<svg xmlns='http://www.w3.org/2000/svg' viewBox='0 0 100 100'><text y='.9em' font-size='90'>🏆</text></svg>">
+</head>
+<body>
+    <header class="header">
+        <div class="container">
+            <div class="header-content">
+                <a href="/" class="logo">
+                    <span class="logo-icon">🏆</span>
+                    <span class="logo-text">MOF Guide</span>
+                </a>
+                <p class="tagline">${label} MOF à ${city}</p>
+            </div>
+        </div>
+    </header>
+
+    <main class="main">
+        <div class="container">
+            <nav class="breadcrumb">
+                <a href="/">Accueil</a> › <span>${label} MOF ${city}</span>
+            </nav>
+
+            <section class="landing-hero">
+                <h1>${label} Meilleurs Ouvriers de France à ${city}</h1>
+                <p class="landing-intro">${intro}</p>
+            </section>
+
+            <section class="mof-listing">
+                <div class="mof-list">
+${cards}
+                </div>
+            </section>
+${about}
+            <div class="cta-section">
+                <a href="/" class="detail-link">← Voir tous les MOF sur la carte</a>
+            </div>
+        </div>
+    </main>
+
+    <footer class="footer">
+        <div class="container">
+            <p class="footer-note">
+                <a href="https://www.meilleursouvriersdefrance.info" target="_blank" rel="noopener">Meilleurs Ouvriers de France (MOF)</a> est un titre d'excellence artisanale français
+            </p>
+        </div>
+    </footer>
+
+    <script type="application/ld+json">
+${structured_data}
+    </script>
+</body>
+</html>
+""")
+
+CARD_TEMPLATE = Template("""                    <article class="mof-card">
+                        <div class="mof-card-header">
+                            <h2 class="mof-card-name">${name}</h2>
+                            <span class="mof-card-specialty">${specialty}</span>
+                        </div>
+                        <div class="mof-card-body">
+${body}
+                        </div>${footer}
+                    </article>
+""")
+
+CARD_FOOTER = Template("""
+                        <div class="mof-card-footer">
+                            <a href="${website}" target="_blank" rel="noopener" class="mof-card-link">Visiter le site →</a>
+                        </div>""")
+
+ABOUT_TEMPLATE = Template("""
+            <section class="about-section" style="margin-top: 2rem; background: transparent; border: none; padding: 2rem 0;">
+                <h2 class="about-title">${title}</h2>
+                <div class="about-content">
+${paragraphs}
+                </div>
+            </section>
+""")
+
+TEMPLATE_VERSION = hashlib.sha256("".join(
+    t.template for t in (PAGE_TEMPLATE, CARD_TEMPLATE, CARD_FOOTER, ABOUT_TEMPLATE)
+).encode("utf-8")).hexdigest()[:12]
+
+def city_of(address: Optional[str]) -> Optional[str]:
+    """Ville de l'adresse (après le code postal)"""
+    # "92310 Sèvres (Atelier)" : la précision entre parenthèses ne fait pas partie de la ville
+    match = CITY_RE.search(re.sub(r"\s*\(.*?\)", "", address or ""))
+    return match.group(1).strip() if match else None
+
+def split_address(address: str) -> Tuple[str, Optional[str], Optional[str]]:
+    """(rue, code postal, ville) pour les données structurées"""
+    match = re.search(r"^(.*?),?\s*(\d{5})\s+(.+)$", address)
+    if not match:
+        return address, None, None
+    return match.group(1).strip().rstrip(","), match.group(2), city_of(address) or match.group(3).strip()
+
+def split_shop(name: str) -> Tuple[str, Optional[str]]:
+    """Nom et boutique : "Nicolas Cloiseau (La Maison du Chocolat)" → ("Nicolas Cloiseau", "La Maison du Chocolat")"""
+    match = SHOP_RE.match(name)
+    return (match.group(1), match.group(2)) if match else (name, None)
+
+def group_artisans(records: List[Dict], content: Optional[Dict] = None) -> List[Dict]:
+    """
+    Un artisan par carte (entities.py), avec l'adresse de chacune de ses boutiques,
+    dans l'ordre des données ou l'ordre rédigé de la page
+    """
+    content = content or {}
+    overrides = content.get("artisans", {})
+    by_id = {mof["id"]: mof for mof in records}
+    artisans = []
+    for person in resolve(records):
+        name, shop = split_shop(person["name"])
+        override = overrides.get(person["name"], {})
+        artisans.append({
+            **by_id[person["records"][0]],
+            "name": override.get("name", name),
+            "shop": override.get("shop", shop),
+            "addresses": [shop["address"] for shop in person["shops"] if shop["address"]]
+        })
+    order = content.get("order", [])
+    rank = {name: position for position, name in enumerate(order)}
+    return sorted(artisans, key=lambda a: rank.get(a["name"], len(order)))
+
+def default_content(page: Dict, names: List[str]) -> Dict:
+    """Textes génériques pour une page sans texte rédigé"""
+    label, city = page["label"].lower(), page["city"]
+    listed = ", ".join(names[:5])
+    return {
+        "description": f"Liste des {label} Meilleurs Ouvriers de France (MOF) à {city}. {listed}.",
+        "keywords": f"{page['trade']} MOF {city}, Meilleur Ouvrier de France {page['category'].lower()}, {listed}",
+        "og_description": f"Découvrez les {label} Meilleurs Ouvriers de France à {city}. Adresses et spécialités.",
+        "intro": f"Retrouvez les {label} titrés Meilleur Ouvrier de France à {city} : adresses, "
+                 f"spécialités et année d'obtention du titre.",
+        "about_title": None,
+        "about": []
+    }
+
+def text(value: str) -> str:
+    """Échappement du contenu d'un élément (les guillemets n'y ont pas à être échappés)"""
+    return html.escape(value, quote=False)
+
+def structured_data(page: Dict, artisans: List[Dict], content: Dict) -> str:
+    """ItemList Schema.org, indenté comme dans le reste de la page"""
+    items = []
+    for position, artisan in enumerate(artisans, start=1):
+        item = {
+            "@type": "LocalBusiness",
+            "name": f"{artisan['name']} - {artisan['shop']}" if artisan.get("shop") else artisan["name"],
+            "description": (f"{artisan['specialty']} Meilleur Ouvrier de France {artisan['year']}"
+                            if artisan.get("year") else artisan["specialty"])
+        }
+        if artisan["addresses"]:
+            street, postcode, city = split_address(artisan["addresses"][0])
+            address = {"@type": "PostalAddress"}
+            if street:  # "75017 Paris" : pas de rue connue
+                address["streetAddress"] = street
+            if postcode:
+                address.update({"addressLocality": city, "postalCode": postcode})
+            address["addressCountry"] = "FR"
+            item["address"] = address
+        if artisan.get("website"):
+            item["url"] = artisan["website"]
+        items.append({"@type": "ListItem", "position": position, "item": item})
+
+    data = {
+        "@context": "https://schema.org",
+        "@type": "ItemList",
+        "name": f"{page['label']} MOF à {page['city']}",
+        "description": content.get("list_description")
+                       or f"Liste des {page['label'].lower()} Meilleurs Ouvriers de France à {page['city']}",
+        "numberOfItems": len(items),
+        "itemListElement": items
+    }
+    return "\n".join("    " + line for line in json.dumps(data, ensure_ascii=False, indent=2).splitlines())
+
+def esc(text: str) -> str:
+    """Échappement HTML ; les apostrophes restent lisibles (attributs entre guillemets doubles)"""
+    return html.escape(text, quote=False).replace('"', "&quot;")
+
+def render_page(page: Dict) -> str:
+    """HTML d'une page (fonction pure, exécutée dans les processus de rendu)"""
+    artisans = group_artisans(page["records"], page["content"])
+    content = page["content"] or default_content(page, [a["name"] for a in artisans])
+
+    cards = []
+    for artisan in artisans:
+        lines = ([artisan["shop"]] if artisan.get("shop") else []) + artisan["addresses"]
+        body = [f'                            <p class="mof-card-address">{text(line)}</p>' for line in lines]
+        if artisan.get("year"):
+            body.append(f'                            <p class="mof-card-year">MOF {artisan["year"]}</p>')
+        footer = CARD_FOOTER.substitute(website=esc(artisan["website"])) if artisan.get("website") else ""
+        cards.append(CARD_TEMPLATE.substitute(
+            name=text(artisan["name"]), specialty=text(artisan.get("specialty") or ""),
+            body="\n".join(body), footer=footer
+        ))
+
+    about = ""
+    if content.get("about_title"):
+        about = ABOUT_TEMPLATE.substitute(
+            title=text(content["about_title"]),
+            paragraphs="\n".join(f"                    <p>{text(p)}</p>" for p in content["about"])
+        )
+
+    return PAGE_TEMPLATE.substitute(
+        description=esc(content["description"]), keywords=esc(content["keywords"]),
+        og_description=esc(content["og_description"]), intro=text(content["intro"]),
+        url=f"{SITE_URL}/{page['slug']}.html", label=esc(page["label"]), city=esc(page["city"]),
+        cards="\n".join(cards).rstrip("\n"), about=about,
+        structured_data=structured_data(page, artisans, content)
+    )
+
+def build_pages(mof_list: List[Dict], content: Dict[str, Dict]) -> Dict[str, Dict]:
+    """Pages à publier, indexées par slug ("chocolatier-paris"), enregistrements dans l'ordre des données"""
+    pages = {}
+    for mof in mof_list:
+        city = city_of(mof.get("address"))
+        if not city:
+            continue
+        for category in classify_all(mof.get("specialty")):
+            trade, label = TRADES[category]
+            slug = f"{trade}-{slugify(city)}"
+            page = pages.setdefault(slug, {
+                "slug": slug, "category": category, "trade": trade, "label": label,
+                "city": city, "records": [], "content": content.get(slug)
+            })
+            page["records"].append(mof)
+    return dict(sorted(pages.items()))
+
+def page_hash(page: Dict) -> str:
+    payload = json.dumps([TEMPLATE_VERSION, page], ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+def render_sitemap(manifest: Dict, home_lastmod: str) -> str:
+    entries = [(f"{SITE_URL}/", home_lastmod, "weekly", "1.0")]
+    entries += [(f"{SITE_URL}/{slug}.html", page["lastmod"], "monthly", "0.8")
+                for slug, page in sorted(manifest["pages"].items())]
+    urls = "".join(
+        f"  <url>\n    <loc>{loc}</loc>\n    <lastmod>{lastmod}</lastmod>\n"
+        f"    <changefreq>{freq}</changefreq>\n    <priority>{priority}</priority>\n  </url>\n"
+        for loc, lastmod, freq, priority in entries
+    )
+    return ('<?xml version="1.0" encoding="UTF-8"?>\n'
+            '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n' + urls + '</urlset>\n')
+
+def load_json(path: str, default):
+    if not os.path.exists(path):
+        return default
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def generate_landing_pages(data: Dict, site_dirs: List[str] = SITE_DIRS, force: bool = False,
+                           manifest_path: str = MANIFEST_PATH) -> Dict[str, int]:
+    """
+    Rend les pages dont les entrées ont changé, supprime celles qui n'ont plus d'artisan,
+    réécrit sitemap.xml ; retourne le nombre de pages rendues, inchangées et supprimées
+    """
+    start = time.perf_counter()
+    site_dirs = [d for d in site_dirs if os.path.isdir(d)]
+    pages = build_pages(data["mof"], load_json(CONTENT_PATH, {}))
+    previous = load_json(manifest_path, {"pages": {}})["pages"]
+
+    # Date des données : un même jeu de données donne toujours le même sitemap
+    lastmod = (data["meta"].get("generated_at") or time.strftime("%Y-%m-%d"))[:10]
+    manifest = {"pages": {}}
+    to_render = []
+    for slug, page in pages.items():
+        digest = page_hash(page)
+        old = previous.get(slug)
+        outputs_present = all(os.path.exists(os.path.join(d, f"{slug}.html")) for d in site_dirs)
+        if not force and old and old["hash"] == digest and outputs_present:
+            manifest["pages"][slug] = old
+            continue
+        # Page modifiée : jamais plus ancienne que la date déjà publiée (données relues d'un fichier plus ancien)
+        page_lastmod = lastmod
+        if old:
+            page_lastmod = old["lastmod"] if old["hash"] == digest else max(old["lastmod"], lastmod)
+        manifest["pages"][slug] = {"hash": digest, "lastmod": page_lastmod}
+        to_render.append(page)
+
+    if len(to_render) >= PARALLEL_THRESHOLD:
+        with ProcessPoolExecutor() as pool:
+            rendered = list(pool.map(render_page, to_render, chunksize=16))
+    else:
+        rendered = [render_page(page) for page in to_render]
+
+    for page, page_html in zip(to_render, rendered):
+        payload = page_html.encode("utf-8")
+        for site_dir in site_dirs:
+            write_atomic(os.path.join(site_dir, f"{page['slug']}.html"), payload)
+
+    removed = [slug for slug in previous if slug not in pages]
+    for slug in removed:
+        for site_dir in site_dirs:
+            path = os.path.join(site_dir, f"{slug}.html")
+            if os.path.exists(path):
+                os.remove(path)
+
+    sitemap = render_sitemap(manifest, lastmod).encode("utf-8")
+    for site_dir in site_dirs:
+        write_atomic(os.path.join(site_dir, "sitemap.xml"), sitemap)
+    write_atomic(manifest_path, (json.dumps(manifest, ensure_ascii=False, indent=2) + "\n").encode("utf-8"))
+
+    stats = {"rendered": len(to_render), "unchanged": len(pages) - len(to_render), "removed": len(removed)}
+    print(f"📄 Pages métier-ville: {stats['rendered']} rendues, {stats['unchanged']} inchangées, "
+          f"{stats['removed']} supprimées ({time.perf_counter() - start:.2f}s)")
+    return stats
+
+def main():
+    # Même source que publish.py : les pages suivent les données publiées
+    data = load_json(DATA_PATH, None)
+    if data is None:
+        print(f"❌ Données introuvables: {DATA_PATH}")
+        sys.exit(1)
+    generate_landing_pages(data, force="--force" in sys.argv)
+
+if __name__ == "__main__":
+    main()
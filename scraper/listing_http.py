@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Récupération de la liste de l'annuaire MOF sans navigateur
+Appelle directement l'URL paginée derrière le bouton #loadMore avec requests,
+et lit les attributs data-* des fragments li.item-gallery renvoyés.
+Retourne None si la page ou l'endpoint ne ressemblent plus à ce qui est attendu,
+pour que l'appelant se replie sur Selenium.
+"""
+
+import os
+import time
+from html.parser import HTMLParser
+from typing import Dict, List, Optional
+from urllib.parse import urljoin
+
+import requests
+
+from http_cache import HTTPCache
+from incremental import ENTRY_ATTRIBUTES
+from metrics import METRICS
+
+ANNUAIRE_URL = "https://www.meilleursouvriersdefrance.info/annuaire-mof"
+
+# URL de pagination forcée, ex: "https://.../annuaire-mof/load?page={page}"
+# Par défaut elle est lue sur le bouton #loadMore
+LOAD_MORE_URL = os.environ.get("MOF_LOAD_MORE_URL")
+
+LOAD_MORE_ATTRIBUTES = ["data-url", "data-href", "data-next", "data-action", "href"]
+
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36"
+}
+
+class ListingParser(HTMLParser):
+    """Collecte les attributs des li.item-gallery et du bouton #loadMore"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.entries = []
+        self.load_more = None
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag == "li" and "item-gallery" in (attrs.get("class") or "").split():
+            self.entries.append({attr: attrs.get(attr) or "" for attr in ENTRY_ATTRIBUTES})
+        elif attrs.get("id") == "loadMore":
+            self.load_more = attrs
+
+def parse_listing_html(html: str) -> ListingParser:
+    parser = ListingParser()
+    parser.feed(html)
+    parser.close()
+    return parser
+
+def extract_fragment(response) -> str:
+    """Retourne le HTML d'une réponse de pagination (HTML brut ou JSON contenant du HTML)"""
+    if "json" not in response.headers.get("Content-Type", ""):
+        return response.text
+    try:
+        payload = response.json()
+    except ValueError:
+        return ""
+    if isinstance(payload, str):
+        return payload
+    if isinstance(payload, dict):
+        for key in ("html", "content", "items", "data"):
+            if isinstance(payload.get(key), str):
+                return payload[key]
+        return next((v for v in payload.values() if isinstance(v, str) and "<li" in v), "")
+    return ""
+
+def discover_load_more_url(load_more: Optional[Dict], page_url: str) -> Optional[str]:
+    """Déduit l'URL de pagination depuis le bouton #loadMore"""
+    if LOAD_MORE_URL:
+        return LOAD_MORE_URL
+    if not load_more:
+        return None
+    for attr in LOAD_MORE_ATTRIBUTES:
+        value = load_more.get(attr)
+        if value and not value.startswith(("#", "javascript")):
+            return urljoin(page_url, value)
+    return None
+
+def page_request(url: str, page: int):
+    """URL et paramètres pour la page `page` (gabarit {page} ou paramètre ?page=)"""
+    if "{page}" in url:
+        return url.format(page=page), None
+    return url, {"page": page}
+
+def entry_identity(attrs: Dict) -> tuple:
+    return tuple(attrs.get(attr) or "" for attr in ENTRY_ATTRIBUTES)
+
+def fetch_listing(max_pages: int = 30, session: Optional[requests.Session] = None,
+                  cache: Optional[HTTPCache] = None) -> Optional[List[Dict]]:
+    """
+    Récupère toutes les entrées de l'annuaire (attributs data-*) par HTTP
+    Avec un cache, chaque page est revalidée (304 : pas de retransfert) et
+    cache.fingerprint() identifie l'ensemble des pages lues
+    Retourne None si le chemin HTTP n'est pas utilisable (repli Selenium)
+    """
+    session = session or requests.Session()
+    session.headers.update(HEADERS)
+    start = time.time()
+
+    def get(url: str, params: Optional[Dict] = None, headers: Optional[Dict] = None):
+        if cache:
+            return cache.get(url, params=params, headers=headers, timeout=15, session=session)
+        return session.get(url, params=params, headers=headers, timeout=15)
+
+    try:
+        with METRICS.timer("page_load", kind="http"):
+            response = get(ANNUAIRE_URL)
+        response.raise_for_status()
+    except Exception as e:
+        print(f"⚠ Annuaire inaccessible en HTTP: {e}")
+        return None
+
+    first = parse_listing_html(response.text)
+    if not first.entries:
+        print("⚠ Aucun li.item-gallery dans la page : structure modifiée")
+        return None
+
+    entries = list(first.entries)
+    seen = {entry_identity(e) for e in entries}
+
+    if first.load_more is not None:
+        url = discover_load_more_url(first.load_more, ANNUAIRE_URL)
+        if not url:
+            print("⚠ Endpoint du bouton 'Charger plus' introuvable")
+            return None
+
+        data_page = first.load_more.get("data-page") or ""
+        first_page = page = int(data_page) if data_page.isdigit() else 1
+        for _ in range(max_pages):
+            page += 1
+            page_url, params = page_request(url, page)
+            try:
+                with METRICS.timer("page_load", kind="http_fragment"):
+                    response = get(page_url, params=params, headers={"X-Requested-With": "XMLHttpRequest"})
+                response.raise_for_status()
+            except Exception as e:
+                print(f"⚠ Erreur pagination (page {page}): {e}")
+                return None
+
+            fragment = parse_listing_html(extract_fragment(response))
+            new_entries = [e for e in fragment.entries if entry_identity(e) not in seen]
+            if not new_entries:
+                if page == first_page + 1:
+                    print("⚠ L'endpoint 'Charger plus' ne renvoie aucune entrée : format modifié ?")
+                    return None
+                break  # Fin de la liste
+            seen.update(entry_identity(e) for e in new_entries)
+            entries.extend(new_entries)
+            print(f"⏳ Page {page}: {len(new_entries)} entrées ({len(entries)} au total)")
+
+    print(f"✓ {len(entries)} entrées récupérées en HTTP en {time.time() - start:.1f}s")
+    return entries
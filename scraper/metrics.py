@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+Métriques d'exécution des scrapers et de la chaîne : compteurs et histogrammes de durée
+(chargements de page, clics, extractions de fiche, requêtes de géocodage, pauses,
+relances, écritures), partagés par tous les modules du processus.
+
+En fin d'exécution, run_metrics() écrit un résumé dans data/metrics/ (ou MOF_METRICS_DIR) :
+- <tâche>.json : compteurs, histogrammes (nombre, somme, p50/p95 estimés), durée, succès
+- <tâche>.prom : format texte Prometheus, pour le collecteur textfile de node_exporter
+
+    with run_metrics("scrape_detailed_mof"):
+        main()
+
+Afficher le dernier résumé d'une tâche :
+    python3 metrics.py [tâche]
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
+
+METRICS_DIR = os.environ.get("MOF_METRICS_DIR", "../data/metrics")
+PREFIX = "mof_"
+# Bornes des histogrammes (secondes), de l'écriture disque au chargement de page lent
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+class Histogram:
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)  # Dernière case : au-delà de la dernière borne
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float):
+        position = 0
+        while position < len(BUCKETS) and value > BUCKETS[position]:
+            position += 1
+        self.counts[position] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def quantile(self, q: float) -> float:
+        """Estimation par interpolation dans la case concernée (comme histogram_quantile)"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for position, count in enumerate(self.counts):
+            if seen + count >= rank and count:
+                lower = BUCKETS[position - 1] if position else 0.0
+                upper = min(BUCKETS[position], self.max) if position < len(BUCKETS) else self.max
+                return lower + (upper - lower) * (rank - seen) / count
+            seen += count
+        return self.max
+
+    def summary(self) -> Dict:
+        return {"count": self.count, "sum": round(self.sum, 6), "max": round(self.max, 6),
+                "p50": round(self.quantile(0.5), 6), "p95": round(self.quantile(0.95), 6)}
+
+class Registry:
+    """Compteurs, jauges et histogrammes, indexés par (nom, étiquettes) ; un seul verrou"""
+
+    def __init__(self):
+        self.counters: Dict[Tuple[str, Labels], float] = {}
+        self.gauges: Dict[Tuple[str, Labels], float] = {}
+        self.histograms: Dict[Tuple[str, Labels], Histogram] = {}
+        self.lock = threading.Lock()
+
+    def count(self, name: str, value: float = 1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def gauge(self, name: str, value: float, **labels):
+        with self.lock:
+            self.gauges[(name, tuple(sorted(labels.items())))] = value
+
+    def observe(self, name: str, seconds: float, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram()
+            histogram.observe(seconds)
+
+    @contextmanager
+    def timer(self, name: str, **labels) -> Iterator[None]:
+        """Mesure la durée du bloc (enregistrée même si le bloc lève une exception)"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def snapshot(self) -> Dict:
+        def entries(items, value):
+            return [{"name": name, "labels": dict(labels), **value(v)} for (name, labels), v in sorted(items)]
+
+        with self.lock:
+            return {
+                "counters": entries(self.counters.items(), lambda v: {"value": v}),
+                "gauges": entries(self.gauges.items(), lambda v: {"value": v}),
+                "histograms": entries(((k, h) for k, h in self.histograms.items()), Histogram.summary)
+            }
+
+    def prometheus(self, job: str) -> str:
+        """Format texte d'exposition Prometheus (une ligne TYPE par famille de métriques)"""
+        lines: List[str] = []
+        typed = set()
+
+        def header(metric: str, kind: str):
+            if metric not in typed:
+                typed.add(metric)
+                lines.append(f"# TYPE {metric} {kind}")
+
+        # Étiquette "task" et non "job", réservée par Prometheus à la cible de collecte
+        def labels_text(labels: Labels, extra: Optional[Tuple[str, str]] = None) -> str:
+            pairs = [("task", job)] + list(labels) + ([extra] if extra else [])
+            return "{" + ",".join(f'{k}="{escape_label(v)}"' for k, v in pairs) + "}"
+
+        with self.lock:
+            for (name, labels), value in sorted(self.counters.items()):
+                metric = f"{PREFIX}{name}_total"
+                header(metric, "counter")
+                lines.append(f"{metric}{labels_text(labels)} {format_value(value)}")
+            for (name, labels), value in sorted(self.gauges.items()):
+                metric = f"{PREFIX}{name}"
+                header(metric, "gauge")
+                lines.append(f"{metric}{labels_text(labels)} {format_value(value)}")
+            for (name, labels), histogram in sorted(self.histograms.items()):
+                metric = f"{PREFIX}{name}_seconds"
+                header(metric, "histogram")
+                cumulative = 0
+                for bound, count in zip(BUCKETS, histogram.counts):
+                    cumulative += count
+                    lines.append(f"{metric}_bucket{labels_text(labels, ('le', f'{bound:g}'))} {cumulative}")
+                lines.append(f"{metric}_bucket{labels_text(labels, ('le', '+Inf'))} {histogram.count}")
+                lines.append(f"{metric}_sum{labels_text(labels)} {histogram.sum:.6f}")
+                lines.append(f"{metric}_count{labels_text(labels)} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+    def reset(self):
+        with self.lock:
+            self.counters.clear()
+            self.gauges.clear()
+            self.histograms.clear()
+
+def format_value(value: float) -> str:
+    """Entiers sans exposant (horodatages), autres valeurs en pleine précision"""
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+def escape_label(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+METRICS = Registry()
+
+def write_file(path: str, text: str):
+    """Écriture atomique : le collecteur ne lit jamais un fichier à moitié écrit"""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+def previous_gauge(json_path: str, name: str) -> Optional[float]:
+    try:
+        with open(json_path, 'r', encoding='utf-8') as f:
+            gauges = json.load(f)["gauges"]
+    except (OSError, ValueError, KeyError):
+        return None
+    return next((g["value"] for g in gauges if g["name"] == name and not g["labels"]), None)
+
+def write_summary(job: str, started: float, success: bool, directory: str = METRICS_DIR) -> str:
+    """Écrit <tâche>.json et <tâche>.prom ; retourne le chemin du JSON"""
+    finished = time.time()
+    json_path = os.path.join(directory, f"{job}.json")
+    METRICS.gauge("run_duration_seconds", round(finished - started, 3))
+    METRICS.gauge("run_success", 1 if success else 0)
+    METRICS.gauge("run_finished_timestamp_seconds", round(finished))
+    # Date du dernier succès reprise du résumé précédent après un échec (alerte « pas de succès depuis N h »)
+    last_success = round(finished) if success else previous_gauge(json_path, "run_last_success_timestamp_seconds")
+    if last_success is not None:
+        METRICS.gauge("run_last_success_timestamp_seconds", last_success)
+
+    summary = {
+        "job": job,
+        "started_at": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(started)),
+        "finished_at": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(finished)),
+        "duration": round(finished - started, 3),
+        "success": success,
+        **METRICS.snapshot()
+    }
+    write_file(json_path, json.dumps(summary, ensure_ascii=False, indent=2) + "\n")
+    write_file(os.path.join(directory, f"{job}.prom"), METRICS.prometheus(job))
+    return json_path
+
+@contextmanager
+def run_metrics(job: str, directory: Optional[str] = None) -> Iterator[None]:
+    """
+    Exécution instrumentée : le résumé est écrit à la sortie du bloc, y compris en cas
+    d'erreur ou d'interruption (run_success = 0, pour l'alerte)
+    """
+    started = time.time()
+    success = False
+    try:
+        yield
+        success = True
+    except SystemExit as e:
+        success = e.code in (None, 0)
+        raise
+    finally:
+        path = write_summary(job, started, success, directory or METRICS_DIR)
+        print(f"\n📈 Métriques: {path}")
+
+def report(summary: Dict):
+    print(f"📈 {summary['job']}: {summary['finished_at']}, {summary['duration']:.1f}s, "
+          f"{'succès' if summary['success'] else 'échec'}")
+    for counter in summary["counters"]:
+        labels = ", ".join(f"{k}={v}" for k, v in counter["labels"].items())
+        print(f"├─ {counter['name']}{f' ({labels})' if labels else ''}: {counter['value']:g}")
+    histograms = summary["histograms"]
+    for position, h in enumerate(histograms):
+        prefix = "└─" if position == len(histograms) - 1 else "├─"
+        labels = ", ".join(f"{k}={v}" for k, v in h["labels"].items())
+        print(f"{prefix} {h['name']}{f' ({labels})' if labels else ''}: {h['count']}x, "
+              f"p50 {h['p50']:.3f}s, p95 {h['p95']:.3f}s, total {h['sum']:.1f}s")
+
+def main():
+    job = sys.argv[1] if len(sys.argv) > 1 else "pipeline"
+    path = os.path.join(METRICS_DIR, f"{job}.json")
+    if not os.path.exists(path):
+        print(f"❌ Aucun résumé pour {job} ({path})")
+        sys.exit(1)
+    with open(path, 'r', encoding='utf-8') as f:
+        report(json.load(f))
+
+if __name__ == "__main__":
+    main()
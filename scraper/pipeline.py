@@ -0,0 +1,369 @@
+#!/usr/bin/env python3
+"""
+Chaîne de mise à jour des données MOF, étape par étape :
+    scrape → classify → corrections → resolve → geocode → validate → publish
+
+Chaque étape écrit son résultat dans data/pipeline/<étape>-<clé>.json. La clé est une
+empreinte de l'entrée de l'étape (le résultat de l'étape précédente), du code qui la
+produit et des options utilisées. Une relance réutilise le résultat de toute étape dont
+la clé n'a pas changé. Après une interruption, la chaîne reprend donc après la dernière
+étape terminée. data/pipeline/state.json garde la dernière exécution de chaque étape.
+
+    python3 pipeline.py                    # reprend ou met à jour ce qui a changé
+    python3 pipeline.py --input FICHIER    # part d'un fichier {meta, mof} au lieu du site
+    python3 pipeline.py --rescrape         # relance le scraping (sinon résultat réutilisé)
+                                           # annuaire inchangé (304) : étapes suivantes réutilisées
+    python3 pipeline.py --rescrape --no-cache  # sans requêtes conditionnelles
+    python3 pipeline.py --from geocode     # refait cette étape et les suivantes
+    python3 pipeline.py --until validate   # s'arrête après cette étape
+    python3 pipeline.py --status           # état des étapes, sans rien exécuter
+"""
+
+import hashlib
+import json
+import os
+import sys
+import time
+from typing import Callable, Dict, List, Optional
+
+from ban_index import DEFAULT_INDEX_PATH
+from corrections import correction_files
+from http_cache import HTTPCache
+from metrics import METRICS, run_metrics
+from publish import publish_data, write_atomic
+
+PIPELINE_DIR = "../data/pipeline"
+STATE_PATH = f"{PIPELINE_DIR}/state.json"
+SOURCE_URL = "https://www.meilleursouvriersdefrance.info/annuaire-mof"
+
+# Emprise large de la France (métropole, Corse et outre-mer) pour la validation des coordonnées
+FRANCE_BOUNDS = [
+    ((41.0, 51.5), (-5.5, 10.0)),      # Métropole et Corse
+    ((-22.0, 17.0), (-62.0, 56.0)),    # Antilles, Guyane, Réunion, Mayotte
+]
+
+class PipelineError(Exception):
+    pass
+
+def file_hash(path: str) -> str:
+    """Empreinte d'un fichier, lu par blocs (l'index BAN peut être volumineux)"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def code_version(modules: List[str]) -> str:
+    """Empreinte des sources d'une étape (et de ce fichier) : modifier le code invalide l'étape"""
+    digest = hashlib.sha256()
+    for module in [os.path.basename(__file__)] + modules:
+        digest.update(module.encode("utf-8"))
+        digest.update(file_hash(os.path.join(os.path.dirname(os.path.abspath(__file__)), module)).encode("ascii"))
+    return digest.hexdigest()
+
+def dump(data: Dict) -> bytes:
+    return (json.dumps(data, ensure_ascii=False, indent=2) + "\n").encode("utf-8")
+
+# --- Étapes : chacune reçoit le résultat de la précédente et retourne {meta, mof} ---
+
+def stage_scrape(_, options: Dict) -> Dict:
+    """Annuaire officiel (HTTP, Selenium en repli), ou fichier passé avec --input"""
+    if options.get("input"):
+        with open(options["input"], 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        print(f"  📂 {len(data['mof'])} MOF lus depuis {options['input']}")
+        return data
+
+    from scrape_mof_selenium import scrape_mof_listing
+    # Pages de l'annuaire revalidées par le cache HTTP ; leur empreinte permet à run_pipeline
+    # de garder le résultat précédent quand rien n'a changé
+    cache = None if options.get("no_cache") else HTTPCache()
+    mof_list, method = scrape_mof_listing(force_selenium=options.get("selenium", False), cache=cache)
+    options["source_digest"] = cache.fingerprint() if cache and method == "http" else None
+    if cache:
+        cache.report()
+    options["scrape_source"] = "web"
+    if len(mof_list) < 10:
+        # Comme scrape_mof.py : sans accès au site (hors ligne, structure modifiée), données
+        # d'exemple pour que la chaîne et le site restent utilisables ; jamais réutilisées
+        # comme un scraping (le passage suivant refait le scraping)
+        from scrape_mof import create_sample_data
+        print(f"  ⚠ Seulement {len(mof_list)} MOF trouvés : le scraping a probablement échoué")
+        mof_list, method = create_sample_data(), "sample"
+        options["source_digest"] = None
+        options["scrape_source"] = "sample"
+        print(f"  ✓ {len(mof_list)} MOF d'exemple chargés")
+    return {
+        "meta": {
+            "total": len(mof_list),
+            "generated_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "source": SOURCE_URL,
+            "method": method
+        },
+        "mof": mof_list
+    }
+
+def stage_classify(data: Dict, options: Dict) -> Dict:
+    """Catégorie canonique de chaque MOF ; les autres métiers sont écartés"""
+    from taxonomy import classify
+    kept = []
+    for mof in data["mof"]:
+        category = classify(mof.get("specialty"))
+        if category:
+            kept.append({**mof, "category": category})
+    if len(kept) < len(data["mof"]):
+        print(f"  ✂ {len(data['mof']) - len(kept)} MOF hors métiers de bouche écartés")
+    return {**data, "mof": kept}
+
+def stage_corrections(data: Dict, options: Dict) -> Dict:
+    """Corrections manuelles (data/corrections/) ; une adresse modifiée perd ses coordonnées"""
+    from corrections import apply_corrections
+    mof_list = [dict(mof) for mof in data["mof"]]
+    apply_corrections(mof_list).report()
+    return {**data, "meta": {**data["meta"], "total": len(mof_list)}, "mof": mof_list}
+
+def stage_resolve(data: Dict, options: Dict) -> Dict:
+    """Regroupement des enregistrements par artisan et par boutique (person_id, shop_id)"""
+    from entities import annotate
+    mof_list = [dict(mof) for mof in data["mof"]]
+    persons = annotate(mof_list)
+    print(f"  👥 {len(mof_list)} enregistrements → {len(persons)} artisans, "
+          f"{sum(len(p['shops']) for p in persons)} boutiques")
+    return {**data, "mof": mof_list}
+
+def stage_geocode(data: Dict, options: Dict) -> Dict:
+    """Coordonnées des adresses qui n'en ont pas (cache, index BAN, puis fournisseurs en ligne)"""
+    from geocoding import geocode_addresses, report_geocode_stats
+    mof_list = [dict(mof) for mof in data["mof"]]
+    missing = [mof for mof in mof_list
+               if mof.get("address") and (mof.get("coordinates") or {}).get("lat") is None]
+    print(f"  📍 {len(missing)} adresses à géocoder")
+    for mof, coords in zip(missing, geocode_addresses([mof["address"] for mof in missing])):
+        mof["coordinates"] = coords
+    for mof in mof_list:
+        mof.setdefault("coordinates", {"lat": None, "lon": None})
+    report_geocode_stats()
+    return {**data, "mof": mof_list}
+
+def source_unchanged(entry: Optional[Dict], key: str, options: Dict) -> bool:
+    """Même code et mêmes pages d'annuaire que le scraping enregistré"""
+    return bool(entry and entry["key"] == key and options.get("source_digest")
+                and entry.get("source_digest") == options["source_digest"]
+                and os.path.exists(entry["artifact"]))
+
+def in_france(lat: float, lon: float) -> bool:
+    return any(lat_min <= lat <= lat_max and lon_min <= lon <= lon_max
+               for (lat_min, lat_max), (lon_min, lon_max) in FRANCE_BOUNDS)
+
+def stage_validate(data: Dict, options: Dict) -> Dict:
+    """
+    Contrôles avant publication : identifiants uniques, nom et spécialité présents ;
+    des coordonnées hors de France sont retirées (avertissement)
+    """
+    errors, warnings = [], []
+    seen_ids = set()
+    mof_list = []
+    for mof in data["mof"]:
+        label = f"#{mof.get('id')} {mof.get('name')}"
+        if mof.get("id") in seen_ids:
+            errors.append(f"{label}: identifiant en double")
+        seen_ids.add(mof.get("id"))
+        if not mof.get("name") or not mof.get("specialty"):
+            errors.append(f"{label}: nom ou spécialité manquant")
+
+        coords = mof.get("coordinates") or {}
+        lat, lon = coords.get("lat"), coords.get("lon")
+        if lat is not None and lon is not None and not in_france(lat, lon):
+            warnings.append(f"{label}: coordonnées hors de France ({lat}, {lon}) retirées")
+            mof = {**mof, "coordinates": {"lat": None, "lon": None}}
+        mof_list.append(mof)
+
+    for warning in warnings:
+        print(f"  ⚠ {warning}")
+    if errors:
+        for error in errors:
+            print(f"  ❌ {error}")
+        raise PipelineError(f"{len(errors)} erreurs de validation")
+
+    with_coords = sum(1 for m in mof_list if m["coordinates"]["lat"] is not None)
+    print(f"  ✓ {len(mof_list)} MOF valides, {with_coords} avec coordonnées")
+    return {**data, "meta": {**data["meta"], "total": len(mof_list)}, "mof": mof_list}
+
+def stage_publish(data: Dict, options: Dict) -> Dict:
+    """Copie de travail, fichiers du site, pages métier-ville et sitemap"""
+    from landing_pages import generate_landing_pages
+    written = publish_data(json.loads(json.dumps(data)))
+    generate_landing_pages(data)
+    return {"meta": data["meta"], "written": sorted(path for path, changed in written.items() if changed)}
+
+class Stage:
+    def __init__(self, name: str, run: Callable[[Optional[Dict], Dict], Dict], modules: List[str],
+                 options: List[str] = (), data_files: Callable[[], List[str]] = list):
+        self.name = name
+        self.run = run
+        self.modules = modules
+        self.options = list(options)  # Options qui font partie de la clé de l'étape
+        self.data_files = data_files  # Fichiers lus par l'étape, en plus du résultat précédent
+
+    def key(self, input_hash: str, options: Dict) -> str:
+        payload = json.dumps({
+            "stage": self.name,
+            "code": code_version(self.modules),
+            "input": input_hash,
+            "files": {os.path.basename(path): file_hash(path) for path in self.data_files()},
+            "options": {name: options.get(name) for name in self.options}
+        }, sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+STAGES = [
+    Stage("scrape", stage_scrape, ["scrape_mof_selenium.py", "listing_http.py", "http_cache.py", "scrape_mof.py"], ["input", "input_hash", "selenium"]),
+    Stage("classify", stage_classify, ["taxonomy.py"]),
+    Stage("corrections", stage_corrections, ["corrections.py", "entities.py"], data_files=correction_files),
+    Stage("resolve", stage_resolve, ["entities.py"]),
+    Stage("geocode", stage_geocode, ["geocoding.py", "geocache.py", "ban_index.py"], ["geocoders", "geocode_hedge"],
+          data_files=lambda: [path for path in [DEFAULT_INDEX_PATH] if os.path.exists(path)]),
+    Stage("validate", stage_validate, []),
+    Stage("publish", stage_publish, ["publish.py", "landing_pages.py", "spatial_index.py", "search_index.py"]),
+]
+STAGE_NAMES = [stage.name for stage in STAGES]
+
+def load_state() -> Dict:
+    if not os.path.exists(STATE_PATH):
+        return {"stages": {}}
+    with open(STATE_PATH, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def save_state(state: Dict):
+    write_atomic(STATE_PATH, dump(state))
+
+def artifact_path(stage: Stage, key: str) -> str:
+    return f"{PIPELINE_DIR}/{stage.name}-{key[:16]}.json"
+
+def remove_stale_artifacts(state: Dict):
+    """Seuls les résultats de la dernière exécution de chaque étape sont conservés"""
+    keep = {os.path.basename(entry["artifact"]) for entry in state["stages"].values()}
+    keep.add(os.path.basename(STATE_PATH))
+    for filename in os.listdir(PIPELINE_DIR):
+        if filename not in keep:
+            os.remove(os.path.join(PIPELINE_DIR, filename))
+
+def run_pipeline(options: Dict, start_from: Optional[str] = None, until: Optional[str] = None) -> Dict:
+    """
+    Exécute les étapes dans l'ordre ; une étape dont la clé correspond à son dernier
+    résultat enregistré est sautée et ce résultat est relu
+    """
+    state = load_state()
+    forced = STAGE_NAMES.index(start_from) if start_from else len(STAGES)
+    last = STAGE_NAMES.index(until) if until else len(STAGES) - 1
+    if options.get("input"):
+        options["input_hash"] = file_hash(options["input"])
+
+    data, input_hash = None, ""
+    for position, stage in enumerate(STAGES[:last + 1]):
+        key = stage.key(input_hash, options)
+        entry = state["stages"].get(stage.name)
+        path = artifact_path(stage, key)
+        exists = entry and os.path.exists(entry["artifact"])
+        if stage.name == "scrape" and not options.get("input"):
+            # Sans --input, le dernier scraping est réutilisé tel quel, sauf avec --rescrape
+            reusable = exists and entry.get("source") == "web" and not options.get("rescrape")
+        else:
+            reusable = exists and entry["key"] == key
+
+        if reusable and position < forced:
+            with open(entry["artifact"], 'rb') as f:
+                payload = f.read()
+            print(f"✓ {stage.name}: inchangé ({os.path.basename(entry['artifact'])})")
+            METRICS.count("stages", stage=stage.name, result="reused")
+        else:
+            print(f"▶ {stage.name}")
+            start = time.perf_counter()
+            result = stage.run(data, options)
+            if stage.name == "scrape" and source_unchanged(entry, key, options):
+                # Annuaire identique au dernier scraping : résultat (et donc étapes suivantes) réutilisé
+                with open(entry["artifact"], 'rb') as f:
+                    payload = f.read()
+                entry["checked_at"] = time.strftime("%Y-%m-%d %H:%M:%S")
+                save_state(state)
+                print(f"  └─ annuaire inchangé, résultat précédent conservé ({os.path.basename(entry['artifact'])})")
+                METRICS.count("stages", stage=stage.name, result="unchanged")
+            else:
+                payload = dump(result)
+                write_atomic(path, payload)
+                entry = {
+                    "key": key,
+                    "artifact": path,
+                    "hash": hashlib.sha256(payload).hexdigest(),
+                    "completed_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+                    "duration": round(time.perf_counter() - start, 3)
+                }
+                if stage.name == "scrape":
+                    entry["source"] = options.get("input") or options.get("scrape_source", "web")
+                    entry["source_digest"] = options.get("source_digest")
+                state["stages"][stage.name] = entry
+                # État enregistré après chaque étape : une interruption reprend à la suivante
+                save_state(state)
+                print(f"  └─ {stage.name} terminé en {entry['duration']:.1f}s")
+                METRICS.observe("stage", entry["duration"], stage=stage.name)
+                METRICS.count("stages", stage=stage.name, result="run")
+
+        data = json.loads(payload)
+        input_hash = entry["hash"]
+
+    remove_stale_artifacts(state)
+    return data
+
+def print_status():
+    state = load_state()
+    print("📊 Étapes de la chaîne:")
+    for position, name in enumerate(STAGE_NAMES):
+        entry = state["stages"].get(name)
+        prefix = "└─" if position == len(STAGE_NAMES) - 1 else "├─"
+        if not entry:
+            print(f"{prefix} {name}: jamais exécutée")
+            continue
+        present = "" if os.path.exists(entry["artifact"]) else " (résultat absent)"
+        print(f"{prefix} {name}: {entry['completed_at']}, {entry['duration']:.1f}s{present}")
+
+def option_value(flag: str) -> Optional[str]:
+    if flag not in sys.argv:
+        return None
+    position = sys.argv.index(flag)
+    if position + 1 >= len(sys.argv):
+        print(f"❌ Valeur manquante après {flag}")
+        sys.exit(2)
+    return sys.argv[position + 1]
+
+def main():
+    if "--status" in sys.argv:
+        print_status()
+        return
+
+    start_from, until = option_value("--from"), option_value("--until")
+    for name in (start_from, until):
+        if name and name not in STAGE_NAMES:
+            print(f"❌ Étape inconnue: {name} (étapes : {', '.join(STAGE_NAMES)})")
+            sys.exit(2)
+
+    options = {
+        "input": option_value("--input"),
+        "rescrape": "--rescrape" in sys.argv,
+        "no_cache": "--no-cache" in sys.argv,
+        "selenium": "--selenium" in sys.argv,
+        # Fournisseurs de géocodage (voir geocoding.py) : en ajouter un peut combler des adresses introuvables
+        "geocoders": os.environ.get("MOF_GEOCODERS"),
+        "geocode_hedge": os.environ.get("MOF_GEOCODE_HEDGE")
+    }
+    run_start = time.time()
+    try:
+        with run_metrics("pipeline"):
+            data = run_pipeline(options, start_from, until)
+    except PipelineError as e:
+        print(f"\n❌ {e}")
+        print("Les étapes terminées sont conservées : corriger puis relancer pour reprendre")
+        sys.exit(1)
+
+    print(f"\n✅ {data['meta'].get('total')} MOF, chaîne terminée en {time.time() - run_start:.1f}s")
+
+if __name__ == "__main__":
+    main()
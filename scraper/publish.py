@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+"""
+Publication des données MOF
+- data/mof-data.json : copie de travail lisible (indentée), relue et corrigée par les scripts
+- public/ et docs/ : charge utile minifiée, sérialisée une seule fois, avec ses variantes
+  précompressées .gz et .br (si le module brotli est installé)
+- public/data/ et docs/data/ : fragments par catégorie et par département, index geohash
+  des coordonnées (spatial_index.py), index de recherche (search_index.py) et un manifeste
+  (nom, nombre d'enregistrements et empreinte de chaque fichier)
+Chaque fichier est remplacé de façon atomique (fichier temporaire + rename) et n'est
+réécrit que si son contenu a changé.
+
+Republier data/mof-data.json vers le site (--compare : tailles et temps, fichier unique vs fragments) :
+    python3 publish.py [--compare]
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import re
+import sys
+import time
+from typing import Dict, List, Optional
+
+from geocache import normalize_address
+from metrics import METRICS
+from search_index import build_search_index
+from spatial_index import build_index
+from taxonomy import classify_all
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+DATA_PATH = "../data/mof-data.json"
+SITE_DIRS = ["../public", "../docs"]
+SITE_DATA_FILE = "data.json"
+SHARDS_DIR = "data"
+MANIFEST_FILE = f"{SHARDS_DIR}/manifest.json"
+GEO_INDEX_FILE = f"{SHARDS_DIR}/geo-index.json"
+SEARCH_INDEX_FILE = f"{SHARDS_DIR}/search-index.json"
+
+POSTCODE_RE = re.compile(r"\b(\d{5})\b")
+
+def content_hash(data: Dict) -> str:
+    """Empreinte du contenu, hors date de génération"""
+    meta = {k: v for k, v in data.get("meta", {}).items() if k not in ("generated_at", "content_hash")}
+    payload = json.dumps({**data, "meta": meta}, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+def write_atomic(path: str, payload: bytes) -> bool:
+    """
+    Remplace `path` par `payload` de façon atomique
+    Retourne False (sans rien écrire) si le fichier a déjà ce contenu
+    """
+    if os.path.exists(path):
+        with open(path, 'rb') as f:
+            if f.read() == payload:
+                METRICS.count("writes", kind="atomic", result="unchanged")
+                return False
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with METRICS.timer("write", kind="atomic"):
+        with open(tmp_path, 'wb') as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    METRICS.count("writes", kind="atomic", result="written")
+    METRICS.count("written_bytes", len(payload), kind="atomic")
+    return True
+
+def compressed_variants(payload: bytes) -> Dict[str, bytes]:
+    """Variantes précompressées servies aux clients qui les acceptent"""
+    variants = {".gz": gzip.compress(payload, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        variants[".br"] = brotli.compress(payload, quality=11)
+    return variants
+
+def minify(data: Dict) -> bytes:
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+def stamp(data: Dict, data_path: str = DATA_PATH) -> Dict:
+    """
+    Ajoute l'empreinte du contenu aux métadonnées ; si le contenu publié est identique,
+    la date de génération précédente est conservée pour que les fichiers restent inchangés
+    """
+    digest = content_hash(data)
+    data["meta"]["content_hash"] = digest
+    if os.path.exists(data_path):
+        try:
+            with open(data_path, 'r', encoding='utf-8') as f:
+                previous = json.load(f).get("meta", {})
+        except (OSError, ValueError):
+            previous = {}
+        if previous.get("content_hash") == digest and previous.get("generated_at"):
+            data["meta"]["generated_at"] = previous["generated_at"]
+    return data
+
+def department_of(address: Optional[str]) -> Optional[str]:
+    """Département déduit du code postal de l'adresse (2A/2B pour la Corse, 971-976 outre-mer)"""
+    match = POSTCODE_RE.search(address or "")
+    if not match:
+        return None
+    postcode = match.group(1)
+    if postcode.startswith("20"):
+        return "2A" if postcode < "20200" else "2B"
+    if postcode.startswith("97"):
+        return postcode[:3]
+    return postcode[:2]
+
+def slugify(text: str) -> str:
+    return normalize_address(text).replace(" ", "-")
+
+def build_shards(data: Dict) -> Dict[str, bytes]:
+    """
+    Fragments par catégorie canonique (une spécialité composée appartient à chacune
+    de ses catégories) et par département, index geohash, index de recherche et manifeste ;
+    chemins relatifs au site
+    """
+    groups = {"categorie": {}, "departement": {}}
+    for mof in data["mof"]:
+        for category in classify_all(mof.get("specialty")):
+            groups["categorie"].setdefault(category, []).append(mof)
+        department = department_of(mof.get("address"))
+        if department:
+            groups["departement"].setdefault(department, []).append(mof)
+
+    files = {}
+    manifest = {
+        "meta": {
+            "total": len(data["mof"]),
+            "generated_at": data["meta"].get("generated_at"),
+            "content_hash": data["meta"]["content_hash"]
+        },
+        "shards": {}
+    }
+    for kind, shards in groups.items():
+        entries = []
+        for name, records in sorted(shards.items()):
+            path = f"{SHARDS_DIR}/{kind}/{slugify(name)}.json"
+            payload = minify({"meta": {"shard": name, "kind": kind, "total": len(records)}, "mof": records})
+            files[path] = payload
+            entries.append({
+                "name": name,
+                "path": path,
+                "count": len(records),
+                "hash": hashlib.sha256(payload).hexdigest()[:16]
+            })
+        manifest["shards"][kind] = entries
+
+    # Index geohash des coordonnées (recherche des MOF les plus proches)
+    geo_index = build_index(data["mof"])
+    files[GEO_INDEX_FILE] = minify(geo_index)
+    manifest["geo_index"] = {
+        "path": GEO_INDEX_FILE,
+        "precision": geo_index["precision"],
+        "count": geo_index["total"],
+        "hash": hashlib.sha256(files[GEO_INDEX_FILE]).hexdigest()[:16]
+    }
+
+    # Index de recherche textuelle ; content_hash permet au site de vérifier qu'il correspond à data.json
+    search_index = {"content_hash": data["meta"]["content_hash"], **build_search_index(data["mof"])}
+    files[SEARCH_INDEX_FILE] = minify(search_index)
+    manifest["search_index"] = {
+        "path": SEARCH_INDEX_FILE,
+        "grams": len(search_index["grams"]),
+        "hash": hashlib.sha256(files[SEARCH_INDEX_FILE]).hexdigest()[:16]
+    }
+    files[MANIFEST_FILE] = minify(manifest)
+    return files
+
+def manifest_files(site_dir: str) -> List[str]:
+    """Fichiers publiés d'après le manifeste en place (fragments et index), chemins relatifs au site"""
+    path = os.path.join(site_dir, MANIFEST_FILE)
+    if not os.path.exists(path):
+        return []
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return []
+    files = [entry["path"] for entries in manifest.get("shards", {}).values() for entry in entries]
+    files += [manifest[index]["path"] for index in ("geo_index", "search_index") if index in manifest]
+    return files
+
+def remove_stale_shards(site_dir: str, previous: List[str], keep: List[str]) -> List[str]:
+    """
+    Supprime les fragments du manifeste précédent qui ne sont plus publiés (catégorie ou
+    département disparu), avec leurs variantes ; les autres fichiers de data/ ne sont pas touchés
+    """
+    removed = []
+    keep = set(keep)
+    for name in previous:
+        # Un manifeste ne désigne que des fichiers de data/
+        if name in keep or not os.path.normpath(name).startswith(SHARDS_DIR + os.sep):
+            continue
+        for suffix in ("", ".gz", ".br"):
+            path = os.path.join(site_dir, name + suffix)
+            if os.path.exists(path):
+                os.remove(path)
+                removed.append(path)
+    return removed
+
+def publish_data(data: Dict, data_path: str = DATA_PATH, site_dirs: List[str] = SITE_DIRS) -> Dict[str, bool]:
+    """
+    Écrit la copie de travail et les fichiers du site
+    Retourne, pour chaque fichier, True s'il a été réécrit
+    """
+    written = {}
+    data = stamp(data, data_path)
+
+    pretty = json.dumps(data, ensure_ascii=False, indent=2).encode("utf-8")
+    written[data_path] = write_atomic(data_path, pretty)
+
+    # Une seule sérialisation (et compression) de chaque fichier pour tous les dossiers du site
+    site_files = {SITE_DATA_FILE: minify(data), **build_shards(data)}
+    variants = {}
+
+    for site_dir in site_dirs:
+        if not os.path.isdir(site_dir):
+            print(f"⚠ Dossier absent, publication ignorée: {site_dir}")
+            continue
+        previous = manifest_files(site_dir)
+        for name, payload in site_files.items():
+            path = os.path.join(site_dir, name)
+            changed = write_atomic(path, payload)
+            written[path] = changed
+
+            for suffix in (".gz", ".br"):
+                sibling = path + suffix
+                if not changed and os.path.exists(sibling):
+                    written[sibling] = False
+                    continue
+                if name not in variants:
+                    variants[name] = compressed_variants(payload)
+                if suffix in variants[name]:
+                    written[sibling] = write_atomic(sibling, variants[name][suffix])
+                elif os.path.exists(sibling):
+                    # Pas de brotli : une ancienne variante ne doit pas survivre au contenu qu'elle compresse
+                    os.remove(sibling)
+
+        for path in remove_stale_shards(site_dir, previous, list(site_files)):
+            print(f"🗑 {path}")
+
+    changed = [path for path, was_written in written.items() if was_written]
+    for path in changed:
+        print(f"✓ {path}")
+    print(f"= {len(written) - len(changed)} fichiers inchangés")
+    return written
+
+def compare_shards(data: Dict):
+    """Compare le fichier unique aux fragments : taille brute et gzip, temps de décodage JSON"""
+    def measure(payload: bytes):
+        start = time.perf_counter()
+        for _ in range(20):
+            json.loads(payload)
+        return len(payload), len(gzip.compress(payload, mtime=0)), (time.perf_counter() - start) / 20 * 1000
+
+    data["meta"]["content_hash"] = content_hash(data)
+    full = minify(data)
+    size, gz_size, ms = measure(full)
+    print(f"\n📊 Fichier unique: {size / 1024:.1f} Ko ({gz_size / 1024:.1f} Ko gzip), décodage {ms:.2f} ms")
+
+    shards = build_shards(data)
+    manifest = json.loads(shards[MANIFEST_FILE])
+    size, gz_size, ms = measure(shards[MANIFEST_FILE])
+    print(f"├─ Manifeste: {size / 1024:.1f} Ko ({gz_size / 1024:.1f} Ko gzip), décodage {ms:.2f} ms")
+    for kind, entries in manifest["shards"].items():
+        measures = sorted((measure(shards[e["path"]]), e["name"]) for e in entries)
+        if not measures:
+            continue
+        (size, gz_size, ms), name = measures[-1]
+        average = sum(m[0][1] for m in measures) / len(measures)
+        print(f"├─ {kind}: {len(measures)} fragments, {average / 1024:.1f} Ko gzip en moyenne, "
+              f"le plus gros \"{name}\" {size / 1024:.1f} Ko ({gz_size / 1024:.1f} Ko gzip), décodage {ms:.2f} ms")
+    print("└─ Une page filtrée télécharge le manifeste et ses fragments au lieu du fichier unique")
+
+def main():
+    with open(DATA_PATH, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    if "--compare" in sys.argv:
+        compare_shards(data)
+        return
+    print(f"📦 Publication de {len(data.get('mof', []))} MOF")
+    if brotli is None:
+        print("⚠ Module brotli absent : pas de variante .br (pip install brotli)")
+    publish_data(data)
+
+if __name__ == "__main__":
+    main()
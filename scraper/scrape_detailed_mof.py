@@ -5,91 +5,35 @@ Clique sur chaque MOF pour extraire les informations de la fiche détaillée
 """
 
 import json
+import sys
+import threading
 import time
 import re
-from typing import List, Dict
-from selenium import webdriver
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Optional, Set
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.options import Options
-from selenium.common.exceptions import TimeoutException, NoSuchElementException, ElementClickInterceptedException
-import requests
-
-# Catégories des métiers de bouche
-FOOD_CATEGORIES = [
-    "cuisine", "gastronomie", "cuisinier", "chef", "restaurateur",
-    "boulanger", "pâtissier", "pâtisserie", "confiseur", "confiserie",
-    "boucher", "boucherie", "charcutier", "traiteur",
-    "poissonnier", "écailler",
-    "fromager", "crémier",
-    "primeur", "fruitier", "maraîcher",
-    "chocolat", "glacier", "glace", "sorbet", "torréfacteur",
-    "sommelier", "barman", "maître", "service", "arts de la table",
-    "sécurité alimentaire"
-]
-
-def is_food_category(specialty: str) -> bool:
-    """Vérifie si la spécialité appartient aux métiers de bouche"""
-    if not specialty:
-        return False
-    specialty_lower = specialty.lower()
-    return any(cat in specialty_lower for cat in FOOD_CATEGORIES)
-
-def setup_driver():
-    """Configure le driver Selenium"""
-    chrome_options = Options()
-    chrome_options.add_argument('--headless')
-    chrome_options.add_argument('--no-sandbox')
-    chrome_options.add_argument('--disable-dev-shm-usage')
-    chrome_options.add_argument('--window-size=1920,1080')
+from selenium.common.exceptions import (
+    ElementClickInterceptedException, StaleElementReferenceException, WebDriverException
+)
 
-    try:
-        driver = webdriver.Chrome(options=chrome_options)
-        return driver
-    except Exception as e:
-        print(f"❌ Erreur driver Chrome: {e}")
-        return None
-
-def geocode_address(address: str):
-    """Géocode une adresse"""
-    if not address:
-        return {"lat": None, "lon": None}
-
-    base_url = "https://nominatim.openstreetmap.org/search"
-    params = {
-        "q": address,
-        "format": "json",
-        "limit": 1,
-        "countrycodes": "fr"
-    }
-    headers = {"User-Agent": "MOF-Guide-Scraper/3.0"}
-
-    try:
-        time.sleep(1.1)
-        response = requests.get(base_url, params=params, headers=headers, timeout=10)
-        response.raise_for_status()
-        data = response.json()
-
-        if data and len(data) > 0:
-            return {
-                "lat": float(data[0]["lat"]),
-                "lon": float(data[0]["lon"])
-            }
-    except Exception as e:
-        print(f"⚠ Erreur geocoding: {e}")
+from geocoding import geocode_addresses, report_geocode_stats
+from incremental import ScrapeState, entry_fingerprint, read_entry_attributes
+from metrics import METRICS, run_metrics
+from streaming import (JsonlWriter, assemble_json, completed_keys, geocode_stream, open_for_resume,
+                       read_jsonl, remove_stream, stream_path)
+from taxonomy import classify, is_food_category
+from browser import discard_driver, get_driver, new_driver, release_driver
+from waits import count_greater_than, in_viewport, modal_closed, modal_with_content, report_wait_timings, timed_wait
 
-    return {"lat": None, "lon": None}
+STATE_PATH = "../data/scrape-state-detailed.json"
 
 def extract_detail_from_modal(driver):
     """Extrait les détails depuis la modal/popup ouverte"""
     try:
-        # Attendre que la modal soit visible
-        WebDriverWait(driver, 5).until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, ".modal, .popup, .fiche"))
-        )
-
-        time.sleep(1)  # Laisser le contenu se charger
+        # Attendre que la modal soit visible et son contenu chargé
+        if not timed_wait(driver, "modal_content", modal_with_content, timeout=5):
+            print("⚠ Modal non affichée")
+            return {}
 
         detail = {}
 
@@ -152,124 +96,340 @@ def close_modal(driver):
             try:
                 close_btn = driver.find_element(By.CSS_SELECTOR, selector)
                 close_btn.click()
-                time.sleep(0.5)
-                return True
+                METRICS.count("clicks", target="modal_close")
             except:
                 continue
+            if timed_wait(driver, "modal_close", modal_closed, timeout=3):
+                return True
 
         # Si aucun bouton, cliquer sur l'overlay
         try:
             overlay = driver.find_element(By.CSS_SELECTOR, ".modal-backdrop, .overlay")
             overlay.click()
-            time.sleep(0.5)
-            return True
+            METRICS.count("clicks", target="modal_overlay")
+            if timed_wait(driver, "modal_close", modal_closed, timeout=3):
+                return True
         except:
             pass
 
         # Dernière option: ESC
         from selenium.webdriver.common.keys import Keys
         driver.find_element(By.TAG_NAME, 'body').send_keys(Keys.ESCAPE)
-        time.sleep(0.5)
+        if timed_wait(driver, "modal_close", modal_closed, timeout=3):
+            return True
 
     except Exception as e:
         print(f"⚠ Erreur fermeture modal: {e}")
 
     return False
 
-def scrape_detailed_mof(max_mof=50):
-    """Scrape détaillé avec clics sur chaque MOF"""
+DIRECTORY_URL = "https://www.meilleursouvriersdefrance.info/annuaire-mof"
+ITEM_SELECTOR = "ul#sort-me li.item-gallery"
+
+def open_directory(driver):
+    """Charge l'annuaire et retourne les éléments MOF de la page"""
+    with METRICS.timer("page_load", kind="selenium"):
+        driver.get(DIRECTORY_URL)
+    timed_wait(driver, "page_load", count_greater_than(ITEM_SELECTOR, 0), timeout=15)
+    return driver.find_elements(By.CSS_SELECTOR, ITEM_SELECTOR)
+
+def extract_entry_details(driver, element) -> Dict:
+    """Ouvre la fiche d'un MOF, en extrait les détails puis la referme"""
+    # Scroller jusqu'à l'élément
+    driver.execute_script("arguments[0].scrollIntoView(true);", element)
+    timed_wait(driver, "scroll_into_view", in_viewport(element), timeout=2)
+
+    # Cliquer sur l'élément
+    element.click()
+    METRICS.count("clicks", target="entry")
+
+    # Extraire les détails (attend l'ouverture de la modal)
+    with METRICS.timer("modal_extraction"):
+        details = extract_detail_from_modal(driver)
+    METRICS.count("modal_extractions", outcome="ok" if details else "empty")
+
+    # Fermer la modal (attend sa disparition)
+    close_modal(driver)
+
+    return details
+
+def run_detail_worker(worker_id: int, shard: List, driver=None, max_restarts: int = 3,
+                      on_result=None) -> Dict[int, Dict]:
+    """
+    Traite une part des entrées dans son propre navigateur
+    shard: liste de (position dans la liste, attributs data-*)
+    Retourne {position: détails} ; le navigateur est relancé s'il plante
+    Avec on_result(position, détails), chaque fiche est transmise dès son extraction
+    au lieu d'être gardée pour le retour
+    """
+    results = {}
+    pending = list(shard)
+    elements = driver and driver.find_elements(By.CSS_SELECTOR, ITEM_SELECTOR)
+    restarts = 0
+    attempts = 0
+
+    while pending:
+        position, attrs = pending[0]
+        try:
+            if driver is None:
+                driver = get_driver() if worker_id == 1 else new_driver()
+                if driver is None:
+                    break
+                elements = None
+            if elements is None:
+                elements = open_directory(driver)
+
+            element = elements[position] if position < len(elements) else None
+            if element is None or element.get_attribute("data-nom") != attrs["data-nom"]:
+                print(f"  [w{worker_id}] ⚠ {attrs['data-nom']} introuvable à sa position, ignoré")
+                pending.pop(0)
+                continue
+
+            print(f"  [w{worker_id}] {attrs['data-nom']} - {attrs['data-metier']}")
+            details = extract_entry_details(driver, element)
+            if on_result:
+                on_result(position, details)
+            else:
+                results[position] = details
+            pending.pop(0)
+            attempts = 0
+
+        except ElementClickInterceptedException:
+            print(f"  [w{worker_id}] ⚠ Impossible de cliquer")
+            pending.pop(0)
+            attempts = 0
+
+        except StaleElementReferenceException:
+            # La liste a été redessinée : on recharge la page et on réessaie l'entrée
+            elements = None
+            attempts += 1
+            METRICS.count("retries", component="stale_element")
+            if attempts > 1:
+                pending.pop(0)
+                attempts = 0
+
+        except WebDriverException as e:
+            # Navigateur planté : on le relance
+            restarts += 1
+            METRICS.count("retries", component="browser")
+            print(f"  [w{worker_id}] ⚠ Navigateur planté ({e.__class__.__name__}), relance {restarts}/{max_restarts}")
+            discard_driver(driver)
+            driver = None
+            if restarts > max_restarts:
+                print(f"  [w{worker_id}] ❌ Abandon de {len(pending)} entrées")
+                break
+
+        except Exception as e:
+            print(f"  [w{worker_id}] ⚠ Erreur: {e}")
+            pending.pop(0)
+            attempts = 0
+
+    release_driver(driver)
+    return results
+
+def build_record(attrs: Dict, details: Dict, mof_id: int) -> Dict:
+    """Enregistrement d'une entrée de l'annuaire complétée par sa fiche détaillée"""
+    return {
+        "id": mof_id,
+        "name": attrs["data-nom"],
+        "specialty": attrs["data-metier"],
+        "category": classify(attrs["data-metier"]),
+        "address": details.get('address'),
+        "year": details.get('year'),
+        "website": details.get('website'),
+        "coordinates": {"lat": None, "lon": None}
+    }
+
+def report_record(mof_data: Dict):
+    if mof_data['address']:
+        print(f"  ✓ {mof_data['name']}: {mof_data['address'][:60]}...")
+    else:
+        print(f"  ✗ {mof_data['name']}: pas d'adresse trouvée")
+
+def scrape_detailed_mof(max_mof=50, state: Optional[ScrapeState] = None, workers: int = 1,
+                        writer: Optional[JsonlWriter] = None, done: Set[str] = frozenset()):
+    """
+    Scrape détaillé avec clics sur chaque MOF
+    Les entrées à ouvrir sont réparties entre `workers` navigateurs indépendants,
+    puis fusionnées dans l'ordre de l'annuaire
+    En mode incrémental, les entrées inchangées ne sont pas rouvertes et ne comptent pas dans max_mof
+    Mode flux (`writer`) : chaque enregistrement est écrit dès l'extraction de sa fiche, dans
+    l'ordre d'arrivée, avec pour id sa position dans l'annuaire + 1 (ordre rétabli à l'assemblage),
+    et rien n'est retourné ; les entrées de `done` (passage interrompu) sont sautées
+    """
     print("=== Scraper MOF Détaillé (avec vraies adresses) ===\n")
 
-    driver = setup_driver()
+    driver = get_driver()
     if not driver:
         return []
 
+    # Repérer les entrées à traiter
+    plan = []
+    processed = 0
     try:
-        url = "https://www.meilleursouvriersdefrance.info/annuaire-mof"
-        print(f"🌐 Chargement de {url}...")
-        driver.get(url)
-        time.sleep(3)
-
-        # Récupérer tous les éléments MOF
-        mof_elements = driver.find_elements(By.CSS_SELECTOR, "ul#sort-me li.item-gallery")
+        print(f"🌐 Chargement de {DIRECTORY_URL}...")
+        mof_elements = open_directory(driver)
         print(f"📋 {len(mof_elements)} MOF trouvés\n")
 
-        mof_list = []
-        processed = 0
-
-        for idx, element in enumerate(mof_elements):
+        for position, element in enumerate(mof_elements):
             if processed >= max_mof:
-                print(f"\n⚠ Limite de {max_mof} MOF atteinte")
+                print(f"⚠ Limite de {max_mof} MOF atteinte")
                 break
 
             try:
-                # Extraire les données de base
-                name = element.get_attribute("data-nom")
-                specialty = element.get_attribute("data-metier")
-
-                if not specialty or not is_food_category(specialty):
-                    continue
-
-                print(f"[{processed + 1}] {name} - {specialty}")
-
-                # Scroller jusqu'à l'élément
-                driver.execute_script("arguments[0].scrollIntoView(true);", element)
-                time.sleep(0.5)
-
-                # Cliquer sur l'élément
-                try:
-                    element.click()
-                    time.sleep(2)
-
-                    # Extraire les détails
-                    details = extract_detail_from_modal(driver)
-
-                    mof_data = {
-                        "id": processed + 1,
-                        "name": name,
-                        "specialty": specialty,
-                        "address": details.get('address'),
-                        "year": details.get('year'),
-                        "website": details.get('website'),
-                        "coordinates": {"lat": None, "lon": None}
-                    }
-
-                    if mof_data['address']:
-                        print(f"  ✓ Adresse: {mof_data['address'][:60]}...")
-                    else:
-                        print(f"  ✗ Pas d'adresse trouvée")
-
-                    mof_list.append(mof_data)
-                    processed += 1
-
-                    # Fermer la modal
-                    close_modal(driver)
-                    time.sleep(1)
-
-                except ElementClickInterceptedException:
-                    print(f"  ⚠ Impossible de cliquer")
-                    continue
-
+                attrs = read_entry_attributes(element)
             except Exception as e:
                 print(f"  ⚠ Erreur: {e}")
                 continue
 
-        return mof_list
+            if not attrs["data-metier"] or not is_food_category(attrs["data-metier"]):
+                continue
+            if entry_fingerprint(attrs) in done:
+                if state:
+                    state.track_resumed(attrs)
+                continue
+
+            carried = state.lookup(attrs) if state else None
+            plan.append((position, attrs, carried))
+            if not carried:
+                processed += 1
 
     except Exception as e:
         print(f"❌ Erreur générale: {e}")
+        release_driver(driver)
         return []
-    finally:
-        driver.quit()
+
+    # Extraction détaillée en parallèle (le premier worker réutilise le navigateur déjà ouvert)
+    to_process = [(position, attrs) for position, attrs, carried in plan if not carried]
+    workers = max(1, min(workers, len(to_process)))
+    shards = [to_process[i::workers] for i in range(workers)]
+    print(f"🔎 {len(to_process)} fiches à ouvrir avec {workers} navigateur(s)\n")
+
+    on_result = None
+    if writer:
+        lock = threading.Lock()
+        attrs_at = {position: attrs for position, attrs in to_process}
+
+        def on_result(position, details):
+            attrs = attrs_at[position]
+            mof_data = build_record(attrs, details, position + 1)
+            with lock:
+                report_record(mof_data)
+                writer.write(entry_fingerprint(attrs), mof_data)
+                if state:
+                    state.track(attrs, mof_data, changed=True)
+
+        # Les entrées reprises du passage précédent sont écrites tout de suite
+        for position, attrs, carried in plan:
+            if carried:
+                mof_data = {"id": position + 1, **carried, "category": classify(attrs["data-metier"])}
+                writer.write(entry_fingerprint(attrs), mof_data)
+                state.track(attrs, mof_data, changed=False)
+
+    results = {}
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            pool.submit(run_detail_worker, i + 1, shard, driver if i == 0 else None, on_result=on_result)
+            for i, shard in enumerate(shards)
+        ]
+        for future in futures:
+            results.update(future.result())
+
+    if writer:
+        return []
+
+    # Fusion dans l'ordre de l'annuaire
+    mof_list = []
+    for position, attrs, carried in plan:
+        if carried:
+            mof_data = {"id": len(mof_list) + 1, **carried, "category": classify(attrs["data-metier"])}
+            mof_list.append(mof_data)
+            state.track(attrs, mof_data, changed=False)
+            continue
+        if position not in results:
+            continue
+
+        mof_data = build_record(attrs, results[position], len(mof_list) + 1)
+        report_record(mof_data)
+        mof_list.append(mof_data)
+        if state:
+            state.track(attrs, mof_data, changed=True)
+
+    return mof_list
+
+OUTPUT_PATH = "../data/mof-detailed-sample.json"
+
+def detailed_meta() -> Dict:
+    return {
+        "generated_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "source": "https://www.meilleursouvriersdefrance.info/annuaire-mof",
+        "method": "selenium_detailed",
+        "note": "Adresses réelles extraites des fiches individuelles"
+    }
+
+def run_streaming(state: Optional[ScrapeState], workers: int) -> int:
+    """
+    Mode --stream : fiches écrites dans data/stream/ dès leur extraction, géocodées par lots
+    dans un second fichier, puis fichier final assemblé en un parcours
+    Une relance après interruption ne rouvre que les fiches absentes des fichiers de flux
+    Retourne le nombre de MOF du fichier final
+    """
+    records_path = stream_path("detailed", "records")
+    geocoded_path = stream_path("detailed", "geocoded")
+
+    done = completed_keys(records_path)
+    if done:
+        print(f"♻ Reprise : {len(done)} fiches déjà extraites lors du passage interrompu\n")
+    with open_for_resume(records_path) as writer:
+        scrape_detailed_mof(max_mof=50, state=state, workers=workers, writer=writer, done=done)
+        written = writer.written
+    print(f"\n✓ {written} MOF extraits ({written + len(done)} au total)")
+
+    stats = geocode_stream(records_path, geocoded_path)
+    print(f"📍 {stats['geocoded']} adresses géocodées, {stats['resumed']} reprises")
+
+    with_address = sum(1 for line in read_jsonl(geocoded_path) if line["mof"].get("address"))
+    # Ordre de l'annuaire et id renumérotés comme en mode normal, quel que soit l'ordre d'extraction
+    total = assemble_json(geocoded_path, OUTPUT_PATH, detailed_meta(), order_by_id=True)
+    if state:
+        # État enregistré avec les coordonnées, y compris pour les fiches reprises du passage interrompu
+        state.refresh({line["key"]: line["mof"] for line in read_jsonl(geocoded_path)})
+    remove_stream([records_path, geocoded_path])
+    print(f"\n✓ Données sauvegardées dans {OUTPUT_PATH}")
+    print("\n📊 Statistiques:")
+    print(f"├─ Total: {total}")
+    print(f"├─ Avec adresse: {with_address}")
+    print(f"└─ Sans adresse: {total - with_address}")
+    return total
 
 def main():
     print("╔════════════════════════════════════════════════╗")
     print("║  Scraper MOF Détaillé                          ║")
     print("║  Extraction des vraies adresses                ║")
     print("╚════════════════════════════════════════════════╝\n")
+    run_start = time.time()
+
+    # Mode incrémental : ne rouvrir que les fiches nouvelles ou modifiées
+    state = ScrapeState(STATE_PATH) if "--incremental" in sys.argv else None
+
+    # Nombre de navigateurs en parallèle (--workers N)
+    workers = 1
+    if "--workers" in sys.argv:
+        workers = int(sys.argv[sys.argv.index("--workers") + 1])
+
+    # Mode flux : chaque fiche est écrite sur disque dès son extraction (--stream)
+    if "--stream" in sys.argv:
+        run_streaming(state, workers)
+        if state:
+            state.save()
+            state.report()
+        report_wait_timings()
+        report_geocode_stats()
+        print(f"\n⏱ Durée totale: {time.time() - run_start:.1f}s")
+        return
 
     # Scraping (limité à 50 pour tests)
-    mof_list = scrape_detailed_mof(max_mof=50)
+    mof_list = scrape_detailed_mof(max_mof=50, state=state, workers=workers)
 
     if not mof_list:
         print("\n❌ Aucune donnée récupérée")
@@ -281,34 +441,36 @@ def main():
     with_address = [m for m in mof_list if m.get('address')]
     print(f"✓ {len(with_address)} avec adresses")
 
-    # Géocoder
-    if with_address:
-        print(f"\n📍 Géocodage de {len(with_address)} adresses...")
-        for mof in with_address:
-            print(f"  {mof['name']}...")
-            coords = geocode_address(mof['address'])
+    # Géocoder (en mode incrémental, uniquement les entrées nouvelles ou modifiées)
+    to_geocode = with_address
+    if state:
+        to_geocode = [m for m in state.changed_records() if m.get('address')]
+    if to_geocode:
+        print(f"\n📍 Géocodage de {len(to_geocode)} adresses...")
+        coords_list = geocode_addresses([mof['address'] for mof in to_geocode])
+        for mof, coords in zip(to_geocode, coords_list):
             mof['coordinates'] = coords
 
     # Sauvegarder
-    data = {
-        "meta": {
-            "total": len(mof_list),
-            "generated_at": time.strftime("%Y-%m-%d %H:%M:%S"),
-            "source": "https://www.meilleursouvriersdefrance.info/annuaire-mof",
-            "method": "selenium_detailed",
-            "note": "Adresses réelles extraites des fiches individuelles"
-        },
-        "mof": mof_list
-    }
+    data = {"meta": {"total": len(mof_list), **detailed_meta()}, "mof": mof_list}
 
-    with open("../data/mof-detailed-sample.json", 'w', encoding='utf-8') as f:
+    with open(OUTPUT_PATH, 'w', encoding='utf-8') as f:
         json.dump(data, f, ensure_ascii=False, indent=2)
 
-    print(f"\n✓ Données sauvegardées dans ../data/mof-detailed-sample.json")
+    print(f"\n✓ Données sauvegardées dans {OUTPUT_PATH}")
+    if state:
+        state.save()
+        state.report()
+
+    report_wait_timings()
+    print(f"\n⏱ Durée totale: {time.time() - run_start:.1f}s")
     print("\n📊 Statistiques:")
     print(f"├─ Total: {len(mof_list)}")
     print(f"├─ Avec adresse: {len(with_address)}")
     print(f"└─ Sans adresse: {len(mof_list) - len(with_address)}")
 
+    report_geocode_stats()
+
 if __name__ == "__main__":
-    main()
+    with run_metrics("scrape_detailed_mof"):
+        main()
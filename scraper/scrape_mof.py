@@ -6,26 +6,20 @@ depuis le site officiel https://www.meilleursouvriersdefrance.info/annuaire-mof
 
 import requests
 from bs4 import BeautifulSoup
+from lxml import etree
+import hashlib
 import json
 import re
+import sys
 import time
-from typing import List, Dict
+from typing import Dict, Iterator, List, Optional
 from urllib.parse import urljoin
 
-# Catégories des métiers de bouche
-FOOD_CATEGORIES = [
-    "boulanger", "pâtissier", "chocolatier", "confiseur",
-    "traiteur", "cuisinier", "chef", "fromager", "crémier",
-    "boucher", "charcutier", "poissonnier", "sommelier",
-    "glacier", "primeur", "maraîcher"
-]
-
-def is_food_category(specialty: str) -> bool:
-    """Vérifie si la spécialité appartient aux métiers de bouche"""
-    if not specialty:
-        return False
-    specialty_lower = specialty.lower()
-    return any(cat in specialty_lower for cat in FOOD_CATEGORIES)
+from geocoding import geocode_addresses, report_geocode_stats
+from http_cache import HTTPCache
+from metrics import METRICS, run_metrics
+from publish import publish_data
+from taxonomy import classify
 
 def extract_year(text: str) -> int:
     """Extrait l'année du titre MOF depuis un texte"""
@@ -40,47 +34,188 @@ def clean_text(text: str) -> str:
         return ""
     return ' '.join(text.strip().split())
 
-def geocode_address(address: str) -> Dict:
+BASE_URL = "https://www.meilleursouvriersdefrance.info"
+
+def absolute_url(href: str) -> str:
+    """URL absolue d'un lien de l'annuaire (urljoin seulement s'il y a des segments à résoudre)"""
+    if href.startswith('/') and not href.startswith('//') and '/.' not in href:
+        return BASE_URL + href
+    return urljoin(BASE_URL, href)
+
+# ADAPTATION NÉCESSAIRE : ces sélecteurs doivent être ajustés selon la structure HTML réelle du site
+# Voici une structure générique à adapter après inspection du site
+ITEM_SELECTOR = '.mof-item, .artisan, .member, article, .card'
+FIELD_SELECTORS = {
+    "name": '.name, .title, h2, h3, .artisan-name',
+    "specialty": '.specialty, .metier, .category, .profession',
+    "address": '.address, .location, .adresse',
+    "year": '.year, .annee, .date',
+    "website": 'a[href*="http"], .website, .site',
+}
+
+class SelectorIndex:
     """
-    Géocode une adresse via l'API Nominatim d'OpenStreetMap
-    Rate limit: 1 requête/seconde
+    Sélecteurs CSS simples compilés une fois en tables de correspondance (tag, classe)
+    Formes reconnues, séparées par des virgules : tag, .classe, tag[attr*="valeur"]
     """
-    if not address:
-        return {"lat": None, "lon": None}
-
-    base_url = "https://nominatim.openstreetmap.org/search"
-    params = {
-        "q": address,
-        "format": "json",
-        "limit": 1,
-        "countrycodes": "fr"
-    }
-    headers = {
-        "User-Agent": "MOF-Guide-Scraper/1.0"
-    }
 
+    ATTR_CONTAINS = re.compile(r'(\w+)\[([\w-]+)\*="([^"]*)"\]')
+
+    def __init__(self, selectors: Dict[str, str]):
+        self.names = list(selectors)
+        self.by_tag = {}
+        self.by_class = {}
+        self.by_attr = {}
+        self.cache = {}
+        for name, selector in selectors.items():
+            for part in (p.strip() for p in selector.split(',')):
+                match = self.ATTR_CONTAINS.fullmatch(part)
+                if match:
+                    tag, attr, value = match.groups()
+                    self.by_attr.setdefault(tag, []).append((attr, value, name))
+                elif part.startswith('.'):
+                    self.by_class.setdefault(part[1:], []).append(name)
+                elif part.isalnum():
+                    self.by_tag.setdefault(part, []).append(name)
+                else:
+                    raise ValueError(f"Sélecteur non supporté: {part}")
+
+    def matching(self, element) -> List[str]:
+        """Noms des sélecteurs auxquels l'élément correspond"""
+        tag = element.tag
+        classes = element.get('class')
+        # Les mêmes couples (tag, attribut class) se répètent d'une fiche à l'autre
+        key = (tag, classes)
+        names = self.cache.get(key)
+        if names is None:
+            names = list(self.by_tag.get(tag, ()))
+            if classes:
+                for cls in classes.split():
+                    names.extend(self.by_class.get(cls, ()))
+            self.cache[key] = names
+        if tag in self.by_attr:
+            names = names + [name for attr, value, name in self.by_attr[tag]
+                             if value in (element.get(attr) or '')]
+        return names
+
+ITEM_INDEX = SelectorIndex({"item": ITEM_SELECTOR})
+FIELD_INDEX = SelectorIndex(FIELD_SELECTORS)
+HTML_PARSER = etree.HTMLParser(remove_comments=True, remove_pis=True)
+HTML_PARSER_UTF8 = etree.HTMLParser(remove_comments=True, remove_pis=True, encoding='utf-8')
+
+def iter_items_lxml(content: bytes) -> Iterator[Dict]:
+    """
+    Mode rapide : arbre lxml (construit en C), filtre des seuls éléments candidats,
+    puis un unique parcours des descendants de chaque élément pour tous les champs
+    (premier descendant correspondant, dans l'ordre du document, comme select_one)
+    """
+    # Sans charset déclaré, libxml2 lirait les octets en latin-1 : on essaie d'abord UTF-8,
+    # en lui passant les octets (plus rapide qu'une chaîne décodée qu'il réencoderait)
     try:
-        time.sleep(1.1)  # Respect rate limit
-        response = requests.get(base_url, params=params, headers=headers, timeout=10)
-        response.raise_for_status()
-        data = response.json()
+        content.decode('utf-8')
+        parser = HTML_PARSER_UTF8
+    except UnicodeDecodeError:
+        parser = HTML_PARSER
+    root = etree.fromstring(content, parser)
+    if root is None:
+        return
+
+    field_count = len(FIELD_INDEX.names)
+    for item in root.iter(etree.Element):
+        if not ITEM_INDEX.matching(item):
+            continue
+
+        fields = {}
+        for element in item.iterdescendants(etree.Element):
+            for field in FIELD_INDEX.matching(element):
+                if field not in fields:
+                    fields[field] = element
+            if len(fields) == field_count:
+                break
+        yield fields
+
+def iter_items_soup(content: bytes) -> Iterator[Dict]:
+    """Mode historique : arbre BeautifulSoup complet et sélecteurs CSS"""
+    soup = BeautifulSoup(content, 'html.parser')
+    for item in soup.select(ITEM_SELECTOR):
+        yield {field: item.select_one(sel) for field, sel in FIELD_SELECTORS.items()}
+
+def lxml_text(element) -> str:
+    """Texte de l'élément et de ses descendants (sérialisation texte en C plutôt que itertext)"""
+    if not len(element):
+        return element.text or ''
+    return etree.tostring(element, method='text', encoding=str, with_tail=False)
+
+PARSERS = {
+    "lxml": (iter_items_lxml, lxml_text),
+    "soup": (iter_items_soup, lambda e: e.get_text()),
+}
+
+def parse_mof_directory(content: bytes, parser: str = "lxml", verbose: bool = True) -> List[Dict]:
+    """
+    Extrait les MOF métiers de bouche d'une page de l'annuaire
+    parser: "lxml" (rapide) ou "soup" (BeautifulSoup, historique)
+    """
+    iter_items, get_text = PARSERS[parser]
+    mof_list = []
+    count = 0
+
+    for idx, fields in enumerate(iter_items(content)):
+        count += 1
+        try:
+            name_elem = fields.get("name")
+            specialty_elem = fields.get("specialty")
+            address_elem = fields.get("address")
+            year_elem = fields.get("year")
+            website_elem = fields.get("website")
+
+            name = clean_text(get_text(name_elem)) if name_elem is not None else None
+            specialty = clean_text(get_text(specialty_elem)) if specialty_elem is not None else None
+
+            # Ne garder que les métiers de bouche
+            category = classify(specialty)
+            if not category:
+                continue
+
+            address = clean_text(get_text(address_elem)) if address_elem is not None else None
+            year = extract_year(get_text(year_elem)) if year_elem is not None else None
+            website = website_elem.get('href') if website_elem is not None else None
+
+            if website and not website.startswith('http'):
+                website = absolute_url(website)
+
+            if not name:
+                continue
 
-        if data and len(data) > 0:
-            return {
-                "lat": float(data[0]["lat"]),
-                "lon": float(data[0]["lon"])
+            mof_data = {
+                "id": idx + 1,
+                "name": name,
+                "specialty": specialty,
+                "category": category,
+                "address": address,
+                "year": year,
+                "website": website,
+                "coordinates": {"lat": None, "lon": None}
             }
-    except Exception as e:
-        print(f"Erreur geocoding pour '{address}': {e}")
 
-    return {"lat": None, "lon": None}
+            mof_list.append(mof_data)
+            if verbose:
+                print(f"✓ {name} - {specialty}")
+
+        except Exception as e:
+            print(f"Erreur extraction élément {idx}: {e}")
+            continue
 
-def scrape_mof_directory() -> List[Dict]:
+    if verbose:
+        print(f"Trouvé {count} éléments potentiels")
+    return mof_list
+
+def fetch_directory(cache: Optional[HTTPCache] = None) -> Optional[requests.Response]:
     """
-    Scrape le site officiel des MOF et retourne une liste de MOF métiers de bouche
+    Télécharge la page de l'annuaire (requête conditionnelle si un cache est fourni)
+    Retourne None en cas d'erreur
     """
-    base_url = "https://www.meilleursouvriersdefrance.info"
-    annuaire_url = f"{base_url}/annuaire-mof"
+    annuaire_url = f"{BASE_URL}/annuaire-mof"
 
     headers = {
         "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36"
@@ -89,87 +224,52 @@ def scrape_mof_directory() -> List[Dict]:
     print(f"Scraping de {annuaire_url}...")
 
     try:
-        response = requests.get(annuaire_url, headers=headers, timeout=15)
+        with METRICS.timer("page_load", kind="http"):
+            if cache:
+                response = cache.get(annuaire_url, headers=headers, timeout=15)
+            else:
+                response = requests.get(annuaire_url, headers=headers, timeout=15)
         response.raise_for_status()
-        soup = BeautifulSoup(response.content, 'html.parser')
-
-        mof_list = []
-
-        # ADAPTATION NÉCESSAIRE : Cette partie doit être ajustée selon la structure HTML réelle du site
-        # Voici une structure générique à adapter après inspection du site
-
-        # Exemple de sélecteurs possibles (à ajuster)
-        mof_items = soup.select('.mof-item, .artisan, .member, article, .card')
-
-        print(f"Trouvé {len(mof_items)} éléments potentiels")
-
-        for idx, item in enumerate(mof_items):
-            try:
-                # Extraction des données (à adapter selon la structure HTML)
-                name_elem = item.select_one('.name, .title, h2, h3, .artisan-name')
-                specialty_elem = item.select_one('.specialty, .metier, .category, .profession')
-                address_elem = item.select_one('.address, .location, .adresse')
-                year_elem = item.select_one('.year, .annee, .date')
-                website_elem = item.select_one('a[href*="http"], .website, .site')
-
-                name = clean_text(name_elem.get_text()) if name_elem else None
-                specialty = clean_text(specialty_elem.get_text()) if specialty_elem else None
-
-                # Ne garder que les métiers de bouche
-                if not specialty or not is_food_category(specialty):
-                    continue
+        if getattr(response, "from_cache", False):
+            print("✓ Page inchangée depuis le dernier téléchargement (304)")
+        return response
 
-                address = clean_text(address_elem.get_text()) if address_elem else None
-                year = extract_year(year_elem.get_text()) if year_elem else None
-                website = website_elem.get('href') if website_elem else None
-
-                if website and not website.startswith('http'):
-                    website = urljoin(base_url, website)
-
-                if not name:
-                    continue
-
-                mof_data = {
-                    "id": idx + 1,
-                    "name": name,
-                    "specialty": specialty,
-                    "address": address,
-                    "year": year,
-                    "website": website,
-                    "coordinates": {"lat": None, "lon": None}
-                }
-
-                mof_list.append(mof_data)
-                print(f"✓ {name} - {specialty}")
-
-            except Exception as e:
-                print(f"Erreur extraction élément {idx}: {e}")
-                continue
-
-        return mof_list
+    except Exception as e:
+        print(f"Erreur lors du scraping: {e}")
+        return None
 
+def parse_directory_response(response: Optional[requests.Response], parser: str = "lxml") -> List[Dict]:
+    if response is None:
+        return []
+    try:
+        return parse_mof_directory(response.content, parser)
     except Exception as e:
         print(f"Erreur lors du scraping: {e}")
         return []
 
+def scrape_mof_directory(parser: str = "lxml", cache: Optional[HTTPCache] = None) -> List[Dict]:
+    """
+    Scrape le site officiel des MOF et retourne une liste de MOF métiers de bouche
+    """
+    return parse_directory_response(fetch_directory(cache), parser)
+
+def source_version(parser: str) -> str:
+    """Analyseur et code de ce script : les modifier invalide le dernier passage enregistré"""
+    with open(__file__, 'rb') as f:
+        return f"{parser}:{hashlib.sha256(f.read()).hexdigest()[:16]}"
+
 def geocode_mof_list(mof_list: List[Dict]) -> List[Dict]:
     """Ajoute les coordonnées géographiques à chaque MOF"""
     print(f"\nGéocodage de {len(mof_list)} adresses...")
 
-    for idx, mof in enumerate(mof_list):
-        if mof.get("address"):
-            print(f"[{idx+1}/{len(mof_list)}] Géocodage: {mof['name']} - {mof['address']}")
-            coords = geocode_address(mof["address"])
-            mof["coordinates"] = coords
-        else:
-            mof["coordinates"] = {"lat": None, "lon": None}
+    coords_list = geocode_addresses([mof.get("address") for mof in mof_list])
+    for mof, coords in zip(mof_list, coords_list):
+        mof["coordinates"] = coords
 
     return mof_list
 
 def save_to_json(mof_list: List[Dict], filepath: str):
     """Sauvegarde les données en JSON"""
-    import shutil
-
     data = {
         "meta": {
             "total": len(mof_list),
@@ -179,19 +279,9 @@ def save_to_json(mof_list: List[Dict], filepath: str):
         "mof": mof_list
     }
 
-    # Sauvegarder dans data/
-    with open(filepath, 'w', encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
-    print(f"\n✓ Données sauvegardées dans {filepath}")
-
-    # Copier aussi dans public/ pour le site web
-    public_path = "../public/data.json"
-    try:
-        with open(public_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
-        print(f"✓ Données copiées dans {public_path}")
-    except Exception as e:
-        print(f"⚠ Impossible de copier dans public/: {e}")
+    # Copie de travail dans data/, fichiers minifiés et précompressés dans public/ et docs/
+    print()
+    publish_data(data, filepath)
 
 def create_sample_data() -> List[Dict]:
     """
@@ -253,10 +343,23 @@ def main():
 
     # MODE 1: Tentative de scraping réel
     print("Mode 1: Tentative de scraping du site officiel...")
-    mof_list = scrape_mof_directory()
+    # --soup : analyse BeautifulSoup historique (comparaison avec le mode lxml)
+    parser = "soup" if "--soup" in sys.argv else "lxml"
+    # Cache HTTP : requête conditionnelle ; --no-cache pour un téléchargement simple
+    cache = None if "--no-cache" in sys.argv else HTTPCache()
+    response = fetch_directory(cache)
+
+    # Annuaire identique au dernier passage terminé : ni analyse, ni géocodage, ni publication
+    if cache and "--force" not in sys.argv and cache.unchanged("scrape_mof", source_version(parser)):
+        print("\n✓ Annuaire inchangé depuis le dernier passage : rien à mettre à jour (--force pour tout refaire)")
+        cache.report()
+        return
+
+    mof_list = parse_directory_response(response, parser)
+    scraped = len(mof_list) >= 5
 
     # MODE 2: Si le scraping échoue ou retourne peu de résultats, utiliser les données d'exemple
-    if len(mof_list) < 5:
+    if not scraped:
         print(f"\n⚠ Seulement {len(mof_list)} MOF trouvés.")
         print("Mode 2: Utilisation de données d'exemple pour démonstration...")
         mof_list = create_sample_data()
@@ -268,6 +371,8 @@ def main():
     # Sauvegarder
     output_path = "../data/mof-data.json"
     save_to_json(mof_list, output_path)
+    if cache and scraped:
+        cache.mark_processed("scrape_mof", source_version(parser))
 
     # Statistiques
     with_coords = sum(1 for m in mof_list if m["coordinates"]["lat"] is not None)
@@ -286,5 +391,10 @@ def main():
     for cat, count in sorted(categories.items(), key=lambda x: x[1], reverse=True):
         print(f"- {cat}: {count}")
 
+    report_geocode_stats()
+    if cache:
+        cache.report()
+
 if __name__ == "__main__":
-    main()
+    with run_metrics("scrape_mof"):
+        main()
@@ -1,49 +1,36 @@
 #!/usr/bin/env python3
 """
 Script de scraping avancé pour récupérer les données des Meilleurs Ouvriers de France
-Utilise Selenium pour gérer le JavaScript et le chargement dynamique
+Récupère la liste en HTTP via l'endpoint du bouton "Charger plus" (listing_http.py),
+et utilise Selenium pour gérer le JavaScript si cet endpoint a changé
+(ou avec --selenium)
 """
 
 import json
+import sys
 import time
-import re
-from typing import List, Dict
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.options import Options
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
-import requests
-
-# Catégories des métiers de bouche
-FOOD_CATEGORIES = [
-    # Cuisine
-    "cuisine", "gastronomie", "cuisinier", "chef", "restaurateur",
-    # Boulangerie & Pâtisserie
-    "boulanger", "pâtissier", "pâtisserie", "confiseur", "confiserie",
-    # Boucherie & Charcuterie
-    "boucher", "boucherie", "charcutier", "traiteur",
-    # Poisson
-    "poissonnier", "écailler",
-    # Produits laitiers
-    "fromager", "crémier",
-    # Fruits & Légumes
-    "primeur", "fruitier", "maraîcher",
-    # Chocolat & Glaces
-    "chocolat", "glacier", "glace", "sorbet", "torréfacteur",
-    # Service & Sommellerie
-    "sommelier", "barman", "maître", "service", "arts de la table",
-    # Autres
-    "sécurité alimentaire"
-]
-
-def is_food_category(specialty: str) -> bool:
-    """Vérifie si la spécialité appartient aux métiers de bouche"""
-    if not specialty:
-        return False
-    specialty_lower = specialty.lower()
-    return any(cat in specialty_lower for cat in FOOD_CATEGORIES)
+from typing import List, Dict, Optional
+
+try:
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support import expected_conditions as EC
+    from browser import get_driver, release_driver
+    from waits import count_greater_than, in_viewport, report_wait_timings, timed_wait
+except ImportError:  # Conteneur sans Selenium : seul le chemin HTTP est disponible
+    By = None
+
+from geocoding import geocode_addresses, report_geocode_stats
+from publish import publish_data
+from incremental import ScrapeState, read_entry_attributes
+from http_cache import HTTPCache
+from listing_http import fetch_listing
+from metrics import METRICS, run_metrics
+from streaming import JsonlWriter, assemble_json, geocode_stream, remove_stream, stream_path
+from taxonomy import classify
+from geocache import normalize_address
+
+STATE_PATH = "../data/scrape-state-selenium.json"
+ITEM_SELECTOR = "ul#sort-me li.item-gallery"
 
 def clean_text(text: str) -> str:
     """Nettoie et normalise le texte"""
@@ -51,62 +38,6 @@ def clean_text(text: str) -> str:
         return ""
     return ' '.join(text.strip().split())
 
-def geocode_address(address: str) -> Dict:
-    """
-    Géocode une adresse via l'API Nominatim d'OpenStreetMap
-    Rate limit: 1 requête/seconde
-    """
-    if not address:
-        return {"lat": None, "lon": None}
-
-    base_url = "https://nominatim.openstreetmap.org/search"
-    params = {
-        "q": address,
-        "format": "json",
-        "limit": 1,
-        "countrycodes": "fr"
-    }
-    headers = {
-        "User-Agent": "MOF-Guide-Scraper/2.0"
-    }
-
-    try:
-        time.sleep(1.1)  # Respect rate limit
-        response = requests.get(base_url, params=params, headers=headers, timeout=10)
-        response.raise_for_status()
-        data = response.json()
-
-        if data and len(data) > 0:
-            return {
-                "lat": float(data[0]["lat"]),
-                "lon": float(data[0]["lon"])
-            }
-    except Exception as e:
-        print(f"Erreur geocoding pour '{address}': {e}")
-
-    return {"lat": None, "lon": None}
-
-def setup_driver():
-    """Configure et retourne un driver Selenium"""
-    chrome_options = Options()
-    chrome_options.add_argument('--headless')  # Mode sans interface
-    chrome_options.add_argument('--no-sandbox')
-    chrome_options.add_argument('--disable-dev-shm-usage')
-    chrome_options.add_argument('--disable-gpu')
-    chrome_options.add_argument('--window-size=1920,1080')
-    chrome_options.add_argument('--user-agent=Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36')
-
-    try:
-        driver = webdriver.Chrome(options=chrome_options)
-        return driver
-    except Exception as e:
-        print(f"❌ Erreur lors de l'initialisation du driver Chrome: {e}")
-        print("\n💡 Solutions:")
-        print("1. Installer ChromeDriver: brew install chromedriver")
-        print("2. Ou installer Chrome for Testing: https://googlechromelabs.github.io/chrome-for-testing/")
-        print("3. Vérifier que Chrome est installé")
-        return None
-
 def click_load_more(driver, max_clicks=20):
     """Clique sur le bouton 'Charger plus' plusieurs fois"""
     clicks = 0
@@ -114,9 +45,12 @@ def click_load_more(driver, max_clicks=20):
     while clicks < max_clicks:
         try:
             # Attendre que le bouton soit présent et visible
-            load_more_btn = WebDriverWait(driver, 5).until(
-                EC.presence_of_element_located((By.ID, "loadMore"))
+            load_more_btn = timed_wait(
+                driver, "load_more_button", EC.presence_of_element_located((By.ID, "loadMore")), timeout=5
             )
+            if load_more_btn is None:
+                print("✓ Plus de bouton 'Charger plus' (fin de la liste)")
+                break
 
             # Vérifier si le bouton est visible et cliquable
             if not load_more_btn.is_displayed():
@@ -125,70 +59,99 @@ def click_load_more(driver, max_clicks=20):
 
             # Scroller jusqu'au bouton
             driver.execute_script("arguments[0].scrollIntoView(true);", load_more_btn)
-            time.sleep(0.5)
+            timed_wait(driver, "scroll_into_view", in_viewport(load_more_btn), timeout=2)
 
             # Cliquer
+            loaded = len(driver.find_elements(By.CSS_SELECTOR, ITEM_SELECTOR))
             load_more_btn.click()
+            METRICS.count("clicks", target="load_more")
             clicks += 1
             print(f"⏳ Clic {clicks}/{max_clicks} sur 'Charger plus'...")
 
-            # Attendre le chargement
-            time.sleep(2)
+            # Attendre l'arrivée de nouveaux MOF (ou la disparition du bouton)
+            more_items = count_greater_than(ITEM_SELECTOR, loaded)
+            timed_wait(driver, "load_more",
+                       lambda d: more_items(d) or not load_more_btn.is_displayed(), timeout=10)
 
-        except TimeoutException:
-            print("✓ Plus de bouton 'Charger plus' (fin de la liste)")
-            break
         except Exception as e:
             print(f"⚠ Erreur lors du clic: {e}")
             break
 
     return clicks
 
-def extract_mof_from_page(driver) -> List[Dict]:
-    """Extrait tous les MOF de la page"""
+def build_mof_list(entries: List[Dict], state: Optional[ScrapeState] = None) -> List[Dict]:
+    """
+    Convertit les attributs data-* des entrées de l'annuaire en MOF des métiers de bouche
+    En mode incrémental, les entrées inchangées reprennent l'enregistrement du passage précédent
+    """
     mof_list = []
 
+    for idx, attrs in enumerate(entries):
+        name = attrs["data-nom"]
+        specialty = attrs["data-metier"]
+        city = attrs["data-ville"]
+        department = attrs["data-departement"]
+
+        # Vérifier si c'est un métier de bouche
+        category = classify(specialty)
+        if not category:
+            continue
+
+        # Construire l'adresse
+        address_parts = [city, department]
+        address = ", ".join([p for p in address_parts if p])
+
+        if not name or not specialty:
+            continue
+
+        carried = state.lookup(attrs) if state else None
+        if carried:
+            mof_data = {"id": idx + 1, **carried, "category": category}
+            mof_list.append(mof_data)
+            state.track(attrs, mof_data, changed=False)
+            continue
+
+        mof_data = {
+            "id": idx + 1,
+            "name": clean_text(name),
+            "specialty": clean_text(specialty),
+            "category": category,
+            "address": clean_text(address) if address else None,
+            "year": None,  # Pas disponible dans les attributs data-
+            "website": None,  # Pas disponible dans les attributs data-
+            "coordinates": {"lat": None, "lon": None}
+        }
+
+        mof_list.append(mof_data)
+        if state:
+            state.track(attrs, mof_data, changed=True)
+
+    # Réattribuer les IDs après filtrage
+    for idx, mof in enumerate(mof_list):
+        mof["id"] = idx + 1
+
+    return mof_list
+
+def extract_mof_from_page(driver, state: Optional[ScrapeState] = None) -> List[Dict]:
+    """Extrait tous les MOF de la page"""
+    entries = []
+
     try:
         # Attendre que la liste soit chargée
-        WebDriverWait(driver, 10).until(
-            EC.presence_of_element_located((By.ID, "sort-me"))
-        )
+        listing = timed_wait(driver, "listing", EC.presence_of_element_located((By.ID, "sort-me")), timeout=10)
+        if listing is None:
+            print("❌ Liste des MOF (#sort-me) introuvable")
+            return []
 
         # Récupérer tous les éléments MOF
-        mof_elements = driver.find_elements(By.CSS_SELECTOR, "ul#sort-me li.item-gallery")
+        mof_elements = driver.find_elements(By.CSS_SELECTOR, ITEM_SELECTOR)
 
         print(f"\n📋 Extraction de {len(mof_elements)} éléments...")
 
         for idx, element in enumerate(mof_elements):
             try:
                 # Extraire les données depuis les attributs data-*
-                name = element.get_attribute("data-nom")
-                specialty = element.get_attribute("data-metier")
-                city = element.get_attribute("data-ville")
-                department = element.get_attribute("data-departement")
-
-                # Vérifier si c'est un métier de bouche
-                if not specialty or not is_food_category(specialty):
-                    continue
-
-                # Construire l'adresse
-                address_parts = [city, department]
-                address = ", ".join([p for p in address_parts if p])
-
-                if not name or not specialty:
-                    continue
-
-                mof_data = {
-                    "id": idx + 1,
-                    "name": clean_text(name),
-                    "specialty": clean_text(specialty),
-                    "address": clean_text(address) if address else None,
-                    "year": None,  # Pas disponible dans les attributs data-
-                    "website": None,  # Pas disponible dans les attributs data-
-                    "coordinates": {"lat": None, "lon": None}
-                }
-
-                mof_list.append(mof_data)
+                entries.append(read_entry_attributes(element))
 
                 if (idx + 1) % 50 == 0:
                     print(f"  ... {idx + 1} MOF traités")
@@ -197,31 +160,32 @@ def extract_mof_from_page(driver) -> List[Dict]:
                 print(f"⚠ Erreur extraction élément {idx}: {e}")
                 continue
 
-        # Réattribuer les IDs après filtrage
-        for idx, mof in enumerate(mof_list):
-            mof["id"] = idx + 1
-
-        return mof_list
+        return build_mof_list(entries, state)
 
     except Exception as e:
         print(f"❌ Erreur lors de l'extraction: {e}")
         return []
 
-def scrape_mof_with_selenium() -> List[Dict]:
+def scrape_mof_with_selenium(state: Optional[ScrapeState] = None) -> List[Dict]:
     """Scrape le site MOF avec Selenium"""
     print("=== Scraper MOF avec Selenium ===\n")
 
-    driver = setup_driver()
+    if By is None:
+        print("❌ Selenium n'est pas installé (pip install selenium)")
+        return []
+
+    driver = get_driver()
     if not driver:
         return []
 
     try:
         url = "https://www.meilleursouvriersdefrance.info/annuaire-mof"
         print(f"🌐 Chargement de {url}...")
-        driver.get(url)
+        with METRICS.timer("page_load", kind="selenium"):
+            driver.get(url)
 
         # Attendre que la page soit chargée
-        time.sleep(3)
+        timed_wait(driver, "page_load", count_greater_than(ITEM_SELECTOR, 0), timeout=15)
 
         # Cliquer plusieurs fois sur "Charger plus"
         print("\n🔄 Chargement de tous les MOF...")
@@ -229,7 +193,7 @@ def scrape_mof_with_selenium() -> List[Dict]:
         print(f"✓ {clicks} chargements effectués")
 
         # Extraire les données
-        mof_list = extract_mof_from_page(driver)
+        mof_list = extract_mof_from_page(driver, state)
 
         print(f"\n✓ {len(mof_list)} MOF des métiers de bouche trouvés")
 
@@ -239,20 +203,35 @@ def scrape_mof_with_selenium() -> List[Dict]:
         print(f"❌ Erreur générale: {e}")
         return []
     finally:
-        driver.quit()
+        release_driver(driver)
+
+def scrape_mof_listing(state: Optional[ScrapeState] = None, force_selenium: bool = False,
+                       cache: Optional[HTTPCache] = None):
+    """
+    Récupère la liste des MOF : chemin HTTP d'abord (revalidé par le cache HTTP s'il
+    est fourni), Selenium en repli
+    Retourne (mof_list, méthode utilisée)
+    """
+    if not force_selenium:
+        print("=== Récupération HTTP de l'annuaire (sans navigateur) ===\n")
+        entries = fetch_listing(max_pages=30, cache=cache)
+        if entries is not None:
+            mof_list = build_mof_list(entries, state)
+            print(f"\n✓ {len(mof_list)} MOF des métiers de bouche trouvés")
+            return mof_list, "http"
+        print("↩ Repli sur Selenium\n")
+
+    return scrape_mof_with_selenium(state), "selenium"
 
 def geocode_mof_list(mof_list: List[Dict], max_geocode=100) -> List[Dict]:
     """Ajoute les coordonnées géographiques à chaque MOF"""
     print(f"\n📍 Géocodage de {min(len(mof_list), max_geocode)} adresses...")
-    print("⚠ Cela peut prendre plusieurs minutes (rate limit: 1 req/sec)")
+    print("⚠ Cela peut prendre plusieurs minutes (débit limité par fournisseur, cf. MOF_GEOCODERS)")
 
-    for idx, mof in enumerate(mof_list[:max_geocode]):
-        if mof.get("address"):
-            print(f"[{idx+1}/{min(len(mof_list), max_geocode)}] {mof['name']} - {mof['address']}")
-            coords = geocode_address(mof["address"])
-            mof["coordinates"] = coords
-        else:
-            mof["coordinates"] = {"lat": None, "lon": None}
+    to_geocode = mof_list[:max_geocode]
+    coords_list = geocode_addresses([mof.get("address") for mof in to_geocode])
+    for mof, coords in zip(to_geocode, coords_list):
+        mof["coordinates"] = coords
 
     # Pour les MOF au-delà de max_geocode, laisser les coordonnées à None
     for mof in mof_list[max_geocode:]:
@@ -260,31 +239,59 @@ def geocode_mof_list(mof_list: List[Dict], max_geocode=100) -> List[Dict]:
 
     return mof_list
 
-def save_to_json(mof_list: List[Dict], filepath: str):
+def save_to_json(mof_list: List[Dict], filepath: str, method: str = "selenium"):
     """Sauvegarde les données en JSON"""
     data = {
         "meta": {
             "total": len(mof_list),
             "generated_at": time.strftime("%Y-%m-%d %H:%M:%S"),
             "source": "https://www.meilleursouvriersdefrance.info/annuaire-mof",
-            "method": "selenium"
+            "method": method
         },
         "mof": mof_list
     }
 
-    # Sauvegarder dans data/
-    with open(filepath, 'w', encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
-    print(f"\n✓ Données sauvegardées dans {filepath}")
+    # Copie de travail dans data/, fichiers minifiés et précompressés dans public/ et docs/
+    print()
+    publish_data(data, filepath)
 
-    # Copier aussi dans public/ pour le site web
-    public_path = "../public/data.json"
-    try:
-        with open(public_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
-        print(f"✓ Données copiées dans {public_path}")
-    except Exception as e:
-        print(f"⚠ Impossible de copier dans public/: {e}")
+def record_key(mof: Dict) -> str:
+    """Identité d'un MOF dans les fichiers de flux : nom, spécialité et adresse normalisés"""
+    return "|".join(normalize_address(mof.get(field) or "") for field in ("name", "specialty", "address"))
+
+def save_streaming(mof_list: List[Dict], filepath: str, method: str, max_geocode=100) -> List[Dict]:
+    """
+    Mode --stream : la liste est écrite en JSONL, puis chaque lot géocodé est ajouté à un
+    second fichier (data/stream/) avec fsync périodique ; une relance après interruption
+    reprend les adresses déjà géocodées. Le fichier final est assemblé en un parcours.
+    """
+    records_path = stream_path("selenium", "records")
+    geocoded_path = stream_path("selenium", "geocoded")
+
+    remove_stream([records_path])
+    with JsonlWriter(records_path) as writer:
+        for mof in mof_list:
+            writer.write(record_key(mof), mof)
+
+    print(f"\n📍 Géocodage en flux (au plus {max_geocode} adresses)...")
+    stats = geocode_stream(records_path, geocoded_path, limit=max_geocode)
+    if stats["resumed"]:
+        print(f"♻ {stats['resumed']} MOF repris du passage interrompu")
+
+    meta = {
+        "generated_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "source": "https://www.meilleursouvriersdefrance.info/annuaire-mof",
+        "method": method
+    }
+    assemble_json(geocoded_path, filepath, meta)
+
+    # Fichiers du site (fragments, index) : publication à partir du fichier assemblé
+    with open(filepath, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    print()
+    publish_data(data, filepath)
+    remove_stream([records_path, geocoded_path])
+    return data["mof"]
 
 def main():
     """Fonction principale"""
@@ -292,9 +299,13 @@ def main():
     print("║  Scraper MOF - Version Selenium                ║")
     print("║  Métiers de Bouche uniquement                  ║")
     print("╚════════════════════════════════════════════════╝\n")
+    run_start = time.time()
+
+    # Mode incrémental : ne retraiter que les entrées nouvelles ou modifiées
+    state = ScrapeState(STATE_PATH) if "--incremental" in sys.argv else None
 
     # Scraping
-    mof_list = scrape_mof_with_selenium()
+    mof_list, method = scrape_mof_listing(state, force_selenium="--selenium" in sys.argv)
 
     if not mof_list or len(mof_list) < 10:
         print(f"\n⚠ Seulement {len(mof_list)} MOF trouvés.")
@@ -304,12 +315,26 @@ def main():
         print("3. La structure HTML du site n'a pas changé")
         return
 
-    # Géocodage (limité aux 100 premiers pour éviter le rate limit)
-    mof_list = geocode_mof_list(mof_list, max_geocode=100)
-
-    # Sauvegarder
     output_path = "../data/mof-data.json"
-    save_to_json(mof_list, output_path)
+    if "--stream" in sys.argv:
+        # Mode flux : géocodage écrit au fil de l'eau, reprise possible après interruption
+        mof_list = save_streaming(mof_list, output_path, method, max_geocode=100)
+        if state:
+            coords = {record_key(mof): mof["coordinates"] for mof in mof_list}
+            for mof in state.changed_records():
+                mof["coordinates"] = coords.get(record_key(mof), {"lat": None, "lon": None})
+    else:
+        # Géocodage (limité aux 100 premiers pour éviter le rate limit)
+        if state:
+            geocode_mof_list(state.changed_records(), max_geocode=100)
+        else:
+            mof_list = geocode_mof_list(mof_list, max_geocode=100)
+
+        # Sauvegarder
+        save_to_json(mof_list, output_path, method)
+    if state:
+        state.save()
+        state.report()
 
     # Statistiques
     with_coords = sum(1 for m in mof_list if m["coordinates"]["lat"] is not None)
@@ -328,9 +353,15 @@ def main():
     for cat, count in sorted(categories.items(), key=lambda x: x[1], reverse=True)[:10]:
         print(f"  • {cat}: {count}")
 
+    report_geocode_stats()
+    if method == "selenium":
+        report_wait_timings()
+    print(f"\n⏱ Durée totale: {time.time() - run_start:.1f}s")
+
     print("\n✅ Scraping terminé avec succès!")
     print(f"💾 Fichier: {output_path}")
     print("\n🚀 Rafraîchir http://localhost:8000 pour voir les nouveaux MOF")
 
 if __name__ == "__main__":
-    main()
+    with run_metrics("scrape_mof_selenium"):
+        main()
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Index de recherche textuelle publié avec les données (data/search-index.json)
+Même sémantique que la recherche de app.js : la requête, en minuscules et sans accents,
+doit apparaître telle quelle dans le nom, la spécialité ou l'adresse (la ville en fait partie).
+L'index associe chaque trigramme de ces champs aux MOF qui le contiennent : une requête
+de 3 caractères ou plus devient une intersection de listes, puis une vérification sur les
+seuls candidats. Les requêtes plus courtes, qui correspondent à presque tout, restent linéaires.
+
+Listes compactes : positions (dans "ids") en écarts successifs, ou bitmap base64
+quand la liste est dense.
+
+Comparer à la recherche linéaire (résultats et temps) sur N MOF synthétiques :
+    python3 search_index.py --bench [nombre de MOF]
+"""
+
+import base64
+import json
+import random
+import sys
+import time
+import unicodedata
+from typing import Dict, Iterable, List, Optional, Set, Union
+
+SEARCH_FIELDS = ["name", "specialty", "address"]
+GRAM = 3
+
+def normalize_search(text: Optional[str]) -> str:
+    """Équivalent de normalizeString() (app.js) : minuscules, sans diacritiques"""
+    text = unicodedata.normalize("NFD", (text or "").lower())
+    return "".join(c for c in text if not 0x300 <= ord(c) <= 0x36F)
+
+def trigrams(text: str) -> Set[str]:
+    return {text[i:i + GRAM] for i in range(len(text) - GRAM + 1)}
+
+def encode_postings(positions: List[int], count: int) -> Union[str, List[int]]:
+    """Écarts successifs, ou bitmap base64 si c'est plus court (liste dense)"""
+    if len(positions) * 3 > count / 6:
+        bitmap = bytearray((count + 7) // 8)
+        for position in positions:
+            bitmap[position >> 3] |= 1 << (position & 7)
+        return base64.b64encode(bytes(bitmap)).decode("ascii")
+    previous, gaps = -1, []
+    for position in positions:
+        gaps.append(position - previous)
+        previous = position
+    return gaps
+
+def decode_postings(postings: Union[str, List[int]]) -> List[int]:
+    if isinstance(postings, str):
+        bitmap = base64.b64decode(postings)
+        return [i * 8 + bit for i, byte in enumerate(bitmap) if byte for bit in range(8) if byte & (1 << bit)]
+    positions, position = [], -1
+    for gap in postings:
+        position += gap
+        positions.append(position)
+    return positions
+
+def build_search_index(mof_list: List[Dict]) -> Dict:
+    """Index {"fields", "gram", "ids": [id par position], "grams": {trigramme: listes compactes}}"""
+    records = sorted(mof_list, key=lambda m: m["id"])
+    postings: Dict[str, List[int]] = {}
+    for position, mof in enumerate(records):
+        record_grams = set()
+        for field in SEARCH_FIELDS:
+            record_grams |= trigrams(normalize_search(mof.get(field)))
+        for gram in record_grams:
+            postings.setdefault(gram, []).append(position)
+    return {
+        "fields": SEARCH_FIELDS,
+        "gram": GRAM,
+        "ids": [mof["id"] for mof in records],
+        "grams": {gram: encode_postings(p, len(records)) for gram, p in sorted(postings.items())}
+    }
+
+def matches(mof: Dict, query: str) -> bool:
+    """Recherche linéaire de référence (requête déjà normalisée)"""
+    return any(query in normalize_search(mof.get(field)) for field in SEARCH_FIELDS)
+
+def search(index: Dict, query: str, records: Dict[int, Dict]) -> Set[int]:
+    """
+    Id des MOF correspondant à la requête
+    `records` (id -> MOF) sert à vérifier les candidats, et aux requêtes trop courtes pour l'index
+    """
+    query = normalize_search(query)
+    gram = index["gram"]
+    if len(query) < gram:
+        return {mof_id for mof_id, mof in records.items() if matches(mof, query)}
+
+    postings = index["grams"]
+    keys = trigrams(query)
+    if any(key not in postings for key in keys):
+        return set()
+
+    # Listes les plus courtes d'abord (écarts : longueur connue ; bitmaps : en dernier)
+    ordered = sorted(keys, key=lambda k: len(postings[k]) if isinstance(postings[k], list) else float("inf"))
+    candidates = set(decode_postings(postings[ordered[0]]))
+    for key in ordered[1:]:
+        if not candidates:
+            break
+        candidates.intersection_update(decode_postings(postings[key]))
+
+    # Les trigrammes peuvent venir de champs ou de positions différents : vérification
+    ids = index["ids"]
+    return {ids[p] for p in candidates if matches(records[ids[p]], query)}
+
+def linear_search(mof_list: Iterable[Dict], query: str) -> Set[int]:
+    """Recherche actuelle de app.js : parcours de tous les MOF"""
+    query = normalize_search(query)
+    return {mof["id"] for mof in mof_list if not query or matches(mof, query)}
+
+def synthetic_records(count: int, rng: random.Random) -> List[Dict]:
+    first_names = ["Éric", "Hélène", "Jean-François", "Zoé", "Rémi", "Agnès", "Loïc", "Maëlle", "Noël", "Céline"]
+    last_names = ["Lefèvre", "Dubois", "Mercier", "Hévin", "Roger", "Quatrehomme", "Brys", "Larher", "Chaussée"]
+    specialties = ["Boulanger", "Pâtissier-Chocolatier", "Fromager", "Poissonnier-Écailler", "Charcutier-Traiteur",
+                   "Glacier", "Boucher", "Chocolatier-Confiseur", "Cuisinier", "Primeur"]
+    streets = ["rue de la Paix", "avenue Victor Hugo", "boulevard Saint-Germain", "place de l'Église", "rue du Marché"]
+    cities = ["75005 Paris", "69002 Lyon", "13001 Marseille", "33000 Bordeaux", "59000 Lille", "06000 Nice",
+              "67000 Strasbourg", "44000 Nantes", "31000 Toulouse", "35000 Rennes"]
+    return [{
+        "id": i + 1,
+        "name": f"{rng.choice(first_names)} {rng.choice(last_names)}",
+        "specialty": rng.choice(specialties),
+        "address": f"{rng.randint(1, 200)} {rng.choice(streets)}, {rng.choice(cities)}"
+    } for i in range(count)]
+
+def benchmark(count: int = 10000, queries: int = 300, seed: int = 42) -> bool:
+    """Compare l'index à la recherche linéaire sur des requêtes tirées des données (et des absentes)"""
+    rng = random.Random(seed)
+    mof_list = synthetic_records(count, rng)
+    records = {m["id"]: m for m in mof_list}
+
+    start = time.perf_counter()
+    index = build_search_index(mof_list)
+    build_time = time.perf_counter() - start
+
+    samples = []
+    for _ in range(queries):
+        text = rng.choice(mof_list)[rng.choice(SEARCH_FIELDS)]
+        length = rng.randint(1, 8)
+        position = rng.randint(0, max(0, len(text) - length))
+        samples.append(text[position:position + length])
+    samples += ["PATISSIER", "hevin", "zzz", "lyon", "Écailler", "  "]
+
+    failures, indexed = 0, 0
+    index_time, linear_time = 0.0, 0.0
+    for query in samples:
+        start = time.perf_counter()
+        found = search(index, query, records)
+        elapsed = time.perf_counter() - start
+
+        start = time.perf_counter()
+        expected = linear_search(mof_list, query)
+        # Seules les requêtes servies par l'index entrent dans la comparaison des temps
+        if len(normalize_search(query)) >= GRAM:
+            indexed += 1
+            index_time += elapsed
+            linear_time += time.perf_counter() - start
+
+        if found != expected:
+            failures += 1
+            print(f"❌ \"{query}\": {len(found)} résultats au lieu de {len(expected)}")
+
+    print(f"📊 {len(samples)} requêtes sur {count} MOF (index de {len(index['grams'])} trigrammes, "
+          f"{len(json.dumps(index, separators=(',', ':'))) / 1024:.0f} Ko, construit en {build_time * 1000:.0f} ms)")
+    print(f"├─ Index: {index_time / indexed * 1000:.2f} ms par requête de {GRAM} caractères ou plus ({indexed})")
+    print(f"├─ Recherche linéaire: {linear_time / indexed * 1000:.2f} ms pour les mêmes requêtes")
+    print(f"└─ {'✓ Résultats identiques' if not failures else f'❌ {failures} écarts'} sur toutes les requêtes")
+    return failures == 0
+
+if __name__ == "__main__":
+    if "--bench" in sys.argv:
+        args = [a for a in sys.argv[1:] if a != "--bench"]
+        sys.exit(0 if benchmark(int(args[0]) if args else 10000) else 1)
+    print(__doc__)
@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+"""
+Serveur local du site (public/), au comportement proche de l'hébergement :
+- pool de threads, connexions HTTP/1.1 persistantes
+- variantes précompressées .br/.gz de publish.py choisies selon Accept-Encoding
+- ETag / Last-Modified, réponses 304 aux requêtes conditionnelles
+- requêtes partielles (Range, If-Range)
+- Cache-Control : immutable pour les fichiers empreintés (app.3f9a2c1b.js), revalidation
+  pour le reste ; URL sans .html comme sur Vercel (/fromager-paris)
+- une ligne de journal par requête avec sa durée
+
+    python3 serve.py [--port 8000] [--dir ../public] [--workers 16]
+"""
+
+import email.utils
+import os
+import re
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from http.server import HTTPServer, SimpleHTTPRequestHandler
+from typing import Dict, Optional, Tuple
+from urllib.parse import unquote, urlsplit
+
+from metrics import METRICS, run_metrics
+
+SITE_DIR = "../public"
+# Encodages servis depuis un fichier voisin, par ordre de préférence à qualité égale
+ENCODINGS = [("br", ".br"), ("gzip", ".gz")]
+# Nom de fichier contenant une empreinte de contenu : app.3f9a2c1b.js, style.5d41402abc4b.css
+FINGERPRINT_RE = re.compile(r"\.[0-9a-f]{8,}\.[A-Za-z0-9]+$")
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "no-cache"
+DATA_CACHE = "public, max-age=3600, must-revalidate"  # Comme /data/ dans vercel.json
+SECURITY_HEADERS = {"X-Content-Type-Options": "nosniff", "X-Frame-Options": "DENY"}
+RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+def parse_accept_encoding(header: Optional[str]) -> Dict[str, float]:
+    """{"br": 1.0, "gzip": 0.8, ...} ; un encodage à q=0 est refusé"""
+    accepted = {}
+    for part in (header or "").split(","):
+        token, _, params = part.strip().partition(";")
+        if not token:
+            continue
+        quality = 1.0
+        match = re.search(r"q\s*=\s*([0-9.]+)", params)
+        if match:
+            try:
+                quality = float(match.group(1))
+            except ValueError:
+                quality = 0.0
+        accepted[token.strip().lower()] = quality
+    return accepted
+
+def choose_encoding(path: str, header: Optional[str]) -> Tuple[Optional[str], str, bool]:
+    """
+    Variante à servir : (encodage ou None, chemin du fichier, variantes disponibles)
+    Une variante plus ancienne que l'original est ignorée (publication interrompue)
+    """
+    mtime = os.stat(path).st_mtime_ns
+    available = [(name, path + suffix) for name, suffix in ENCODINGS
+                 if os.path.isfile(path + suffix) and os.stat(path + suffix).st_mtime_ns >= mtime]
+    if not available:
+        return None, path, False
+    accepted = parse_accept_encoding(header)
+    best, best_quality = None, 0.0
+    for name, variant in available:
+        quality = accepted.get(name, accepted.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = (name, variant), quality
+    if best is None:
+        return None, path, True
+    return best[0], best[1], True
+
+def make_etag(stat: os.stat_result, encoding: Optional[str]) -> str:
+    """ETag fort propre à chaque représentation (taille, date, encodage)"""
+    return f'"{stat.st_size:x}-{stat.st_mtime_ns:x}{"-" + encoding if encoding else ""}"'
+
+def etag_matches(header: str, etag: str) -> bool:
+    """If-None-Match : comparaison faible (W/ ignoré), liste ou *"""
+    if header.strip() == "*":
+        return True
+    return any(re.sub(r"^W/", "", tag.strip()) == etag for tag in header.split(","))
+
+def parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """Plage unique "bytes=a-b" → (début, fin incluse) ; None si non satisfaisable"""
+    match = RANGE_RE.match(header.strip())
+    if not match or size == 0:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:  # bytes=-N : les N derniers octets
+        length = int(last)
+        return (max(0, size - length), size - 1) if length else None
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    return (start, end) if start <= end and start < size else None
+
+def cache_control(url_path: str) -> str:
+    if FINGERPRINT_RE.search(url_path):
+        return IMMUTABLE
+    if url_path.startswith("/data/"):
+        return DATA_CACHE
+    return REVALIDATE
+
+class SiteHandler(SimpleHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "MOFServe/1.0"
+
+    def __init__(self, *args, directory: str = SITE_DIR, **kwargs):
+        super().__init__(*args, directory=directory, **kwargs)
+
+    def handle_one_request(self):
+        self.started = time.perf_counter()
+        self.served_encoding = None
+        self.sent_bytes = 0
+        self.status_code = None
+        super().handle_one_request()
+        if self.status_code is not None:  # None : connexion fermée sans nouvelle requête
+            self.log_latency()
+
+    def parse_request(self) -> bool:
+        # Chronomètre démarré à la réception de la requête, pas pendant l'attente en keep-alive
+        self.started = time.perf_counter()
+        return super().parse_request()
+
+    def do_GET(self):
+        self.serve(send_body=True)
+
+    def do_HEAD(self):
+        self.serve(send_body=False)
+
+    def resolve(self) -> Optional[str]:
+        """Fichier demandé : index.html d'un dossier, ou page sans son extension .html"""
+        path = self.translate_path(self.path)
+        if os.path.isdir(path):
+            if not urlsplit(self.path).path.endswith("/"):
+                return path  # Redirection vers l'URL avec "/" (voir serve)
+            path = os.path.join(path, "index.html")
+        if not os.path.isfile(path) and os.path.isfile(path + ".html"):
+            path += ".html"
+        return path if os.path.isfile(path) else None
+
+    def serve(self, send_body: bool):
+        path = self.resolve()
+        url_path = unquote(urlsplit(self.path).path)
+        if path is None:
+            self.send_error(HTTPStatus.NOT_FOUND, "Fichier introuvable")
+            return
+        if os.path.isdir(path):
+            self.send_response(HTTPStatus.MOVED_PERMANENTLY)
+            self.send_header("Location", urlsplit(self.path)._replace(path=url_path + "/").geturl())
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        encoding, file_path, has_variants = choose_encoding(path, self.headers.get("Accept-Encoding"))
+        stat = os.stat(file_path)
+        etag = make_etag(stat, encoding)
+        last_modified = email.utils.formatdate(stat.st_mtime, usegmt=True)
+        headers = {
+            "Content-Type": self.guess_type(path),
+            "ETag": etag,
+            "Last-Modified": last_modified,
+            "Cache-Control": cache_control(url_path),
+            "Accept-Ranges": "bytes",
+            **SECURITY_HEADERS
+        }
+        if encoding:
+            headers["Content-Encoding"] = encoding
+            self.served_encoding = encoding
+        if has_variants:
+            headers["Vary"] = "Accept-Encoding"
+
+        if self.not_modified(etag, stat.st_mtime):
+            self.send_response(HTTPStatus.NOT_MODIFIED)
+            for name in ("ETag", "Last-Modified", "Cache-Control", "Vary"):
+                if name in headers:
+                    self.send_header(name, headers[name])
+            self.end_headers()
+            return
+
+        start, end = 0, stat.st_size - 1
+        status = HTTPStatus.OK
+        range_header = self.headers.get("Range")
+        if range_header and self.range_applies(etag, last_modified):
+            byte_range = parse_range(range_header, stat.st_size)
+            if byte_range is None:
+                self.send_response(HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE)
+                self.send_header("Content-Range", f"bytes */{stat.st_size}")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            start, end = byte_range
+            status = HTTPStatus.PARTIAL_CONTENT
+            headers["Content-Range"] = f"bytes {start}-{end}/{stat.st_size}"
+
+        length = max(0, end - start + 1)
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(length))
+        self.end_headers()
+        if send_body and length:
+            self.copy_range(file_path, start, length)
+
+    def not_modified(self, etag: str, mtime: float) -> bool:
+        """If-None-Match prime sur If-Modified-Since (RFC 9110)"""
+        if_none_match = self.headers.get("If-None-Match")
+        if if_none_match is not None:
+            return etag_matches(if_none_match, etag)
+        if_modified_since = self.headers.get("If-Modified-Since")
+        if if_modified_since:
+            try:
+                since = email.utils.parsedate_to_datetime(if_modified_since).timestamp()
+            except (TypeError, ValueError, IndexError, OverflowError):
+                return False
+            return int(mtime) <= since
+        return False
+
+    def range_applies(self, etag: str, last_modified: str) -> bool:
+        """If-Range : la plage n'est servie que si la représentation n'a pas changé"""
+        if_range = self.headers.get("If-Range")
+        if if_range is None:
+            return True
+        return if_range.strip() in (etag, last_modified)
+
+    def copy_range(self, path: str, start: int, length: int):
+        with open(path, 'rb') as f:
+            f.seek(start)
+            remaining = length
+            while remaining:
+                chunk = f.read(min(64 * 1024, remaining))
+                if not chunk:
+                    break
+                self.wfile.write(chunk)
+                self.sent_bytes += len(chunk)
+                remaining -= len(chunk)
+
+    def log_request(self, code="-", size="-"):
+        # Appelé par send_response : le code est journalisé avec la durée une fois la réponse envoyée
+        self.status_code = code
+
+    def log_message(self, format, *args):
+        # Les erreurs de send_error (404...) sont journalisées par log_latency comme les autres
+        pass
+
+    def log_latency(self):
+        elapsed = time.perf_counter() - self.started
+        code = getattr(self.status_code, "value", self.status_code)
+        METRICS.observe("serve_request", elapsed, status=str(code))
+        encoding = f" {self.served_encoding}" if self.served_encoding else ""
+        sys.stderr.write(f"{time.strftime('%H:%M:%S')} {self.command} {self.path} {code} "
+                         f"{self.sent_bytes} o{encoding} {elapsed * 1000:.1f} ms\n")
+
+class PooledHTTPServer(HTTPServer):
+    """HTTPServer dont chaque connexion est traitée par un pool de threads borné"""
+
+    daemon_threads = True
+
+    def __init__(self, address, handler, workers: int = 16):
+        super().__init__(address, handler)
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="serve")
+
+    def process_request(self, request, client_address):
+        self.pool.submit(self.process_request_worker, request, client_address)
+
+    def process_request_worker(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def server_close(self):
+        super().server_close()
+        self.pool.shutdown(wait=False)
+
+def option(name: str, default):
+    if name in sys.argv:
+        return type(default)(sys.argv[sys.argv.index(name) + 1])
+    return default
+
+def main():
+    port = option("--port", 8000)
+    directory = os.path.abspath(option("--dir", SITE_DIR))
+    workers = option("--workers", 16)
+    if not os.path.isdir(directory):
+        sys.exit(f"❌ Dossier introuvable: {directory}")
+
+    def handler(*args, **kwargs):
+        return SiteHandler(*args, directory=directory, **kwargs)
+
+    server = PooledHTTPServer(("", port), handler, workers=workers)
+    print(f"🌐 {directory} sur http://localhost:{port}/ ({workers} threads)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n✓ Serveur arrêté")
+    finally:
+        server.server_close()
+
+if __name__ == "__main__":
+    with run_metrics("serve"):
+        main()
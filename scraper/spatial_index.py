@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Index spatial des MOF par cases geohash
+Les coordonnées sont regroupées par préfixe geohash : une recherche des plus proches
+ne parcourt que la case du point et les anneaux de cases voisines nécessaires,
+au lieu de calculer la distance à chaque MOF puis de tout trier.
+
+L'index est publié avec les données (data/geo-index.json, voir publish.py).
+tests/test_spatial_index.py vérifie qu'il renvoie les mêmes K plus proches que le
+calcul exhaustif.
+"""
+
+import heapq
+import math
+from typing import Dict, Iterator, List, Optional, Tuple
+
+BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+DEFAULT_PRECISION = 4  # Cases d'environ 39 x 20 km
+EARTH_RADIUS_KM = 6371  # Comme calculateDistance() dans app.js
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+
+def haversine(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Distance en km entre deux points (formule de Haversine)"""
+    d_lat = math.radians(lat2 - lat1)
+    d_lon = math.radians(lon2 - lon1)
+    a = (math.sin(d_lat / 2) ** 2 +
+         math.cos(math.radians(lat1)) * math.cos(math.radians(lat2)) * math.sin(d_lon / 2) ** 2)
+    return EARTH_RADIUS_KM * 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
+
+def cell_size(precision: int) -> Tuple[float, float]:
+    """Hauteur et largeur (en degrés) d'une case geohash"""
+    bits = precision * 5
+    lon_bits = (bits + 1) // 2
+    return 180 / 2 ** (bits - lon_bits), 360 / 2 ** lon_bits
+
+def encode(lat: float, lon: float, precision: int = DEFAULT_PRECISION) -> str:
+    """Geohash du point"""
+    lat_range, lon_range = [-90.0, 90.0], [-180.0, 180.0]
+    chars, value, bit, even = [], 0, 0, True
+    while len(chars) < precision:
+        interval, coord = (lon_range, lon) if even else (lat_range, lat)
+        mid = (interval[0] + interval[1]) / 2
+        value <<= 1
+        if coord >= mid:
+            value |= 1
+            interval[0] = mid
+        else:
+            interval[1] = mid
+        even = not even
+        bit += 1
+        if bit == 5:
+            chars.append(BASE32[value])
+            value, bit = 0, 0
+    return "".join(chars)
+
+def cell_origin(lat: float, lon: float, precision: int) -> Tuple[float, float]:
+    """Coin sud-ouest de la case contenant le point"""
+    d_lat, d_lon = cell_size(precision)
+    return (math.floor((lat + 90) / d_lat) * d_lat - 90,
+            math.floor((lon + 180) / d_lon) * d_lon - 180)
+
+def ring(lat: float, lon: float, radius: int, precision: int) -> Iterator[str]:
+    """Cases situées à exactement `radius` cases de celle du point (anneau carré)"""
+    d_lat, d_lon = cell_size(precision)
+    south, west = cell_origin(lat, lon, precision)
+    if radius == 0:
+        offsets = [(0, 0)]
+    else:
+        side = range(-radius, radius + 1)
+        offsets = ([(i, j) for i in (-radius, radius) for j in side] +
+                   [(i, j) for i in range(-radius + 1, radius) for j in (-radius, radius)])
+    for i, j in offsets:
+        center_lat = south + (i + 0.5) * d_lat
+        if not -90 < center_lat < 90:
+            continue
+        center_lon = (west + (j + 0.5) * d_lon + 180) % 360 - 180
+        yield encode(center_lat, center_lon, precision)
+
+def covered_radius(lat: float, lon: float, radius: int, precision: int) -> float:
+    """
+    Distance (km) en deçà de laquelle tout point appartient aux anneaux 0..radius :
+    distance minimale du point au bord du bloc de cases parcouru
+    """
+    d_lat, d_lon = cell_size(precision)
+    south, west = cell_origin(lat, lon, precision)
+    block_south = south - radius * d_lat
+    block_north = south + (radius + 1) * d_lat
+    block_west = west - radius * d_lon
+    block_east = west + (radius + 1) * d_lon
+
+    lat_margin = min(lat - block_south, block_north - lat) * KM_PER_DEGREE
+    # Les méridiens se resserrent vers le pôle : largeur prise à la latitude la plus défavorable
+    worst_lat = min(89.9, max(abs(block_south), abs(block_north)))
+    lon_margin = min(lon - block_west, block_east - lon) * KM_PER_DEGREE * math.cos(math.radians(worst_lat))
+    return max(0.0, min(lat_margin, lon_margin))
+
+def build_index(mof_list: List[Dict], precision: int = DEFAULT_PRECISION) -> Dict:
+    """Index {"precision", "total", "buckets": {geohash: [[id, lat, lon], ...]}} des MOF géolocalisés"""
+    buckets = {}
+    for mof in mof_list:
+        coords = mof.get("coordinates") or {}
+        lat, lon = coords.get("lat"), coords.get("lon")
+        if lat is None or lon is None:
+            continue
+        buckets.setdefault(encode(lat, lon, precision), []).append([mof["id"], lat, lon])
+    return {
+        "precision": precision,
+        "total": sum(len(b) for b in buckets.values()),
+        "buckets": dict(sorted(buckets.items()))
+    }
+
+def nearest(index: Dict, lat: float, lon: float, k: int = 10,
+            max_distance: Optional[float] = None) -> List[Tuple[float, int]]:
+    """
+    K MOF les plus proches du point : liste de (distance en km, id), triée
+    Les anneaux de cases sont parcourus du centre vers l'extérieur, jusqu'à ce que
+    le K-ième candidat soit plus proche que le bord du bloc parcouru
+    """
+    precision, buckets = index["precision"], index["buckets"]
+    best = []  # Tas des K meilleurs : (-distance, id)
+    seen_cells = set()
+
+    def scan(cell):
+        seen_cells.add(cell)
+        for mof_id, mof_lat, mof_lon in buckets.get(cell, ()):
+            distance = haversine(lat, lon, mof_lat, mof_lon)
+            if max_distance is not None and distance > max_distance:
+                continue
+            if len(best) < k:
+                heapq.heappush(best, (-distance, mof_id))
+            elif distance < -best[0][0]:
+                heapq.heapreplace(best, (-distance, mof_id))
+
+    radius = 0
+    while True:
+        # Loin de toute donnée, le bloc parcouru compterait plus de cases que l'index : on parcourt le reste
+        if (2 * radius + 1) ** 2 > len(buckets):
+            for cell in buckets:
+                if cell not in seen_cells:
+                    scan(cell)
+            break
+
+        for cell in ring(lat, lon, radius, precision):
+            if cell not in seen_cells:
+                scan(cell)
+
+        covered = covered_radius(lat, lon, radius, precision)
+        if len(best) == k and -best[0][0] <= covered:
+            break
+        if max_distance is not None and max_distance <= covered:
+            break
+        radius += 1
+
+    return sorted((-d, mof_id) for d, mof_id in best)
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+Mode de sortie en flux des scrapers (--stream)
+Chaque enregistrement est ajouté à un fichier JSONL dès qu'il est extrait, puis dès
+qu'il est géocodé, avec un fsync périodique : une interruption ne perd que les
+derniers enregistrements non synchronisés. La relance reprend les fichiers existants et
+ne refait que ce qui manque. Le fichier final {meta, mof} est assemblé en parcourant le
+JSONL : la mémoire ne dépend pas de la taille de l'annuaire.
+
+Une ligne JSONL = {"key": identité de l'entrée, "mof": enregistrement}
+
+L'assemblage (identique à json.dump indenté) et la reprise après coupure sont
+vérifiés par tests/test_streaming.py
+"""
+
+import json
+import os
+import time
+from typing import Dict, Iterable, Iterator, List, Optional, Set
+
+from metrics import METRICS
+
+STREAM_DIR = "../data/stream"
+FSYNC_EVERY = 25        # Enregistrements entre deux fsync
+FSYNC_INTERVAL = 5.0    # Secondes au plus entre deux fsync
+GEOCODE_BATCH = 20      # Adresses géocodées (et écrites) par lot
+
+def stream_path(name: str, step: str) -> str:
+    """Fichier JSONL d'une étape d'un scraper (ex. stream_path("selenium", "geocoded"))"""
+    return os.path.join(STREAM_DIR, f"{name}-{step}.jsonl")
+
+class JsonlWriter:
+    """Ajout ligne à ligne, vidé à chaque écriture, fsync tous les FSYNC_EVERY enregistrements ou FSYNC_INTERVAL s"""
+
+    def __init__(self, path: str, fsync_every: int = FSYNC_EVERY, fsync_interval: float = FSYNC_INTERVAL):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self.file = open(path, 'a', encoding='utf-8')
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+        self.pending = 0
+        self.last_sync = time.monotonic()
+        self.written = 0
+
+    def write(self, key: str, record: Dict):
+        line = json.dumps({"key": key, "mof": record}, ensure_ascii=False) + "\n"
+        self.file.write(line)
+        self.file.flush()
+        self.written += 1
+        METRICS.count("writes", kind="jsonl", result="written")
+        METRICS.count("written_bytes", len(line.encode("utf-8")), kind="jsonl")
+        self.pending += 1
+        if self.pending >= self.fsync_every or time.monotonic() - self.last_sync >= self.fsync_interval:
+            self.sync()
+
+    def sync(self):
+        with METRICS.timer("write", kind="fsync"):
+            os.fsync(self.file.fileno())
+        self.pending = 0
+        self.last_sync = time.monotonic()
+
+    def close(self):
+        if not self.file.closed:
+            self.sync()
+            self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def read_jsonl(path: str) -> Iterator[Dict]:
+    """
+    Lignes {"key", "mof"} du fichier, une à la fois
+    Une dernière ligne tronquée (coupure pendant l'écriture) est ignorée
+    """
+    if not os.path.exists(path):
+        return
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if not line.endswith("\n"):
+                print(f"  ⚠ Dernière ligne incomplète ignorée dans {path}")
+                return
+            if line.strip():
+                yield json.loads(line)
+
+def repair_jsonl(path: str):
+    """Retire une dernière ligne incomplète avant de reprendre l'écriture à la suite"""
+    if not os.path.exists(path):
+        return
+    with open(path, 'rb+') as f:
+        f.seek(0, os.SEEK_END)
+        size = f.tell()
+        if size == 0:
+            return
+        f.seek(size - 1)
+        if f.read(1) == b"\n":
+            return
+        # Recherche du dernier saut de ligne par blocs, depuis la fin
+        position = size
+        while position > 0:
+            step = min(4096, position)
+            position -= step
+            f.seek(position)
+            chunk = f.read(step)
+            newline = chunk.rfind(b"\n")
+            if newline != -1:
+                f.truncate(position + newline + 1)
+                return
+        f.truncate(0)
+
+def completed_keys(path: str) -> Set[str]:
+    """Identités déjà présentes dans le fichier (seules les clés sont gardées en mémoire)"""
+    return {line["key"] for line in read_jsonl(path)}
+
+def open_for_resume(path: str) -> JsonlWriter:
+    repair_jsonl(path)
+    return JsonlWriter(path)
+
+def geocode_stream(source: str, target: str, limit: Optional[int] = None,
+                   batch_size: int = GEOCODE_BATCH) -> Dict[str, int]:
+    """
+    Recopie `source` dans `target` en ajoutant les coordonnées manquantes, par lots ;
+    les enregistrements déjà présents dans `target` (passage interrompu) sont sautés.
+    Au-delà de `limit` adresses géocodées, les coordonnées restent vides.
+    """
+    from geocoding import geocode_addresses
+
+    done = completed_keys(target)
+    stats = {"resumed": len(done), "geocoded": 0, "copied": 0}
+    batch = []
+
+    with open_for_resume(target) as writer:
+        def flush():
+            coords_list = geocode_addresses([mof["address"] for _, mof in batch])
+            for (key, mof), coords in zip(batch, coords_list):
+                writer.write(key, {**mof, "coordinates": coords})
+            stats["geocoded"] += len(batch)
+            batch.clear()
+
+        for line in read_jsonl(source):
+            key, mof = line["key"], line["mof"]
+            if key in done:
+                continue
+            done.add(key)
+            needs_coords = mof.get("address") and (mof.get("coordinates") or {}).get("lat") is None
+            budget_left = limit is None or stats["geocoded"] + len(batch) < limit
+            if needs_coords and budget_left:
+                batch.append((key, mof))
+                if len(batch) >= batch_size:
+                    flush()
+                continue
+            writer.write(key, {**mof, "coordinates": mof.get("coordinates") or {"lat": None, "lon": None}})
+            stats["copied"] += 1
+        if batch:
+            flush()
+    return stats
+
+def write_indented(f, value, indent: str):
+    """Écrit `value` comme json.dump(indent=2) le ferait à ce niveau d'imbrication"""
+    f.write(json.dumps(value, ensure_ascii=False, indent=2).replace("\n", "\n" + indent))
+
+def id_order(path: str) -> List[int]:
+    """Positions (en octets) des lignes complètes du fichier, triées par id d'enregistrement"""
+    index = []
+    with open(path, 'rb') as f:
+        offset = 0
+        for raw in f:
+            if not raw.endswith(b"\n"):
+                break
+            if raw.strip():
+                index.append((json.loads(raw)["mof"].get("id") or 0, offset))
+            offset += len(raw)
+    index.sort()
+    return [offset for _, offset in index]
+
+def read_jsonl_at(path: str, offsets: List[int]) -> Iterator[Dict]:
+    with open(path, 'rb') as f:
+        for offset in offsets:
+            f.seek(offset)
+            yield json.loads(f.readline())
+
+def assemble_json(source: str, output_path: str, meta: Dict, order_by_id: bool = False) -> int:
+    """
+    Assemble {meta, mof} dans `output_path` en deux parcours du JSONL (comptage, puis écriture),
+    sans charger la liste ; mise en forme identique à json.dump(data, indent=2).
+    Les id sont renumérotés dans l'ordre du fichier, ou avec order_by_id dans l'ordre des id
+    écrits (seuls les id et positions des lignes sont gardés en mémoire pour le tri).
+    Retourne le nombre d'enregistrements.
+    """
+    offsets = id_order(source) if order_by_id and os.path.exists(source) else None
+    total = len(offsets) if offsets is not None else sum(1 for _ in read_jsonl(source))
+    meta = {"total": total, **{k: v for k, v in meta.items() if k != "total"}}
+    lines = read_jsonl_at(source, offsets) if offsets is not None else read_jsonl(source)
+
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+    tmp_path = f"{output_path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write('{\n  "meta": ')
+        write_indented(f, meta, "  ")
+        f.write(',\n  "mof": [')
+        for position, line in enumerate(lines):
+            mof = {"id": position + 1, **{k: v for k, v in line["mof"].items() if k != "id"}}
+            f.write(",\n    " if position else "\n    ")
+            write_indented(f, mof, "    ")
+        f.write("\n  ]\n}" if total else "]\n}")
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, output_path)
+    return total
+
+def remove_stream(paths: Iterable[str]):
+    """Fichiers de flux supprimés une fois le fichier final assemblé : le passage suivant repart de zéro"""
+    for path in paths:
+        if os.path.exists(path):
+            os.remove(path)
@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+"""
+Jeu de données MOF synthétique, déterministe (même graine et même taille = même fichier),
+pour éprouver le site et les étapes de la chaîne à 1 000 comme à 1 000 000 d'enregistrements
+- spécialités des métiers de bouche selon une répartition proche de l'annuaire
+- années des sessions du concours, plus nombreuses pour les sessions récentes
+- artisans à plusieurs boutiques (même nom, même spécialité, autres adresses)
+- coordonnées autour des communes de data/communes.csv, pondérées par leur population
+Au-delà de 100 000 enregistrements, des homonymes de même catégorie apparaissent et sont
+regroupés par entities.py, comme le seraient de vrais homonymes.
+
+Tout est écrit dans data/synthetic/<taille>-s<graine>/ (ou --out) ; les données de production
+(data/mof-data.json, public/, docs/, cache de géocodage) ne sont jamais modifiées.
+
+    python3 synthetic_data.py 100000 [--seed 42] [--out DOSSIER] [--ungeocoded 0.05] [--non-food 0.3]
+    python3 synthetic_data.py 100000 --site     # + copie du site servie avec ce jeu de données
+    python3 synthetic_data.py 100000 --stages   # + durée de chaque étape de pipeline.py
+"""
+
+import csv
+import json
+import math
+import os
+import random
+import shutil
+import sys
+import time
+from typing import Dict, Iterator, List
+
+from geocache import normalize_address
+from publish import DATA_PATH, SITE_DIRS, publish_data
+from streaming import write_indented
+
+SYNTHETIC_DIR = "../data/synthetic"
+COMMUNES_PATH = "../data/communes.csv"
+SITE_FILES = ["index.html", "css", "js", "robots.txt"]
+
+# Spécialités des métiers de bouche et poids approximatif dans l'annuaire
+SPECIALTIES = [
+    ("Cuisinier", 22), ("Pâtissier-Confiseur", 14), ("Boulanger", 12), ("Boucher-Charcutier", 7),
+    ("Charcutier-Traiteur", 6), ("Fromager", 6), ("Chocolatier-Confiseur", 6), ("Pâtissier-Chocolatier", 4),
+    ("Glacier", 4), ("Maître d'hôtel", 4), ("Sommelier", 4), ("Poissonnier-Écailler", 3),
+    ("Traiteur", 2), ("Barman", 2), ("Primeur", 2), ("Torréfacteur", 1)
+]
+# Autres métiers de l'annuaire (--non-food : écartés par l'étape classify)
+OTHER_SPECIALTIES = ["Ébéniste", "Coiffeur", "Horloger", "Maître verrier", "Couvreur", "Ferronnier",
+                     "Bijoutier-Joaillier", "Tailleur de pierre", "Menuisier", "Fleuriste"]
+# Sessions du concours ; les lauréats récents sont plus nombreux dans l'annuaire
+SESSIONS = [1979, 1982, 1986, 1991, 1994, 1997, 2000, 2004, 2007, 2011, 2015, 2018, 2019, 2023, 2024]
+# Nombre de boutiques par artisan
+SHOP_COUNTS = [(1, 82), (2, 11), (3, 4), (4, 2), (6, 1)]
+# Communes découpées en arrondissements (premier code postal, nombre d'arrondissements)
+ARRONDISSEMENTS = {"Paris": (75001, 20), "Lyon": (69001, 9), "Marseille": (13001, 16)}
+
+FIRST_NAMES = [
+    "Éric", "Hélène", "Jean-François", "Zoé", "Rémi", "Agnès", "Loïc", "Maëlle", "Noël", "Céline",
+    "Pierre", "Anne", "Luc", "Marie", "Paul", "Claire", "Thierry", "Sophie", "Jacques", "Isabelle",
+    "Philippe", "Nathalie", "Michel", "Sylvie", "Olivier", "Valérie", "Nicolas", "Sandrine", "Stéphane",
+    "Christine", "Laurent", "Catherine", "Frédéric", "Véronique", "Christophe", "Martine", "Patrick",
+    "Aurélie", "Julien", "Camille", "Mathieu", "Émilie", "Yannick", "Delphine", "François", "Mélanie",
+    "Gilles", "Élodie", "Benoît", "Margaux", "Arnaud", "Léa", "Guillaume", "Chloé", "Sébastien", "Inès"
+]
+LAST_NAMES = [
+    "Martin", "Bernard", "Dubois", "Thomas", "Robert", "Richard", "Petit", "Durand", "Leroy", "Moreau",
+    "Simon", "Laurent", "Lefèvre", "Michel", "Garcia", "David", "Bertrand", "Roux", "Vincent", "Fournier",
+    "Morel", "Girard", "André", "Mercier", "Dupont", "Lambert", "Bonnet", "François", "Martinez", "Legrand",
+    "Garnier", "Faure", "Rousseau", "Blanc", "Guérin", "Muller", "Henry", "Roussel", "Nicolas", "Perrin",
+    "Morin", "Mathieu", "Clément", "Gauthier", "Dumont", "Lopez", "Fontaine", "Chevalier", "Robin", "Masson",
+    "Sanchez", "Gérard", "Nguyen", "Boyer", "Denis", "Lemaire", "Duval", "Joly", "Gautier", "Roger",
+    "Roche", "Roy", "Noël", "Meyer", "Lucas", "Meunier", "Jean", "Pérez", "Marchand", "Dufour",
+    "Blanchard", "Marie", "Barbier", "Brun", "Dumas", "Brunet", "Schmitt", "Leroux", "Colin", "Fernandez",
+    "Hévin", "Quatrehomme", "Brys", "Larher", "Chaussée", "Conticini", "Marcon", "Régalade", "Pacaud", "Bras"
+]
+# Noms de famille composés de syllabes (Beauchamp, Villeneuve...) : la liste réelle seule
+# donnerait trop d'homonymes au-delà de 100 000 artisans
+SURNAME_STARTS = ["Beau", "Bel", "Bon", "Chau", "Cham", "Du", "Fer", "Font", "Gar", "Lam", "Lan", "Mar",
+                  "Mon", "Pont", "Ri", "Ro", "Roche", "Saint", "Ver", "Vil", "Ville", "Cour", "Val", "Dau",
+                  "Ber", "Bou", "Char", "Clair", "Haut", "Grand"]
+SURNAME_ENDS = ["champ", "lieu", "mont", "court", "neuve", "bert", "chard", "det", "geot", "lard", "nier",
+                "rand", "tier", "vert", "fort", "bois", "val", "ret", "mas", "lin", "quet", "zac"]
+STREETS = [
+    "rue de la République", "avenue Victor Hugo", "boulevard Jean Jaurès", "rue du Commerce",
+    "place de la Mairie", "rue Nationale", "avenue de la Liberté", "rue du Marché", "boulevard Gambetta",
+    "rue Saint-Jean", "rue de l'Église", "place du Marché", "rue des Halles", "rue Pasteur",
+    "avenue Foch", "rue du Général de Gaulle", "rue de la Gare", "grande rue", "rue Carnot", "quai des Marchands"
+]
+
+def load_communes(path: str = COMMUNES_PATH) -> List[Dict]:
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        return [{"name": row["name"], "postcode": row["postcode"], "lat": float(row["lat"]),
+                 "lon": float(row["lon"]), "population": int(row["population"])} for row in csv.DictReader(f)]
+
+def slug(text: str) -> str:
+    return normalize_address(text).replace(" ", "-")
+
+class Generator:
+    """Tirages d'une seule graine : la même séquence d'appels donne toujours les mêmes enregistrements"""
+
+    def __init__(self, seed: int, communes: List[Dict], non_food: float = 0.0, ungeocoded: float = 0.0):
+        self.rng = random.Random(seed)
+        self.communes = communes
+        # Plus de MOF dans les grandes villes, sans que Paris n'écrase tout le reste
+        self.commune_weights = list(_cumulative(c["population"] ** 0.75 for c in communes))
+        self.specialties, weights = zip(*SPECIALTIES)
+        self.specialty_weights = list(_cumulative(weights))
+        self.session_weights = list(_cumulative(range(1, len(SESSIONS) + 1)))
+        self.shop_counts, weights = zip(*SHOP_COUNTS)
+        self.shop_weights = list(_cumulative(weights))
+        self.non_food = non_food
+        self.ungeocoded = ungeocoded
+
+    def commune(self) -> Dict:
+        return self.rng.choices(self.communes, cum_weights=self.commune_weights)[0]
+
+    def surname(self) -> str:
+        if self.rng.random() < 0.5:
+            return self.rng.choice(LAST_NAMES)
+        return self.rng.choice(SURNAME_STARTS) + self.rng.choice(SURNAME_ENDS)
+
+    def name(self) -> str:
+        """Prénoms et noms composés : assez de combinaisons pour que les homonymes restent rares à 1 000 000"""
+        rng = self.rng
+        first = rng.choice(FIRST_NAMES)
+        if rng.random() < 0.25:
+            first = f"{first.split('-')[0]}-{rng.choice(FIRST_NAMES).split('-')[0]}"
+        last = self.surname()
+        if rng.random() < 0.3:
+            last = f"{last}-{self.surname()}"
+        return f"{first} {last}"
+
+    def location(self, commune: Dict):
+        """Adresse et coordonnées dispersées autour du centre (rayon croissant avec la population)"""
+        rng = self.rng
+        postcode = commune["postcode"]
+        if commune["name"] in ARRONDISSEMENTS:
+            first, count = ARRONDISSEMENTS[commune["name"]]
+            postcode = f"{first + rng.randrange(count):05d}"
+        address = f"{rng.randint(1, 180)} {rng.choice(STREETS)}, {postcode} {commune['name']}"
+        if rng.random() < self.ungeocoded:
+            return address, {"lat": None, "lon": None}
+        spread_km = min(7.0, 0.6 + 6.0 * math.sqrt(commune["population"] / 2_000_000))
+        lat = commune["lat"] + rng.gauss(0, spread_km / 2) / 111.0
+        lon = commune["lon"] + rng.gauss(0, spread_km / 2) / (111.0 * math.cos(math.radians(commune["lat"])))
+        return address, {"lat": round(lat, 6), "lon": round(lon, 6)}
+
+    def persons(self) -> Iterator[List[Dict]]:
+        """Enregistrements d'un artisan à la fois (une boutique par enregistrement, sans id)"""
+        rng = self.rng
+        while True:
+            name = self.name()
+            if rng.random() < self.non_food:
+                specialty = rng.choice(OTHER_SPECIALTIES)
+            else:
+                specialty = rng.choices(self.specialties, cum_weights=self.specialty_weights)[0]
+            year = rng.choices(SESSIONS, cum_weights=self.session_weights)[0]
+            website = (f"https://www.{slug(name.split(' ', 1)[1])}-{slug(specialty.split('-')[0])}.fr"
+                       if rng.random() < 0.55 else None)
+            home = self.commune()
+            shops = rng.choices(self.shop_counts, cum_weights=self.shop_weights)[0]
+            records = []
+            for shop in range(shops):
+                # Boutiques suivantes : souvent la même ville, parfois une autre
+                commune = home if shop == 0 or rng.random() < 0.6 else self.commune()
+                address, coordinates = self.location(commune)
+                records.append({"name": name, "specialty": specialty, "year": year,
+                                "address": address, "website": website, "coordinates": coordinates})
+            yield records
+
+def _cumulative(weights) -> Iterator[float]:
+    total = 0.0
+    for weight in weights:
+        total += weight
+        yield total
+
+def generate(count: int, seed: int = 42, non_food: float = 0.0, ungeocoded: float = 0.0,
+             communes_path: str = COMMUNES_PATH) -> Iterator[Dict]:
+    """`count` enregistrements numérotés de 1 à count (le dernier artisan peut être tronqué)"""
+    generator = Generator(seed, load_communes(communes_path), non_food, ungeocoded)
+    produced = 0
+    for records in generator.persons():
+        for record in records:
+            produced += 1
+            yield {"id": produced, **record}
+            if produced == count:
+                return
+
+def dataset_meta(count: int, seed: int) -> Dict:
+    # Date fixe : deux générations identiques donnent deux fichiers identiques
+    return {"total": count, "generated_at": "2000-01-01 00:00:00", "source": "synthetic",
+            "method": "synthetic_data.py", "seed": seed,
+            "note": "Données fictives générées pour les tests de charge"}
+
+def check_output(path: str):
+    """Refuse toute sortie qui écraserait les données de production ou le site"""
+    target = os.path.realpath(path)
+    protected = [os.path.realpath(DATA_PATH)] + [os.path.realpath(d) for d in SITE_DIRS]
+    for location in protected:
+        if target == location or target.startswith(location + os.sep):
+            sys.exit(f"❌ Sortie refusée (données de production): {path}")
+
+def write_dataset(records: Iterator[Dict], meta: Dict, path: str) -> int:
+    """Écrit {meta, mof} au fil de l'eau, dans la mise en forme de json.dump(indent=2)"""
+    check_output(path)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    written = 0
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write('{\n  "meta": ')
+        write_indented(f, meta, "  ")
+        f.write(',\n  "mof": [')
+        for record in records:
+            f.write(",\n    " if written else "\n    ")
+            write_indented(f, record, "    ")
+            written += 1
+        f.write("\n  ]\n}" if written else "]\n}")
+    os.replace(tmp_path, path)
+    return written
+
+def build_site(data: Dict, out_dir: str) -> str:
+    """Copie du site (HTML, CSS, JS) publiée avec le jeu synthétique ; retourne son dossier"""
+    from landing_pages import generate_landing_pages
+
+    site_dir = os.path.join(out_dir, "site")
+    check_output(site_dir)
+    for name in SITE_FILES:
+        source = os.path.join(SITE_DIRS[0], name)
+        target = os.path.join(site_dir, name)
+        if os.path.isdir(source):
+            shutil.copytree(source, target, dirs_exist_ok=True)
+        elif os.path.exists(source):
+            os.makedirs(site_dir, exist_ok=True)
+            shutil.copy2(source, target)
+    publish_data(data, os.path.join(out_dir, "published.json"), [site_dir])
+    generate_landing_pages(data, [site_dir], manifest_path=os.path.join(out_dir, "landing-manifest.json"))
+    return site_dir
+
+def write_corrections(data: Dict, out_dir: str, seed: int) -> str:
+    """Corrections synthétiques (1 % de sites web modifiés, 0,2 % d'adresses retirées), par id"""
+    rng = random.Random(seed)
+    path = os.path.join(out_dir, "corrections.jsonl")
+    with open(path, 'w', encoding='utf-8') as f:
+        for mof in data["mof"]:
+            draw = rng.random()
+            if draw < 0.002:
+                correction = {"op": "invalidate", "id": mof["id"]}
+            elif draw < 0.012:
+                correction = {"op": "update", "id": mof["id"], "website": f"https://mof-{mof['id']}.example.fr"}
+            else:
+                continue
+            f.write(json.dumps(correction, ensure_ascii=False) + "\n")
+    return path
+
+def run_stages(data: Dict, out_dir: str, seed: int) -> Dict:
+    """
+    Étapes de pipeline.py en mémoire, chronométrées, puis publication dans la copie du site
+    Les corrections sont synthétiques (celles de data/corrections/ visent des artisans réels) ;
+    le cache de géocodage est propre au jeu de données, et les adresses sans coordonnées
+    (--ungeocoded) passent par les fournisseurs de MOF_GEOCODERS, à pointer vers un serveur local
+    """
+    import geocoding
+    from corrections import apply_corrections
+    from geocache import GeocodeCache
+    from pipeline import stage_classify, stage_geocode, stage_resolve, stage_validate
+
+    corrections_path = write_corrections(data, out_dir, seed)
+
+    def stage_corrections(data: Dict, options: Dict) -> Dict:
+        mof_list = [dict(mof) for mof in data["mof"]]
+        apply_corrections(mof_list, [corrections_path]).report()
+        return {**data, "meta": {**data["meta"], "total": len(mof_list)}, "mof": mof_list}
+
+    geocoding._cache = GeocodeCache(os.path.join(out_dir, "geocode-cache.sqlite"))
+    timings = {}
+    for name, stage in [("classify", stage_classify), ("corrections", stage_corrections),
+                        ("resolve", stage_resolve), ("geocode", stage_geocode), ("validate", stage_validate)]:
+        print(f"▶ {name}")
+        start = time.perf_counter()
+        data = stage(data, {})
+        timings[name] = time.perf_counter() - start
+        print(f"  └─ {name} terminé en {timings[name]:.2f}s")
+
+    print("▶ publish")
+    start = time.perf_counter()
+    build_site(data, out_dir)
+    timings["publish"] = time.perf_counter() - start
+    print(f"  └─ publish terminé en {timings['publish']:.2f}s")
+    return timings
+
+def option(name: str, default):
+    if name in sys.argv:
+        return type(default)(sys.argv[sys.argv.index(name) + 1])
+    return default
+
+def main():
+    values = [a for i, a in enumerate(sys.argv[1:], start=1)
+              if not a.startswith("--") and not sys.argv[i - 1].startswith("--")]
+    count = int(values[0]) if values else 10000
+    seed = option("--seed", 42)
+    out_dir = option("--out", os.path.join(SYNTHETIC_DIR, f"{count}-s{seed}"))
+    path = os.path.join(out_dir, "mof-data.json")
+
+    start = time.perf_counter()
+    records = generate(count, seed, option("--non-food", 0.0), option("--ungeocoded", 0.0))
+    written = write_dataset(records, dataset_meta(count, seed), path)
+    print(f"📊 {written} MOF synthétiques (graine {seed}) en {time.perf_counter() - start:.1f}s")
+    print(f"└─ {path} ({os.path.getsize(path) / 1024 / 1024:.1f} Mo)")
+
+    if "--site" in sys.argv or "--stages" in sys.argv:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        print()
+        if "--stages" in sys.argv:
+            timings = run_stages(data, out_dir, seed)
+            print(f"\n⏱ {', '.join(f'{name} {seconds:.2f}s' for name, seconds in timings.items())}")
+        else:
+            build_site(data, out_dir)
+        print(f"\n🌐 python3 -m http.server 8000 --directory {os.path.join(out_dir, 'site')}")
+
+if __name__ == "__main__":
+    main()
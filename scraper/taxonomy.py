@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Taxonomie des métiers de bouche, partagée par tous les scrapers
+Les mots-clés sont compilés en une seule expression régulière sur le texte
+sans accents ni casse ("Patissier" et "Pâtissier" sont équivalents) ;
+chaque spécialité brute est associée à une catégorie canonique, avec mémoïsation.
+
+Vérifier la classification des spécialités publiées et mesurer le débit :
+    python3 taxonomy.py [nombre d'entrées]
+"""
+
+import json
+import re
+import sys
+import time
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+from geocache import normalize_address
+
+# Catégories canoniques et mots-clés (début de mot, sans accents)
+# L'ordre ne compte pas : la catégorie retenue est celle du premier mot-clé rencontré dans le texte
+CATEGORIES = {
+    "Cuisine": ["cuisine", "cuisinier", "gastronomie", "chef", "restaurateur"],
+    "Boulangerie": ["boulanger", "boulangerie"],
+    "Pâtisserie": ["patissier", "patisserie"],
+    "Confiserie": ["confiseur", "confiserie"],
+    "Chocolaterie": ["chocolat", "chocolatier", "chocolaterie"],
+    "Glacerie": ["glacier", "glace", "sorbet"],
+    "Boucherie": ["boucher", "boucherie"],
+    "Charcuterie-Traiteur": ["charcutier", "charcuterie", "traiteur"],
+    "Poissonnerie": ["poissonnier", "poissonnerie", "ecailler"],
+    "Fromagerie": ["fromager", "fromagerie", "cremier"],
+    "Primeur": ["primeur", "fruitier", "maraicher"],
+    "Torréfaction": ["torrefacteur", "torrefaction"],
+    "Service & Sommellerie": ["sommelier", "sommellerie", "barman", "maitre d hotel", "arts de la table"],
+    "Sécurité alimentaire": ["securite alimentaire"],
+}
+
+# Nom du métier par catégorie (slug des pages « métier-ville », libellé au pluriel)
+TRADES = {
+    "Cuisine": ("cuisinier", "Cuisiniers"),
+    "Boulangerie": ("boulanger", "Boulangers"),
+    "Pâtisserie": ("patissier", "Pâtissiers"),
+    "Confiserie": ("confiseur", "Confiseurs"),
+    "Chocolaterie": ("chocolatier", "Chocolatiers"),
+    "Glacerie": ("glacier", "Glaciers"),
+    "Boucherie": ("boucher", "Bouchers"),
+    "Charcuterie-Traiteur": ("charcutier", "Charcutiers"),
+    "Poissonnerie": ("poissonnier", "Poissonniers"),
+    "Fromagerie": ("fromager", "Fromagers"),
+    "Primeur": ("primeur", "Primeurs"),
+    "Torréfaction": ("torrefacteur", "Torréfacteurs"),
+    "Service & Sommellerie": ("sommelier", "Sommeliers"),
+    "Sécurité alimentaire": ("securite-alimentaire", "Experts en sécurité alimentaire"),
+}
+
+KEYWORD_CATEGORY = {keyword: category for category, keywords in CATEGORIES.items() for keyword in keywords}
+
+# Alternative unique, mots-clés les plus longs d'abord ("patisserie" avant "patissier")
+KEYWORD_PATTERN = re.compile(
+    r"\b(?:" + "|".join(re.escape(k) for k in sorted(KEYWORD_CATEGORY, key=len, reverse=True)) + r")"
+)
+
+@lru_cache(maxsize=4096)
+def classify(specialty: Optional[str]) -> Optional[str]:
+    """Catégorie canonique d'une spécialité (None si ce n'est pas un métier de bouche)"""
+    if not specialty:
+        return None
+    match = KEYWORD_PATTERN.search(normalize_address(specialty))
+    return KEYWORD_CATEGORY[match.group(0)] if match else None
+
+@lru_cache(maxsize=4096)
+def classify_all(specialty: Optional[str]) -> Tuple[str, ...]:
+    """Toutes les catégories d'une spécialité composée ("Pâtissier-Chocolatier"), dans l'ordre du texte"""
+    if not specialty:
+        return ()
+    categories = [KEYWORD_CATEGORY[m.group(0)] for m in KEYWORD_PATTERN.finditer(normalize_address(specialty))]
+    return tuple(dict.fromkeys(categories))
+
+def is_food_category(specialty: Optional[str]) -> bool:
+    """Vérifie si la spécialité appartient aux métiers de bouche"""
+    return classify(specialty) is not None
+
+def benchmark(specialties: List[str], count: int) -> float:
+    """Durée de classification de `count` entrées tirées des spécialités données"""
+    entries = [specialties[i % len(specialties)] for i in range(count)]
+    classify.cache_clear()
+    start = time.perf_counter()
+    for specialty in entries:
+        classify(specialty)
+    return time.perf_counter() - start
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    with open("../public/data.json", 'r', encoding='utf-8') as f:
+        specialties = sorted({m.get("specialty") or "" for m in json.load(f)["mof"]})
+
+    by_category: Dict[str, List[str]] = {}
+    for specialty in specialties:
+        by_category.setdefault(classify(specialty) or "—", []).append(specialty)
+    print("📊 Classification des spécialités publiées:")
+    for category, items in sorted(by_category.items()):
+        print(f"├─ {category}: {', '.join(items)}")
+
+    elapsed = benchmark(specialties + ["Patissier", "Ébéniste", "Maître verrier"], count)
+    print(f"└─ {count} entrées classées en {elapsed * 1000:.1f} ms")
+
+if __name__ == "__main__":
+    main()
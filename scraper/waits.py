@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Attentes conditionnelles pour les scrapers Selenium
+Remplace les time.sleep() fixes par des attentes sur l'état de la page,
+et mesure la durée réelle de chaque attente par site d'appel (p50/p95).
+"""
+
+import math
+import threading
+import time
+from typing import Callable, Dict, List
+
+from selenium.common.exceptions import StaleElementReferenceException, TimeoutException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+
+from metrics import METRICS
+
+MODAL_SELECTOR = ".modal, .popup, .fiche"
+POLL_FREQUENCY = 0.1
+
+def percentile(values: List[float], pct: float) -> float:
+    """Percentile par rang le plus proche (valeurs non vides)"""
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, math.ceil(pct / 100 * len(ordered)) - 1))
+    return ordered[rank]
+
+class WaitTimings:
+    """Enregistre la durée de chaque attente, par site d'appel"""
+
+    def __init__(self):
+        self.durations: Dict[str, List[float]] = {}
+        self.timeouts: Dict[str, int] = {}
+        self.lock = threading.Lock()
+
+    def record(self, site: str, seconds: float, timed_out: bool = False):
+        METRICS.observe("wait", seconds, site=site)
+        if timed_out:
+            METRICS.count("wait_timeouts", site=site)
+        with self.lock:
+            self.durations.setdefault(site, []).append(seconds)
+            if timed_out:
+                self.timeouts[site] = self.timeouts.get(site, 0) + 1
+
+    def summary(self) -> Dict[str, Dict]:
+        with self.lock:
+            return {
+                site: {
+                    "count": len(values),
+                    "p50": percentile(values, 50),
+                    "p95": percentile(values, 95),
+                    "total": sum(values),
+                    "timeouts": self.timeouts.get(site, 0)
+                }
+                for site, values in self.durations.items()
+            }
+
+    def report(self):
+        summary = self.summary()
+        if not summary:
+            return
+        print("\n⏱ Attentes Selenium (par site):")
+        for site, s in sorted(summary.items(), key=lambda x: x[1]["total"], reverse=True):
+            print(f"  • {site}: {s['count']}x, p50 {s['p50']:.2f}s, p95 {s['p95']:.2f}s, "
+                  f"total {s['total']:.1f}s, {s['timeouts']} timeouts")
+
+TIMINGS = WaitTimings()
+
+def timed_wait(driver, site: str, condition: Callable, timeout: float = 10):
+    """
+    Attend que `condition(driver)` soit vraie, et enregistre la durée sous `site`
+    Retourne la valeur de la condition, ou None si le délai est dépassé
+    """
+    start = time.perf_counter()
+    try:
+        result = WebDriverWait(
+            driver, timeout, poll_frequency=POLL_FREQUENCY,
+            ignored_exceptions=(StaleElementReferenceException,)
+        ).until(condition)
+    except TimeoutException:
+        TIMINGS.record(site, time.perf_counter() - start, timed_out=True)
+        return None
+    TIMINGS.record(site, time.perf_counter() - start)
+    return result
+
+def count_greater_than(selector: str, count: int) -> Callable:
+    """Condition : plus de `count` éléments correspondent à `selector`"""
+    return lambda driver: len(driver.find_elements(By.CSS_SELECTOR, selector)) > count
+
+def modal_with_content(driver):
+    """Condition : une modal est visible et son contenu est chargé (texte non vide)"""
+    for modal in driver.find_elements(By.CSS_SELECTOR, MODAL_SELECTOR):
+        if modal.is_displayed() and modal.text.strip():
+            return modal
+    return False
+
+def modal_closed(driver) -> bool:
+    """Condition : plus aucune modal visible"""
+    return not any(m.is_displayed() for m in driver.find_elements(By.CSS_SELECTOR, MODAL_SELECTOR))
+
+def in_viewport(element) -> Callable:
+    """Condition : le haut de l'élément est affiché dans la fenêtre (après scrollIntoView)"""
+    script = (
+        "const r = arguments[0].getBoundingClientRect();"
+        "return r.top >= 0 && r.top < (window.innerHeight || document.documentElement.clientHeight);"
+    )
+    return lambda driver: element.is_displayed() and driver.execute_script(script, element)
+
+def report_wait_timings():
+    TIMINGS.report()
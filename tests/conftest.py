@@ -0,0 +1,9 @@
+"""Les scripts du scraper s'importent comme des modules de premier niveau (cd scraper && python3 x.py)"""
+
+import os
+import sys
+
+SCRAPER_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scraper")
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+sys.path.insert(0, SCRAPER_DIR)
@@ -0,0 +1,60 @@
+"""Index BAN construit à partir d'un petit extrait de l'export CSV (tests/fixtures/ban-extrait.csv)"""
+
+import gzip
+import os
+import shutil
+
+import pytest
+
+from conftest import FIXTURES_DIR
+from ban_index import BANIndex, build_index
+
+EXTRACT = os.path.join(FIXTURES_DIR, "ban-extrait.csv")
+
+@pytest.fixture
+def index(tmp_path):
+    path = str(tmp_path / "ban-index.bin")
+    build_index([EXTRACT], path)
+    index = BANIndex(path)
+    yield index
+    index.close()
+
+def assert_close(coords, lat, lon):
+    assert coords is not None
+    assert coords["lat"] == pytest.approx(lat, abs=1e-5)
+    assert coords["lon"] == pytest.approx(lon, abs=1e-5)
+
+def test_numbered_address(index):
+    assert_close(index.geocode("72 Rue Bonaparte, 75006 Paris"), 48.853087, 2.332664)
+    assert_close(index.geocode("8 Rue Monge, 75005 Paris"), 48.847740, 2.349207)
+
+def test_suffix_and_abbreviation(index):
+    assert_close(index.geocode("47 ter bd Saint-Germain, 75005 Paris"), 48.848909, 2.347701)
+    # Indice absent de l'index : numéro sans indice
+    assert_close(index.geocode("49 bis boulevard Saint Germain, 75005 Paris"), 48.848951, 2.347479)
+
+def test_street_centroid(index):
+    # Numéro absent : centroïde des numéros de la voie
+    assert_close(index.geocode("200 Rue de Turenne, 75003 Paris"), (48.862947 + 48.863085) / 2,
+                 (2.363373 + 2.363358) / 2)
+    assert_close(index.geocode("Rue de la République, 69001 Lyon"), (45.766270 + 45.766155) / 2,
+                 (4.835990 + 4.836040) / 2)
+
+def test_misses(index):
+    assert index.geocode("72 Rue Bonaparte, 75007 Paris") is None  # Autre code postal
+    assert index.geocode("1 Rue Inconnue, 75006 Paris") is None
+    assert index.geocode("Paris") is None
+    assert index.stats == {"hits": 0, "misses": 3}
+
+def test_row_without_coordinates_is_skipped(index):
+    # La seconde ligne du Quai du Port n'a pas de coordonnées : le centroïde est celui de la première
+    assert_close(index.geocode("Quai du Port, 13002 Marseille"), 43.296750, 5.369180)
+
+def test_gzip_export_gives_same_index(tmp_path):
+    gz_path = str(tmp_path / "extrait.csv.gz")
+    with open(EXTRACT, "rb") as source, gzip.open(gz_path, "wb") as target:
+        shutil.copyfileobj(source, target)
+    plain, packed = str(tmp_path / "plain.bin"), str(tmp_path / "packed.bin")
+    assert build_index([EXTRACT], plain) == build_index([gz_path], packed)
+    with open(plain, "rb") as a, open(packed, "rb") as b:
+        assert a.read() == b.read()
@@ -0,0 +1,59 @@
+"""Corrections manuelles (corrections.py) : renommage et lignes CSV illisibles"""
+
+from corrections import Patcher, apply_corrections
+
+def records():
+    return [
+        {"id": 1, "name": "Nicolas Cloiseau", "specialty": "Chocolatier",
+         "address": "225 rue du Faubourg Saint-Honoré, 75008 Paris", "year": 2007, "website": None,
+         "coordinates": {"lat": 48.8772, "lon": 2.2997}},
+        {"id": 2, "name": "Laurent Dubois", "specialty": "Fromager",
+         "address": "47 ter boulevard Saint-Germain, 75005 Paris", "year": 2000, "website": None,
+         "coordinates": {"lat": 48.8497, "lon": 2.3522}},
+        {"id": 3, "name": "Laurent Dubois", "specialty": "Fromager",
+         "address": "2 rue de Lourmel, 75015 Paris", "year": 2000, "website": None,
+         "coordinates": {"lat": 48.8498, "lon": 2.2913}}
+    ]
+
+def test_renamed_record_is_found_under_its_new_name():
+    patcher = Patcher(records())
+
+    assert patcher.apply({"op": "update", "id": 1, "name": "Nicolas Cloiseau (La Maison du Chocolat)"}) == "update"
+    assert patcher.apply({"op": "update", "name": "Nicolas Cloiseau (La Maison du Chocolat)",
+                          "website": "https://www.lamaisonduchocolat.com"}) == "update"
+
+    assert patcher.by_id[1]["website"] == "https://www.lamaisonduchocolat.com"
+    # La précision entre parenthèses ne change pas la clé de nom : toujours une seule entrée
+    assert patcher.find({"name": "Nicolas Cloiseau"}) == [patcher.by_id[1]]
+
+def test_rename_moves_the_record_out_of_its_old_key():
+    patcher = Patcher(records())
+
+    assert patcher.apply({"op": "update", "id": 3, "name": "Lucie Dubois"}) == "update"
+
+    assert [m["id"] for m in patcher.find({"name": "Laurent Dubois"})] == [2]
+    assert [m["id"] for m in patcher.find({"name": "Lucie Dubois"})] == [3]
+    assert patcher.apply({"op": "insert", "name": "Lucie Dubois", "specialty": "Fromager"}) == "skipped"
+
+    assert patcher.apply({"op": "update", "id": 2, "name": "Lucie Dubois"}) == "update"
+    assert patcher.find({"name": "Laurent Dubois"}) == []
+    assert [m["id"] for m in patcher.find({"name": "Lucie Dubois"})] == [3, 2]
+
+def test_invalid_csv_rows_are_reported_and_skipped(tmp_path, capsys):
+    path = tmp_path / "corrections.csv"
+    path.write_text(
+        "op,id,name,specialty,address,year,website\n"
+        "update,,Laurent Dubois,,,deux mille,\n"
+        "update,un,,,,2001,\n"
+        "update,1,,,,2008,\n",
+        encoding="utf-8"
+    )
+    mof_list = records()
+
+    patcher = apply_corrections(mof_list, [str(path)])
+
+    output = capsys.readouterr().out
+    assert "corrections.csv:2: year invalide \"deux mille\"" in output
+    assert "corrections.csv:3: id invalide \"un\"" in output
+    assert patcher.stats["update"] == 1
+    assert [m["year"] for m in mof_list] == [2008, 2000, 2000]
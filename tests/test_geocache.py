@@ -0,0 +1,28 @@
+"""Cache de géocodage (geocache.py) : les entrées expirées sont supprimées à l'ouverture"""
+
+import time
+
+from geocache import NEGATIVE_TTL, POSITIVE_TTL, GeocodeCache
+
+def test_expired_entries_are_purged_when_the_cache_is_opened(tmp_path):
+    path = str(tmp_path / "geocode-cache.sqlite")
+    cache = GeocodeCache(path)
+    cache.set("72 Rue Bonaparte, 75006 Paris", {"lat": 48.853087, "lon": 2.332664})
+    cache.set("8 Rue Monge, 75005 Paris", {"lat": 48.847740, "lon": 2.349207})
+    cache.set("Adresse introuvable", {"lat": None, "lon": None})
+    cache.set("Autre adresse introuvable", {"lat": None, "lon": None})
+    now = time.time()
+    cache.conn.executemany("UPDATE geocode SET created_at = ? WHERE key = ?", [
+        (now - POSITIVE_TTL - 60, "8 rue monge 75005 paris"),
+        (now - NEGATIVE_TTL - 60, "adresse introuvable")
+    ])
+    cache.conn.commit()
+    cache.close()
+
+    cache = GeocodeCache(path)
+
+    assert cache.purged == 2
+    keys = {key for key, in cache.conn.execute("SELECT key FROM geocode")}
+    assert keys == {"72 rue bonaparte 75006 paris", "autre adresse introuvable"}
+    assert cache.get("72 Rue Bonaparte, 75006 Paris") == {"lat": 48.853087, "lon": 2.332664}
+    cache.close()
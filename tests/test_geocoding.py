@@ -0,0 +1,164 @@
+"""
+Géocodage (geocoding.py) : fournisseurs abstraits, limiteur de débit à jetons
+et relances sur 429/503 selon Retry-After, sans réseau ni attente réelle
+"""
+
+from email.utils import parsedate_to_datetime
+import json
+
+import pytest
+import requests
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+
+import geocoding
+from geocache import GeocodeCache
+from geocoding import (BANProvider, GeocodingClient, GeocodingProvider, NominatimProvider, TokenBucket,
+                       parse_retry_after)
+
+def test_provider_without_parse_cannot_be_instantiated():
+    class Incomplete(GeocodingProvider):
+        name = "incomplet"
+
+        def params(self, address):
+            return {"q": address}
+
+    with pytest.raises(TypeError):
+        GeocodingProvider()
+    with pytest.raises(TypeError):
+        Incomplete()
+
+def test_concrete_providers_decode_their_responses():
+    assert NominatimProvider().parse([{"lat": "48.85", "lon": "2.35"}]) == {"lat": 48.85, "lon": 2.35}
+    assert NominatimProvider().parse([]) == {"lat": None, "lon": None}
+    ban = BANProvider()
+    assert ban.params("1 rue de la Paix, Paris") == {"q": "1 rue de la Paix, Paris", "limit": 1}
+    assert ban.parse({"features": [{"geometry": {"coordinates": [2.33, 48.87]}}]}) == {"lat": 48.87, "lon": 2.33}
+
+class FakeClock:
+    """Remplace le module time de geocoding : sleep() avance l'horloge au lieu d'attendre"""
+
+    def __init__(self, start: float = 1000.0):
+        self.now = start
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(round(seconds, 6))
+        self.now += seconds
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(geocoding, "time", clock)
+    return clock
+
+def test_token_bucket_spaces_requests_at_its_rate(clock):
+    bucket = TokenBucket(rate=2.0)
+
+    for _ in range(3):
+        bucket.acquire()
+
+    assert clock.sleeps == [0.5, 0.5]
+    assert clock.now == 1001.0
+
+def test_token_bucket_pause_blocks_until_retry_after(clock):
+    bucket = TokenBucket(rate=1.0)
+    bucket.acquire()
+
+    bucket.pause(3)
+    bucket.acquire()
+
+    assert clock.sleeps == [3.0]
+    clock.sleep(0.5)
+    bucket.acquire()  # Jeton consommé à la reprise : on attend la fin de l'intervalle
+    assert clock.sleeps == [3.0, 0.5, 0.5]
+
+def test_parse_retry_after(clock):
+    assert parse_retry_after("2") == 2.0
+    assert parse_retry_after("-5") == 0.0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("bientôt") is None
+    clock.now = parsedate_to_datetime("Sun, 18 Oct 2026 12:00:00 GMT").timestamp()
+    assert parse_retry_after("Sun, 18 Oct 2026 12:00:30 GMT") == 30.0
+
+class ScriptedAdapter(BaseAdapter):
+    """Adaptateur requests monté sur la session : renvoie les réponses prévues, dans l'ordre"""
+
+    def __init__(self, responses):
+        super().__init__()
+        self.responses = list(responses)
+        self.sent = []
+
+    def send(self, request, **kwargs):
+        self.sent.append(request.url)
+        status, headers, body = self.responses.pop(0)
+        response = requests.Response()
+        response.status_code = status
+        response.headers = CaseInsensitiveDict(headers)
+        response._content = json.dumps(body).encode("utf-8")
+        response.request = request
+        response.url = request.url
+        return response
+
+    def close(self):
+        pass
+
+def scripted_client(responses, **kwargs):
+    client = GeocodingClient("http://geocoder.test/search", rate=10.0, **kwargs)
+    adapter = ScriptedAdapter(responses)
+    client.session.mount("http://", adapter)
+    return client, adapter
+
+def test_429_honors_retry_after_then_succeeds(clock):
+    client, adapter = scripted_client([
+        (429, {"Retry-After": "1"}, {}),
+        (200, {}, [{"lat": "48.85", "lon": "2.35"}])
+    ])
+
+    assert client.get_json({"q": "Paris"}) == [{"lat": "48.85", "lon": "2.35"}]
+    assert len(adapter.sent) == 2
+    assert client.stats == {"requests": 2, "retries": 1}
+    assert clock.sleeps == [1.0]
+
+def test_503_without_retry_after_backs_off_exponentially(clock):
+    client, adapter = scripted_client([
+        (503, {}, {}), (503, {}, {}), (200, {}, [])
+    ], backoff=2.0)
+
+    assert client.get_json({"q": "Paris"}) == []
+    assert clock.sleeps == [2.0, 4.0]
+
+def test_gives_up_after_max_retries(clock):
+    client, adapter = scripted_client([(429, {"Retry-After": "1"}, {})] * 3, max_retries=2)
+
+    with pytest.raises(requests.HTTPError):
+        client.get_json({"q": "Paris"})
+    assert len(adapter.sent) == 3
+
+def test_only_outbound_requests_consume_tokens(clock, monkeypatch, tmp_path):
+    provider = NominatimProvider(base_url="http://geocoder.test/search")
+    adapter = ScriptedAdapter([(200, {}, [{"lat": "45.76", "lon": "4.84"}])])
+    provider.client.session.mount("http://", adapter)
+    monkeypatch.setattr(geocoding, "_geocoder", None)
+    monkeypatch.setattr(geocoding, "_offline_index", False)
+    geocoding.configure_geocoder([provider])
+    cache = GeocodeCache(str(tmp_path / "geocode-cache.sqlite"))
+    cache.set("8 Rue Monge, 75005 Paris", {"lat": 48.84774, "lon": 2.349207})
+    limiter = provider.client.limiter
+
+    assert geocoding.geocode_address("", cache) == {"lat": None, "lon": None}
+    assert geocoding.geocode_address("8 rue Monge 75005 PARIS", cache) == {"lat": 48.84774, "lon": 2.349207}
+    assert geocoding.geocode_addresses(["", "8 Rue Monge, 75005 Paris"], cache)[1]["lat"] == 48.84774
+    assert limiter.tokens == limiter.capacity
+    assert adapter.sent == []
+
+    assert geocoding.geocode_address("Place Bellecour, Lyon", cache) == {"lat": 45.76, "lon": 4.84}
+    assert len(adapter.sent) == 1
+    assert limiter.tokens == 0
+    cache.close()
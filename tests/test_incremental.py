@@ -0,0 +1,39 @@
+"""Mode incrémental (incremental.py) : une entrée enregistrée sans coordonnées est géocodée au passage suivant"""
+
+from incremental import ScrapeState
+from scrape_mof_selenium import build_mof_list
+
+ENTRIES = [
+    {"data-nom": "Laurent Dubois", "data-metier": "Fromager", "data-ville": "Paris", "data-departement": "75"},
+    {"data-nom": "Patrick Roger", "data-metier": "Chocolatier", "data-ville": "Sceaux", "data-departement": "92"},
+    {"data-nom": "Arnaud Larher", "data-metier": "Pâtissier-Chocolatier", "data-ville": "Paris", "data-departement": "75"}
+]
+
+def run(path, geocode_limit):
+    """Un passage : les `geocode_limit` premières entrées à traiter reçoivent des coordonnées"""
+    state = ScrapeState(path)
+    mof_list = build_mof_list(ENTRIES, state)
+    changed = state.changed_records()
+    for position, mof in enumerate(changed):
+        mof["coordinates"] = {"lat": 48.85, "lon": 2.35} if position < geocode_limit else {"lat": None, "lon": None}
+    state.save()
+    return state, mof_list, changed
+
+def test_records_left_without_coordinates_are_geocoded_next_run(tmp_path):
+    path = str(tmp_path / "scrape-state.json")
+
+    state, _, _ = run(path, geocode_limit=1)
+    assert state.stats == {"new": 3, "changed": 0, "pending": 0, "unchanged": 0}
+
+    state, mof_list, changed = run(path, geocode_limit=1)
+    assert state.stats == {"new": 0, "changed": 0, "pending": 2, "unchanged": 1}
+    assert [mof["name"] for mof in changed] == ["Patrick Roger", "Arnaud Larher"]
+
+    state, mof_list, changed = run(path, geocode_limit=1)
+    assert state.stats == {"new": 0, "changed": 0, "pending": 1, "unchanged": 2}
+    assert [mof["name"] for mof in changed] == ["Arnaud Larher"]
+    assert all(mof["coordinates"]["lat"] is not None for mof in mof_list)
+
+    state, _, changed = run(path, geocode_limit=0)
+    assert state.stats == {"new": 0, "changed": 0, "pending": 0, "unchanged": 3}
+    assert changed == []
@@ -0,0 +1,57 @@
+"""Pages métier-ville (landing_pages.py) : la date lastmod du sitemap ne recule jamais"""
+
+import copy
+import json
+import os
+
+import pytest
+
+from conftest import SCRAPER_DIR
+from landing_pages import generate_landing_pages
+
+DATA = os.path.join(os.path.dirname(SCRAPER_DIR), "data", "mof-data.json")
+
+@pytest.fixture
+def data():
+    with open(DATA, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def lastmods(manifest_path):
+    with open(manifest_path, 'r', encoding='utf-8') as f:
+        return {slug: page["lastmod"] for slug, page in json.load(f)["pages"].items()}
+
+def regenerate(data, generated_at, site, manifest_path):
+    data = copy.deepcopy(data)
+    data["meta"]["generated_at"] = generated_at
+    stats = generate_landing_pages(data, site_dirs=[str(site)], manifest_path=str(manifest_path))
+    return lastmods(manifest_path), stats
+
+def rename_first(data, slug_prefix):
+    mof = next(m for m in data["mof"] if m["specialty"].lower().startswith(slug_prefix))
+    mof["name"] += " (nouvelle boutique)"
+
+def test_changed_page_never_moves_back_in_time(data, tmp_path):
+    site, manifest_path = tmp_path / "site", tmp_path / "landing-manifest.json"
+    site.mkdir()
+    first, _ = regenerate(data, "2026-02-01", site, manifest_path)
+    assert set(first.values()) == {"2026-02-01"}
+
+    # Données relues d'un fichier plus ancien, avec une page modifiée
+    rename_first(data, "chocolatier")
+    older, stats = regenerate(data, "2026-01-25", site, manifest_path)
+
+    assert stats["rendered"] >= 1
+    assert older == first
+
+def test_changed_page_moves_forward_with_newer_data(data, tmp_path):
+    site, manifest_path = tmp_path / "site", tmp_path / "landing-manifest.json"
+    site.mkdir()
+    first, _ = regenerate(data, "2026-02-01", site, manifest_path)
+
+    rename_first(data, "chocolatier")
+    newer, _ = regenerate(data, "2026-03-01", site, manifest_path)
+
+    changed = {slug for slug in newer if newer[slug] != first[slug]}
+    assert changed and all(newer[slug] == "2026-03-01" for slug in changed)
+    assert all(newer[slug] == "2026-02-01" for slug in newer if slug not in changed)
+    assert "<lastmod>2026-03-01</lastmod>" in (site / "sitemap.xml").read_text(encoding="utf-8")
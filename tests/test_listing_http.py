@@ -0,0 +1,128 @@
+"""
+Chemin HTTP de l'annuaire (listing_http.py) sur une page enregistrée et la page suivante
+du bouton #loadMore (tests/fixtures/annuaire-mof*.html) : mêmes MOF que le chemin Selenium
+"""
+
+import os
+
+import pytest
+import requests
+from bs4 import BeautifulSoup
+from requests.structures import CaseInsensitiveDict
+
+from conftest import FIXTURES_DIR
+import listing_http
+from incremental import read_entry_attributes
+from scrape_mof_selenium import ITEM_SELECTOR, build_mof_list, scrape_mof_listing
+
+LOAD_MORE_URL = "https://www.meilleursouvriersdefrance.info/annuaire-mof/load-more"
+
+def read_fixture(name: str) -> str:
+    with open(os.path.join(FIXTURES_DIR, name), 'r', encoding='utf-8') as f:
+        return f.read()
+
+FIRST_PAGE = read_fixture("annuaire-mof.html")
+SECOND_PAGE = read_fixture("annuaire-mof-page2.html")
+
+def make_response(url: str, body: str, status: int = 200) -> requests.Response:
+    response = requests.Response()
+    response.status_code = status
+    response._content = body.encode("utf-8")
+    response.encoding = "utf-8"
+    response.headers = CaseInsensitiveDict({"Content-Type": "text/html; charset=utf-8"})
+    response.url = url
+    return response
+
+class FixtureSession(requests.Session):
+    """Sert la page enregistrée, puis le fragment de la page 2 ; les pages suivantes sont vides"""
+
+    def __init__(self):
+        super().__init__()
+        self.requested = []
+
+    def get(self, url, params=None, headers=None, timeout=None, **kwargs):
+        page = (params or {}).get("page")
+        self.requested.append((url, page))
+        if url == listing_http.ANNUAIRE_URL:
+            return make_response(url, FIRST_PAGE)
+        if url == LOAD_MORE_URL:
+            return make_response(url, SECOND_PAGE if page == 2 else "")
+        return make_response(url, "", status=404)
+
+class FakeElement:
+    def __init__(self, tag):
+        self.tag = tag
+
+    def get_attribute(self, name):
+        return self.tag.get(name)
+
+class FakeDriver:
+    """DOM vu par Selenium après les clics sur "Charger plus" : fragment ajouté à ul#sort-me"""
+
+    def __init__(self):
+        self.soup = BeautifulSoup(FIRST_PAGE, "html.parser")
+        fragment = BeautifulSoup(SECOND_PAGE, "html.parser")
+        listing = self.soup.select_one("ul#sort-me")
+        for item in fragment.find_all("li"):
+            listing.append(item)
+
+    def find_element(self, by, value):
+        matches = self.find_elements(by, f"#{value}" if by == "id" else value)
+        if not matches:
+            raise LookupError(value)
+        return matches[0]
+
+    def find_elements(self, by, value):
+        return [FakeElement(tag) for tag in self.soup.select(value)]
+
+@pytest.fixture
+def session(monkeypatch):
+    session = FixtureSession()
+    monkeypatch.setattr(listing_http, "LOAD_MORE_URL", None)
+    monkeypatch.setattr(listing_http.requests, "Session", lambda: session)
+    return session
+
+def test_fetch_listing_follows_load_more(session):
+    entries = listing_http.fetch_listing()
+
+    assert [e["data-nom"] for e in entries] == [
+        "Laurent Dubois", "Patrick Roger", "Jean Dupuis", "Arnaud Larher", "",
+        "Jean-Paul Hévin", "Marie Dupont", "Arnaud Nicolas", "Marie Quatrehomme"
+    ]
+    assert session.requested == [
+        (listing_http.ANNUAIRE_URL, None), (LOAD_MORE_URL, 2), (LOAD_MORE_URL, 3)
+    ]
+
+def test_http_path_matches_selenium_extraction(session):
+    driver = FakeDriver()
+    selenium_entries = [read_entry_attributes(e) for e in driver.find_elements("css selector", ITEM_SELECTOR)]
+
+    mof_list, method = scrape_mof_listing()
+
+    assert method == "http"
+    assert mof_list == build_mof_list(selenium_entries)
+    assert [(m["name"], m["category"], m["address"]) for m in mof_list] == [
+        ("Laurent Dubois", "Fromagerie", "Paris, 75"),
+        ("Patrick Roger", "Chocolaterie", "Sceaux, 92"),
+        ("Arnaud Larher", "Pâtisserie", "Paris, 75"),
+        ("Jean-Paul Hévin", "Pâtisserie", "Paris, 75"),
+        ("Arnaud Nicolas", "Charcuterie-Traiteur", "75"),
+        ("Marie Quatrehomme", "Fromagerie", "Paris, 75")
+    ]
+    assert [m["id"] for m in mof_list] == list(range(1, 7))
+
+def test_http_path_matches_extract_mof_from_page(session):
+    pytest.importorskip("selenium")
+    from scrape_mof_selenium import extract_mof_from_page
+
+    mof_list, _ = scrape_mof_listing()
+
+    assert mof_list == extract_mof_from_page(FakeDriver())
+
+def test_changed_page_layout_falls_back(monkeypatch):
+    monkeypatch.setattr(listing_http.requests, "Session",
+                        lambda: type("Empty", (FixtureSession,), {
+                            "get": lambda self, url, **kwargs: make_response(url, "<ul id=\"sort-me\"></ul>")
+                        })())
+
+    assert listing_http.fetch_listing() is None
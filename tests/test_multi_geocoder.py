@@ -0,0 +1,116 @@
+"""
+Géocodeur multi-fournisseurs (geocoding.MultiGeocoder) avec des fournisseurs locaux :
+repli sur le suivant, requête de couverture (hedging) et répartition du premier essai
+"""
+
+import threading
+import time
+
+import pytest
+
+from geocoding import GeocodingError, GeocodingProvider, MultiGeocoder
+
+MISS = {"lat": None, "lon": None}
+
+class StubClient:
+    """Remplace GeocodingClient : répond sans réseau, après un éventuel délai"""
+
+    def __init__(self, answer=None, error=None, delay=0.0):
+        self.answer = answer or MISS
+        self.error = error
+        self.delay = delay
+        self.queries = []
+        self.lock = threading.Lock()
+
+    def get_json(self, params):
+        with self.lock:
+            self.queries.append(params["q"])
+        if self.delay:
+            time.sleep(self.delay)
+        if self.error:
+            raise self.error
+        return self.answer
+
+class StubProvider(GeocodingProvider):
+    def __init__(self, name, answer=None, error=None, delay=0.0):
+        super().__init__(base_url="http://localhost:9/search")
+        self.name = name
+        self.client = StubClient(answer, error, delay)
+
+    def params(self, address):
+        return {"q": address}
+
+    def parse(self, data):
+        return dict(data)
+
+PARIS = {"lat": 48.8566, "lon": 2.3522}
+LYON = {"lat": 45.764, "lon": 4.8357}
+
+def test_next_provider_is_tried_on_a_miss():
+    missing = StubProvider("vide")
+    found = StubProvider("local", answer=PARIS)
+
+    assert MultiGeocoder([missing, found]).geocode("Paris") == PARIS
+    assert missing.client.queries == ["Paris"]
+    assert found.client.queries == ["Paris"]
+    assert (missing.stats["not_found"], found.stats["found"]) == (1, 1)
+
+def test_next_provider_is_tried_on_an_error():
+    failing = StubProvider("panne", error=ConnectionError("refusé"))
+    found = StubProvider("local", answer=LYON)
+
+    assert MultiGeocoder([failing, found]).geocode("Lyon") == LYON
+    assert failing.stats["errors"] == 1
+
+def test_miss_wins_over_errors_and_all_errors_raise():
+    failing = StubProvider("panne", error=ConnectionError("refusé"))
+
+    assert MultiGeocoder([failing, StubProvider("vide")]).geocode("Nulle part") == MISS
+    with pytest.raises(GeocodingError, match="panne: refusé"):
+        MultiGeocoder([failing]).geocode("Nulle part")
+
+def test_first_answer_stops_the_fallback():
+    found = StubProvider("local", answer=PARIS)
+    unused = StubProvider("secours", answer=LYON)
+
+    assert MultiGeocoder([found, unused]).geocode("Paris") == PARIS
+    assert unused.client.queries == []
+
+def test_slow_provider_is_hedged():
+    slow = StubProvider("lent", answer=LYON, delay=1.0)
+    fast = StubProvider("rapide", answer=PARIS)
+    geocoder = MultiGeocoder([slow, fast], hedge_after=0.05)
+
+    start = time.perf_counter()
+    coords = geocoder.geocode("Paris")
+    elapsed = time.perf_counter() - start
+
+    assert coords == PARIS
+    assert elapsed < 0.5
+    assert slow.client.queries == ["Paris"]
+    assert fast.client.queries == ["Paris"]
+
+def test_without_hedging_the_slow_provider_answers():
+    slow = StubProvider("lent", answer=LYON, delay=0.2)
+    fast = StubProvider("rapide", answer=PARIS)
+
+    assert MultiGeocoder([slow, fast]).geocode("Lyon") == LYON
+    assert fast.client.queries == []
+
+def test_geocode_many_spreads_first_attempts_round_robin():
+    providers = [StubProvider(f"p{i}", answer={"lat": float(i), "lon": 0.0}) for i in range(3)]
+    addresses = [f"adresse {i}" for i in range(7)]
+
+    results = dict(MultiGeocoder(providers).geocode_many(addresses))
+
+    assert results == {i: {"lat": float(i % 3), "lon": 0.0} for i in range(7)}
+    for i, provider in enumerate(providers):
+        assert sorted(provider.client.queries) == addresses[i::3]
+
+def test_geocode_many_yields_errors_instead_of_raising():
+    failing = StubProvider("panne", error=ConnectionError("refusé"))
+
+    results = dict(MultiGeocoder([failing]).geocode_many(["a", "b"]))
+
+    assert set(results) == {0, 1}
+    assert all(isinstance(outcome, GeocodingError) for outcome in results.values())
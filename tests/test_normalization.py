@@ -0,0 +1,46 @@
+"""
+Clés normalisées (geocache.normalize_address, entities.name_key) : les raccourcis
+(texte ASCII, normalisation mot par mot en cache) donnent exactement les clés d'origine,
+dont dépendent le cache de géocodage, le mode incrémental et le regroupement des artisans
+"""
+
+import re
+import unicodedata
+
+import pytest
+
+from entities import name_key
+from geocache import normalize_address
+
+def reference_normalize(address):
+    if not address:
+        return ""
+    text = unicodedata.normalize("NFD", address.lower())
+    text = "".join(c for c in text if unicodedata.category(c) != "Mn")
+    text = re.sub(r"[^\w]+", " ", text)
+    return " ".join(text.split())
+
+def reference_name_key(name):
+    name = re.sub(r"\s*\(.*?\)", "", name or "")
+    return " ".join(sorted(reference_normalize(name).split()))
+
+ADDRESSES = [
+    None, "", "   ", "47 ter boulevard Saint-Germain, 75005 Paris", "Rue de l'Église, 75001 PARIS",
+    "225 rue du Faubourg Saint-Honoré, 75008 Paris", "Œuvre, Ærø, straße", "Ville-d'Avray (92410)",
+    "12\tquai  du   Port\n13002 Marseille", "Ｐａｒｉｓ ７５００１", "l’Isle-sur-la-Sorgue, 84800", "ǅemal İstanbul"
+]
+
+NAMES = [
+    None, "", "Laurent Dubois", "LAURENT DUBOIS", "Dubois Laurent", "Jean-Paul Hévin", "JEAN-PAUL HÉVIN",
+    "Nicolas Cloiseau (La Maison du Chocolat)", "Lecourbe Marée (Damien Lejeune)", "Fawze Sannier (L'Hippocampe)",
+    "  Gérard   Taurin ", "Émile (1) Zola (2)", "O'Neil", "Jean–Paul Hévin", "Stéphane Minot (La Fine Marée"
+]
+
+@pytest.mark.parametrize("address", ADDRESSES)
+def test_normalize_address_matches_reference(address):
+    assert normalize_address(address) == reference_normalize(address)
+
+@pytest.mark.parametrize("name", NAMES)
+def test_name_key_matches_reference(name):
+    assert name_key(name) == reference_name_key(name)
+    assert name_key(name) == reference_name_key(name)  # Second appel servi par le cache
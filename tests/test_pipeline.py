@@ -0,0 +1,30 @@
+"""Clés des étapes (pipeline.py) : le géocodage dépend de l'index BAN et des fournisseurs configurés"""
+
+import pipeline
+
+GEOCODE = next(stage for stage in pipeline.STAGES if stage.name == "geocode")
+
+def test_geocode_key_covers_its_modules():
+    assert {"geocoding.py", "geocache.py", "ban_index.py"} <= set(GEOCODE.modules)
+
+def test_geocode_key_changes_with_the_ban_index(tmp_path, monkeypatch):
+    index = tmp_path / "ban-index.bin"
+    monkeypatch.setattr(pipeline, "DEFAULT_INDEX_PATH", str(index))
+    without_index = GEOCODE.key("entrée", {})
+
+    index.write_bytes(b"BAN1" + b"\0" * 64)
+    built = GEOCODE.key("entrée", {})
+    index.write_bytes(b"BAN1" + b"\1" * 64)
+    rebuilt = GEOCODE.key("entrée", {})
+
+    assert len({without_index, built, rebuilt}) == 3
+    assert GEOCODE.key("entrée", {}) == rebuilt
+
+def test_geocode_key_changes_with_the_providers(monkeypatch, tmp_path):
+    monkeypatch.setattr(pipeline, "DEFAULT_INDEX_PATH", str(tmp_path / "absent.bin"))
+
+    nominatim = GEOCODE.key("entrée", {"geocoders": "nominatim"})
+
+    assert GEOCODE.key("entrée", {"geocoders": "nominatim", "no_cache": True}) == nominatim
+    assert GEOCODE.key("entrée", {"geocoders": "ban,nominatim"}) != nominatim
+    assert GEOCODE.key("entrée", {"geocoders": "nominatim", "geocode_hedge": "2"}) != nominatim
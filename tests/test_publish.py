@@ -0,0 +1,53 @@
+"""Publication des fragments (publish.py) : seuls les fragments du manifeste précédent sont supprimés"""
+
+import copy
+import json
+import os
+
+import pytest
+
+from conftest import SCRAPER_DIR
+from publish import MANIFEST_FILE, publish_data
+
+DATA = os.path.join(os.path.dirname(SCRAPER_DIR), "data", "mof-data.json")
+
+@pytest.fixture
+def data():
+    with open(DATA, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+@pytest.fixture
+def site(tmp_path):
+    site_dir = tmp_path / "site"
+    site_dir.mkdir()
+    return site_dir
+
+def publish(data, tmp_path, site):
+    publish_data(copy.deepcopy(data), data_path=str(tmp_path / "mof-data.json"), site_dirs=[str(site)])
+
+def test_removes_shards_that_are_no_longer_published(data, tmp_path, site):
+    publish(data, tmp_path, site)
+    shard = site / "data" / "categorie" / "glacerie.json"
+    assert shard.exists()
+
+    data["mof"] = [mof for mof in data["mof"] if "Glacier" not in mof["specialty"]]
+    publish(data, tmp_path, site)
+
+    assert not shard.exists()
+    assert not (site / "data" / "categorie" / "glacerie.json.gz").exists()
+    with open(site / MANIFEST_FILE, 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+    assert all(os.path.exists(site / entry["path"]) for entries in manifest["shards"].values() for entry in entries)
+
+def test_keeps_files_outside_the_manifest(data, tmp_path, site):
+    (site / "data").mkdir()
+    (site / "data" / "communes.json").write_text("{}", encoding="utf-8")
+    (site / "data" / "categorie").mkdir()
+    (site / "data" / "categorie" / "notes.txt").write_text("à garder", encoding="utf-8")
+
+    publish(data, tmp_path, site)
+    data["mof"] = data["mof"][:5]
+    publish(data, tmp_path, site)
+
+    assert (site / "data" / "communes.json").read_text(encoding="utf-8") == "{}"
+    assert (site / "data" / "categorie" / "notes.txt").exists()
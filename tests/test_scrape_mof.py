@@ -0,0 +1,49 @@
+"""Analyse de l'annuaire (scrape_mof.py) : le mode lxml donne les mêmes MOF que BeautifulSoup"""
+
+from urllib.parse import urljoin
+
+import pytest
+
+from bench_parse import synthetic_page
+from scrape_mof import absolute_url, parse_mof_directory
+
+def parse_both(content: bytes):
+    lxml_result = parse_mof_directory(content, "lxml", verbose=False)
+    assert lxml_result == parse_mof_directory(content, "soup", verbose=False)
+    return lxml_result
+
+def test_synthetic_page():
+    mof_list = parse_both(synthetic_page(200))
+
+    assert len(mof_list) == 140
+    assert mof_list[0] == {
+        "id": 1, "name": "Artisan 0 MOF", "specialty": "Boulanger", "category": "Boulangerie",
+        "address": "0 rue de la Paix, 75000 Paris", "year": 1990,
+        "website": "https://www.meilleursouvriersdefrance.info/artisan/0",
+        "coordinates": {"lat": None, "lon": None}
+    }
+
+def test_nested_items_latin1_and_relative_links():
+    content = (
+        '<html><body><article class="intro"><h2>Annuaire</h2></article>'
+        '<div class="artisan"><h3>Lucie Éloi <span>MOF</span></h3>'
+        '<div class="card"><p class="metier">Fromager</p><p class="adresse">Rue de l\'Église, 75001 Paris</p></div>'
+        '<span class="annee">2019</span><a class="site" href="/annuaire/../artisan/éloi">Site</a></div>'
+        '<div class="member"><h3>Jean  Dupuis</h3><p class="category">Chocolatier</p>'
+        '<a class="site" href="fiche?id=2">Site</a><a href="https://dupuis.fr">Externe</a></div>'
+        '</body></html>'
+    )
+
+    mof_list = parse_both(content.encode("latin-1"))
+
+    assert [(m["name"], m["website"]) for m in mof_list] == [
+        ("Lucie Éloi MOF", "https://www.meilleursouvriersdefrance.info/artisan/éloi"),
+        ("Jean Dupuis", "https://www.meilleursouvriersdefrance.info/fiche?id=2")
+    ]
+    assert parse_both(content.encode("utf-8")) == mof_list
+
+@pytest.mark.parametrize("href", [
+    "/artisan/12", "/a//b", "/a/./b", "/a/../b", "/a/.", "/a?x=../y#z", "//cdn.example.com/x", "fiche?id=2"
+])
+def test_absolute_url_matches_urljoin(href):
+    assert absolute_url(href) == urljoin("https://www.meilleursouvriersdefrance.info", href)
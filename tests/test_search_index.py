@@ -0,0 +1,61 @@
+"""Index de recherche (search_index.py) : mêmes résultats que la recherche linéaire de app.js"""
+
+import random
+
+import pytest
+
+from search_index import (build_search_index, decode_postings, encode_postings, linear_search, search,
+                          synthetic_records)
+
+FIXTURES = [
+    {"id": 10001, "name": "JEAN-PAUL HÉVIN", "specialty": "Chocolatier-Confiseur",
+     "address": "231 rue Saint-Honoré, 75001 PARIS"},
+    {"id": 10002, "name": "Maëlle Lefèvre", "specialty": "Poissonnier-Écailler",
+     "address": "Place de l'Église, 29200 Brest"},
+    {"id": 10003, "name": "Œ Zoé", "specialty": "Glacier", "address": None},
+    {"id": 10004, "name": "Noël Brys", "specialty": "PÂTISSIER", "address": "1 quai d'Orléans, 45000 Orléans"}
+]
+
+@pytest.fixture(scope="module")
+def mof_list():
+    return synthetic_records(2000, random.Random(7)) + FIXTURES
+
+@pytest.fixture(scope="module")
+def index(mof_list):
+    return build_search_index(mof_list)
+
+@pytest.mark.parametrize("query", [
+    # Courtes (< 3 caractères) : parcours linéaire
+    "", " ", "a", "É", "zo", "PA",
+    # Accents et casse
+    "hévin", "HEVIN", "écailler", "ECAILLER", "pâtissier", "patissier", "maelle", "noël", "orléans",
+    # Plusieurs mots, ponctuation
+    "jean-paul", "saint-honoré, 75001", "rue de la paix", "place de l'église", "poissonnier-écailler",
+    # Aucun résultat
+    "zzz", "chocolatier boulanger", "75001 lyon", "xyz123"
+])
+def test_search_matches_linear_scan(index, mof_list, query):
+    records = {mof["id"]: mof for mof in mof_list}
+
+    assert search(index, query, records) == linear_search(mof_list, query)
+
+def test_fixture_records_are_found(index, mof_list):
+    records = {mof["id"]: mof for mof in mof_list}
+
+    assert search(index, "jean-paul hevin", records) == {10001}
+    assert 10004 in search(index, "ORLEANS", records)
+    assert search(index, "zzz", records) == set()
+
+@pytest.mark.parametrize("positions, count, encoded_as", [
+    ([], 1000, list),
+    ([0, 5, 999], 1000, list),
+    ([3, 4, 40, 41, 420], 100000, list),
+    (list(range(0, 100, 3)), 100, str),
+    ([0, 7, 8, 15, 16, 99], 101, str),
+    (list(range(64)), 64, str)
+])
+def test_postings_round_trip(positions, count, encoded_as):
+    encoded = encode_postings(positions, count)
+
+    assert isinstance(encoded, encoded_as)
+    assert decode_postings(encoded) == positions
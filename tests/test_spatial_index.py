@@ -0,0 +1,72 @@
+"""
+Index spatial (spatial_index.py) : mêmes K plus proches que le calcul exhaustif,
+sur des MOF synthétiques répartis en métropole et des points de recherche partout
+"""
+
+import random
+
+import pytest
+
+from spatial_index import build_index, haversine, nearest
+
+def brute_force(mof_list, lat, lon, k=10):
+    """Référence : distance à chaque MOF puis tri complet"""
+    distances = [
+        (haversine(lat, lon, m["coordinates"]["lat"], m["coordinates"]["lon"]), m["id"])
+        for m in mof_list
+        if (m.get("coordinates") or {}).get("lat") is not None
+    ]
+    return sorted(distances)[:k]
+
+def synthetic_mof(count, rng):
+    """MOF répartis en métropole, concentrés autour de quelques grandes villes ; quelques-uns sans coordonnées"""
+    cities = [(48.8566, 2.3522), (45.764, 4.8357), (43.2965, 5.3698), (44.8378, -0.5792), (50.6292, 3.0573)]
+    mof_list = []
+    for i in range(count):
+        if i % 97 == 0:
+            mof_list.append({"id": i + 1, "coordinates": {"lat": None, "lon": None}})
+            continue
+        if rng.random() < 0.6:
+            lat, lon = rng.choice(cities)
+            lat, lon = lat + rng.gauss(0, 0.15), lon + rng.gauss(0, 0.2)
+        else:
+            lat, lon = rng.uniform(42.3, 51.1), rng.uniform(-4.8, 8.2)
+        mof_list.append({"id": i + 1, "coordinates": {"lat": round(lat, 6), "lon": round(lon, 6)}})
+    return mof_list
+
+RNG = random.Random(42)
+MOF_LIST = synthetic_mof(3000, RNG)
+POINTS = [(RNG.uniform(41, 52), RNG.uniform(-6, 10)) for _ in range(150)]
+POINTS += [(-33.87, 151.21), (64.13, -21.9), (89.5, 0.0), (0.0, 179.99), (48.8566, 2.3522)]
+
+@pytest.fixture(scope="module")
+def index():
+    return build_index(MOF_LIST)
+
+@pytest.fixture(scope="module")
+def expected():
+    """50 plus proches de chaque point par le calcul exhaustif, calculés une fois (les K plus petits s'en déduisent)"""
+    return {point: brute_force(MOF_LIST, *point, k=50) for point in POINTS}
+
+def assert_same_distances(found, expected):
+    # Égalité des distances (les ex aequo peuvent être départagés autrement)
+    assert len(found) == len(expected)
+    assert [d for d, _ in found] == pytest.approx([d for d, _ in expected], abs=1e-9)
+
+@pytest.mark.parametrize("k", [1, 10, 50])
+def test_nearest_matches_brute_force(index, expected, k):
+    for lat, lon in POINTS:
+        assert_same_distances(nearest(index, lat, lon, k), expected[(lat, lon)][:k])
+
+@pytest.mark.parametrize("precision", [2, 3, 5])
+def test_nearest_matches_brute_force_at_other_precisions(expected, precision):
+    index = build_index(MOF_LIST, precision=precision)
+    # Points de métropole : au loin, une précision fine fait parcourir des milliers de cases vides
+    for lat, lon in POINTS[:40]:
+        assert_same_distances(nearest(index, lat, lon, 10), expected[(lat, lon)][:10])
+
+def test_k_larger_than_dataset():
+    mof_list = MOF_LIST[:20]
+    found = nearest(build_index(mof_list), 48.85, 2.35, 100)
+    assert_same_distances(found, brute_force(mof_list, 48.85, 2.35, 100))
+    assert len(found) == sum(1 for m in mof_list if m["coordinates"]["lat"] is not None)
@@ -0,0 +1,115 @@
+"""
+Sortie en flux (streaming.py) : assemblage identique à json.dump(indent=2),
+reprise après une ligne tronquée sans doublon ni perte, ordre des id rétabli
+"""
+
+import json
+import tracemalloc
+
+import pytest
+
+import geocoding
+from streaming import (JsonlWriter, assemble_json, completed_keys, geocode_stream, open_for_resume,
+                       read_jsonl, repair_jsonl)
+
+META = {"generated_at": "2026-01-01 00:00:00", "source": "test"}
+
+def record(i, **extra):
+    return {"id": i + 1, "name": f"Artisan n°{i}", "specialty": "Pâtissier",
+            "address": f"{i} rue de l'Église, 75001 Paris", "coordinates": {"lat": 48.86, "lon": 2.34},
+            **extra}
+
+def write_records(path, records):
+    with JsonlWriter(str(path)) as writer:
+        for i, mof in enumerate(records):
+            writer.write(str(i), mof)
+
+def expected_json(records):
+    return json.dumps({"meta": {"total": len(records), **META}, "mof": records}, ensure_ascii=False, indent=2)
+
+@pytest.mark.parametrize("count", [0, 1, 500])
+def test_assembly_matches_json_dump(tmp_path, count):
+    source, output = tmp_path / "records.jsonl", tmp_path / "mof.json"
+    records = [record(i, website=None, year=1990 + i % 30) for i in range(count)]
+    write_records(source, records)
+
+    assert assemble_json(str(source), str(output), META) == count
+    assert output.read_text(encoding="utf-8") == expected_json(records)
+
+def test_assembly_memory_does_not_grow_with_the_file(tmp_path):
+    source, output = tmp_path / "records.jsonl", tmp_path / "mof.json"
+    write_records(source, [record(i) for i in range(5000)])
+
+    tracemalloc.start()
+    assemble_json(str(source), str(output), META)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    # Charger la liste entière coûterait plusieurs fois la taille du fichier
+    assert peak < output.stat().st_size / 4
+
+def test_truncated_last_line_is_ignored_then_repaired(tmp_path, capsys):
+    source = tmp_path / "records.jsonl"
+    write_records(source, [record(i) for i in range(3)])
+    with open(source, 'a', encoding='utf-8') as f:
+        f.write('{"key": "tronquée", "mof": {"na')
+
+    assert completed_keys(str(source)) == {"0", "1", "2"}
+    assert "Dernière ligne incomplète ignorée" in capsys.readouterr().out
+
+    repair_jsonl(str(source))
+    assert source.read_text(encoding="utf-8").endswith("}}\n")
+    with open_for_resume(str(source)) as writer:
+        writer.write("3", record(3))
+    assert [line["key"] for line in read_jsonl(str(source))] == ["0", "1", "2", "3"]
+
+def test_repair_of_a_single_truncated_line_empties_the_file(tmp_path):
+    source = tmp_path / "records.jsonl"
+    source.write_text('{"key": "0", "mof": ' + "x" * 10000, encoding="utf-8")
+
+    repair_jsonl(str(source))
+
+    assert source.read_text(encoding="utf-8") == ""
+
+def test_resumed_geocoding_neither_duplicates_nor_loses_records(tmp_path, monkeypatch):
+    source, target = tmp_path / "extracted.jsonl", tmp_path / "geocoded.jsonl"
+    records = [record(i, coordinates={"lat": None, "lon": None}) for i in range(50)]
+    records[7]["address"] = None
+    write_records(source, records)
+    geocoded = []
+
+    def fake_geocode(addresses):
+        geocoded.extend(addresses)
+        return [{"lat": 48.0 + len(address) / 1000, "lon": 2.0} for address in addresses]
+
+    monkeypatch.setattr(geocoding, "geocode_addresses", fake_geocode)
+
+    # Premier passage interrompu : 19 lignes complètes, la 20e à moitié écrite
+    geocode_stream(str(source), str(target), batch_size=10)
+    lines = target.read_text(encoding="utf-8").splitlines(keepends=True)
+    target.write_text("".join(lines[:19]) + lines[19][:25], encoding="utf-8")
+    kept = {json.loads(line)["key"] for line in lines[:19]}
+    geocoded.clear()
+
+    stats = geocode_stream(str(source), str(target), batch_size=10)
+
+    keys = [line["key"] for line in read_jsonl(str(target))]
+    assert sorted(keys, key=int) == [str(i) for i in range(50)]
+    assert len(keys) == len(set(keys))
+    assert stats["resumed"] == 19
+    assert stats["geocoded"] + stats["copied"] == 31
+    assert geocoded == [mof["address"] for i, mof in enumerate(records) if str(i) not in kept and mof["address"]]
+    assert all(line["mof"]["coordinates"]["lat"] is not None
+               for line in read_jsonl(str(target)) if line["mof"]["address"])
+
+def test_order_by_id_restores_the_order_of_records_written_out_of_order(tmp_path):
+    source, output = tmp_path / "shuffled.jsonl", tmp_path / "mof.json"
+    with JsonlWriter(str(source)) as writer:
+        for position in sorted(range(200), key=lambda p: (p % 7, -p)):
+            writer.write(str(position), {"id": position * 3 + 1, "name": f"Artisan n°{position}"})
+
+    assert assemble_json(str(source), str(output), META, order_by_id=True) == 200
+
+    with open(output, 'r', encoding='utf-8') as f:
+        assert json.load(f)["mof"] == [{"id": position + 1, "name": f"Artisan n°{position}"}
+                                       for position in range(200)]